@@ -1,6 +1,21 @@
-from agents.llm import generate_answer
+import asyncio
+import json
+import os
+import re
+from typing import AsyncIterator, List, Optional, Tuple
 
-EVALUATION_PROMPT = """
+from agents.prompts import assemble, fit_input, static
+from agents.llm import (
+    WARMING_UP_MESSAGE,
+    generate_answer, stream_answer, generate_answer_async, stream_answer_async
+)
+from agents.llm_scheduler import LLMOverloaded
+
+# In-flight LLM calls per batch (the scheduler still caps the total)
+BATCH_CONCURRENCY = int(os.getenv("EVAL_BATCH_CONCURRENCY", "4"))
+BATCH_MAX_ITEMS = int(os.getenv("EVAL_BATCH_MAX_ITEMS", "200"))
+
+EVALUATION_PROMPT = static("""
 You are a senior NVIDIA interviewer evaluating a candidate's answer.
 
 Evaluate on:
@@ -16,19 +31,209 @@ Give:
 - Specific suggestions to improve
 
 Be honest, concise, and professional.
-"""
+""")
+
+# Rubric dimensions, each scored 0–10 (stored in numeric columns)
+RUBRIC = ("technical_correctness", "depth", "system_thinking", "clarity")
+
+JSON_INSTRUCTIONS = static("""
+Respond with ONLY a JSON object of this shape:
+{
+  "score": <overall score, number 0-10>,
+  "dimensions": {
+    "technical_correctness": <0-10>,
+    "depth": <0-10>,
+    "system_thinking": <0-10>,
+    "clarity": <0-10>
+  },
+  "strengths": ["..."],
+  "weaknesses": ["..."],
+  "suggestions": ["..."]
+}
+""")
+
+_NUMBER = r"\d+(?:\.\d+)?"
+_PER = r"\s*(?:/|out\s+of)\s*"
+# Tried in order; each names the score and, when stated, its denominator
+SCORE_PATTERNS = (
+    # "Score: 7/10", "scored 3 out of 5"
+    re.compile(rf"score[^\d\n]{{0,20}}?(?P<value>{_NUMBER}){_PER}(?P<scale>{_NUMBER})", re.IGNORECASE),
+    # "score out of 10: 6"
+    re.compile(rf"score\s+out\s+of\s+(?P<scale>{_NUMBER})[^\d\n]{{0,10}}?(?P<value>{_NUMBER})", re.IGNORECASE),
+    # "7/10" or "50/100" anywhere
+    re.compile(rf"(?<![\d.])(?P<value>{_NUMBER}){_PER}(?P<scale>{_NUMBER})(?![\d.])", re.IGNORECASE),
+    # "Score: 7", never a denominator ("score out of 10")
+    re.compile(
+        rf"score(?:(?!out\s+of)[^\d\n]){{0,20}}?(?P<value>{_NUMBER})(?!\.?\d|{_PER})",
+        re.IGNORECASE,
+    ),
+)
+# Denominators a score is rescaled from; any other fraction is not a score
+SCORE_SCALES = (5.0, 10.0, 100.0)
+
+
+def build_prompt(question: str, answer: str, structured: bool = False) -> str:
+    # Rubric (+ JSON schema) is a fixed prefix; only the Q/A pair varies
+    prefix = [EVALUATION_PROMPT]
+    if structured:
+        prefix.append(JSON_INSTRUCTIONS)
+    prefix.append("Evaluate the candidate answer below.")
+
+    return assemble(
+        prefix=prefix,
+        dynamic=[
+            ("Interview Question", fit_input(question, share=0.15)),
+            ("Candidate Answer", fit_input(answer, share=0.5)),
+        ],
+    )
+
+
+def _clamp(value) -> Optional[float]:
+    try:
+        return round(min(10.0, max(0.0, float(value))), 2)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_score(text: str) -> Optional[float]:
+    """
+    Best-effort 0–10 score from free-text feedback.
+    """
+    for pattern in SCORE_PATTERNS:
+        for match in pattern.finditer(text or ""):
+            value = float(match.group("value"))
+            scale = float(match.groupdict().get("scale") or 10)
+            if scale in SCORE_SCALES and value <= scale:
+                return _clamp(value * 10 / scale)
+    return None
+
+
+def extract_score(feedback: str) -> str:
+    return next(
+        (line for line in feedback.splitlines() if "score" in line.lower()),
+        "Score not found"
+    )
+
+
+def render_feedback(data: dict) -> str:
+    lines = [f"**Score:** {data['score']}/10" if data["score"] is not None else ""]
+
+    dims = data["dimensions"]
+    if any(v is not None for v in dims.values()):
+        lines.append("")
+        lines += [
+            f"- {name.replace('_', ' ').title()}: {value}/10"
+            for name, value in dims.items() if value is not None
+        ]
+
+    for key, heading in (
+        ("strengths", "What was done well"),
+        ("weaknesses", "What is missing or weak"),
+        ("suggestions", "Suggestions to improve"),
+    ):
+        items = data.get(key) or []
+        if items:
+            lines += ["", f"**{heading}:**"] + [f"- {item}" for item in items]
+
+    return "\n".join(lines).strip()
+
+
+def parse_evaluation(raw: str) -> dict:
+    """
+    Structured result from the model's JSON; falls back to text parsing.
+    """
+    try:
+        data = json.loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError("not an object")
+    except ValueError:
+        score = parse_score(raw)
+        return {
+            "score": score,
+            "score_label": f"Score: {score}/10" if score is not None else extract_score(raw),
+            "dimensions": {name: None for name in RUBRIC},
+            "feedback": raw,
+        }
+
+    dims = data.get("dimensions") or {}
+    result = {
+        "score": _clamp(data.get("score")),
+        "dimensions": {name: _clamp(dims.get(name)) for name in RUBRIC},
+        "strengths": [str(s) for s in data.get("strengths") or []],
+        "weaknesses": [str(s) for s in data.get("weaknesses") or []],
+        "suggestions": [str(s) for s in data.get("suggestions") or []],
+    }
+    if result["score"] is None:
+        known = [v for v in result["dimensions"].values() if v is not None]
+        result["score"] = round(sum(known) / len(known), 2) if known else None
+
+    result["score_label"] = (
+        f"Score: {result['score']}/10" if result["score"] is not None else "Score not found"
+    )
+    result["feedback"] = render_feedback(result)
+    return result
+
+
+def evaluate_answer(question: str, answer: str) -> dict:
+    raw = generate_answer(
+        build_prompt(question, answer, structured=True),
+        scope="evaluate",
+        response_format="json",
+    )
+    return parse_evaluation(raw)
+
+
+def stream_evaluation(question: str, answer: str):
+    return stream_answer(build_prompt(question, answer), scope="evaluate")
+
+
+async def evaluate_answer_async(question: str, answer: str, scope: str = "evaluate") -> dict:
+    raw = await generate_answer_async(
+        build_prompt(question, answer, structured=True),
+        scope=scope,
+        response_format="json",
+    )
+    return parse_evaluation(raw)
+
+
+async def evaluate_answers(
+    pairs: List[Tuple[str, str]],
+    concurrency: int = BATCH_CONCURRENCY,
+) -> AsyncIterator[Tuple[int, dict]]:
+    """
+    Yield (index, result) for each (question, answer) as it finishes.
+
+    Identical pairs are evaluated once and yielded for every index. A
+    failed item yields {"error": ...} instead of a result.
+    """
+    indexes = {}
+    for i, (question, answer) in enumerate(pairs):
+        indexes.setdefault((question.strip(), answer.strip()), []).append(i)
 
-def evaluate_answer(question: str, answer: str) -> str:
-    prompt = f"""
-{EVALUATION_PROMPT}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-Interview Question:
-{question}
+    async def run(key):
+        async with semaphore:
+            try:
+                # Below live /evaluate traffic in the scheduler
+                result = await evaluate_answer_async(*key, scope="evaluate_batch")
+            except LLMOverloaded as e:
+                return key, {"error": f"AI engine is busy ({e.queue_depth} queued)"}
+        if result["feedback"] == WARMING_UP_MESSAGE:
+            return key, {"error": WARMING_UP_MESSAGE}
+        return key, result
 
-Candidate Answer:
-{answer}
+    tasks = [asyncio.create_task(run(key)) for key in indexes]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            key, result = await finished
+            for i in indexes[key]:
+                yield i, result
+    finally:
+        # Client went away → don't keep evaluating
+        for task in tasks:
+            task.cancel()
 
-Provide evaluation now.
-"""
-    return generate_answer(prompt)
 
+def stream_evaluation_async(question: str, answer: str):
+    return stream_answer_async(build_prompt(question, answer), scope="evaluate")
@@ -1,31 +1,55 @@
-from rag.retrieve import query_articles
-from agents.llm import generate_answer
+import asyncio
 
-SYSTEM_PROMPT = """
+from rag.retrieve import build_context
+from agents.prompts import assemble, count_tokens, fit_input, static
+from agents.llm import (
+    generate_answer, stream_answer, generate_answer_async, stream_answer_async
+)
+
+SYSTEM_PROMPT = static("""
 You are a senior NVIDIA engineer conducting a technical interview.
 Answer concisely, deeply, and with system-level thinking.
 If context is provided, ground your answer in it.
-"""
+Answer as an NVIDIA interviewer would expect.
+""")
 
-def answer_question(question: str) -> str:
-    # Retrieve top-k relevant docs
-    docs = query_articles(question, k=3)
 
-    context = "\n\n".join(
-        f"- {d['content']}" for d in docs
-    ) or "No relevant documents found."
+def build_prompt(question: str) -> str:
+    # Static instructions first (prompt-cache friendly), then context + question
+    question = fit_input(question)
+    return assemble(
+        prefix=[SYSTEM_PROMPT],
+        # Hybrid (keyword + vector) hits, packed into what the window has left
+        context=lambda budget: build_context(
+            question, token_budget=budget, count_tokens=count_tokens
+        ),
+        dynamic=[("Question", question)],
+    )
 
-    prompt = f"""
-{SYSTEM_PROMPT}
 
-Context:
-{context}
+def answer_question(question: str) -> str:
+    return generate_answer(
+        build_prompt(question), scope="ask", semantic_key=question
+    )
 
-Question:
-{question}
 
-Answer as an NVIDIA interviewer would expect.
-"""
+def stream_answer_question(question: str):
+    return stream_answer(
+        build_prompt(question), scope="ask", semantic_key=question
+    )
+
+
+async def answer_question_async(question: str) -> str:
+    # Retrieval is CPU-bound (embedding) → keep it off the event loop
+    prompt = await asyncio.to_thread(build_prompt, question)
+    return await generate_answer_async(
+        prompt, scope="ask", semantic_key=question
+    )
 
-    return generate_answer(prompt)
 
+async def stream_answer_question_async(question: str):
+    prompt = await asyncio.to_thread(build_prompt, question)
+    async for token in stream_answer_async(
+        prompt, scope="ask", semantic_key=question
+    ):
+        yield token
@@ -1,32 +1,219 @@
+import os
+import random
+import threading
 import time
+import logging
+import json
+import asyncio
+from typing import AsyncIterator, Iterator, Optional
+
+import httpx
 import requests
-import os
+from requests.adapters import HTTPAdapter
+
+from agents.response_cache import get_response_cache, ttl_for
+from agents.llm_scheduler import get_llm_scheduler, priority_for
+from agents.singleflight import flight_key, get_singleflight
+
+logger = logging.getLogger(__name__)
 
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://ollama:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "phi3:mini")
 
-MAX_RETRIES = 6
-INITIAL_DELAY = 2  # seconds
+# Connection pool (shared by every thread in the worker process)
+POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "16"))
+# Async client: one event loop can hold many more in-flight calls
+ASYNC_POOL_SIZE = int(os.getenv("OLLAMA_ASYNC_POOL_SIZE", "256"))
+
+# Per-call timeouts (seconds)
+CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "120"))
+
+# Retry policy: full-jitter backoff bounded by an overall deadline
+MAX_RETRIES = int(os.getenv("OLLAMA_MAX_RETRIES", "6"))
+INITIAL_DELAY = float(os.getenv("OLLAMA_RETRY_INITIAL_DELAY", "0.5"))  # seconds
+MAX_DELAY = float(os.getenv("OLLAMA_RETRY_MAX_DELAY", "8"))  # seconds
+RETRY_DEADLINE = float(os.getenv("OLLAMA_RETRY_DEADLINE", "150"))  # seconds
+
+# Ollama runtime options sent with every call
+NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))  # context window (tokens)
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # keep weights + KV cache loaded
+
+WARMING_UP_MESSAGE = (
+    "⚠️ AI engine is warming up.\n\n"
+    "Please retry in a few seconds. "
+    "This usually happens only after startup."
+)
+
+
+class StreamInterrupted(Exception):
+    """
+    A stream broke after its first token: what was yielded is incomplete
+    and must not be cached or stored as an answer.
+    """
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide keep-alive session with a bounded connection pool.
+    """
+    global _session
+
+    if _session is not None:
+        return _session
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=POOL_SIZE,
+                max_retries=0,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+
+    return _session
+
+
+def close_session():
+    global _session
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Process-wide async client; created lazily on the running event loop.
+    """
+    global _async_client
+
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=ASYNC_POOL_SIZE,
+                max_keepalive_connections=ASYNC_POOL_SIZE,
+            ),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT, pool=None),
+        )
+
+    return _async_client
+
+
+async def close_async_client():
+    global _async_client
+
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def _payload(prompt: str, stream: bool, extra: Optional[dict] = None) -> dict:
+    return {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt,
+        "stream": stream,
+        "keep_alive": KEEP_ALIVE,
+        "options": {"num_ctx": NUM_CTX},
+        **(extra or {}),
+    }
+
 
+class GenerationStats:
+    """
+    Per-scope aggregates of Ollama's own timing fields.
 
-def generate_answer(prompt: str) -> str:
+    prompt_eval_count only counts tokens Ollama had to prefill; when the
+    prompt prefix is reused from its cache it is smaller than the prompt.
+    """
+
+    FIELDS = ("prompt_eval_count", "prompt_eval_duration", "eval_count",
+              "eval_duration", "load_duration", "total_duration")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scopes = {}
+
+    def record(self, scope: Optional[str], data: dict, prompt: str):
+        from agents.prompts import count_tokens
+
+        with self._lock:
+            entry = self._scopes.setdefault(scope or "default", {
+                "calls": 0, "prompt_tokens": 0, **{f: 0 for f in self.FIELDS},
+            })
+            entry["calls"] += 1
+            entry["prompt_tokens"] += count_tokens(prompt)
+            for field in self.FIELDS:
+                entry[field] += int(data.get(field) or 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for scope, e in self._scopes.items():
+                n = e["calls"] or 1
+                out[scope] = {
+                    "calls": e["calls"],
+                    "avg_prompt_tokens": round(e["prompt_tokens"] / n),
+                    "avg_prompt_eval_tokens": round(e["prompt_eval_count"] / n),
+                    "avg_prompt_eval_ms": round(e["prompt_eval_duration"] / n / 1e6, 1),
+                    "prefill_tokens_per_s": round(
+                        e["prompt_eval_count"] / (e["prompt_eval_duration"] / 1e9), 1
+                    ) if e["prompt_eval_duration"] else None,
+                    "avg_eval_ms": round(e["eval_duration"] / n / 1e6, 1),
+                    "avg_load_ms": round(e["load_duration"] / n / 1e6, 1),
+                    # Share of the (estimated) prompt served from Ollama's prompt cache
+                    "prefix_reuse": round(
+                        max(0.0, 1 - e["prompt_eval_count"] / e["prompt_tokens"]), 3
+                    ) if e["prompt_tokens"] else None,
+                }
+            return out
+
+
+generation_stats = GenerationStats()
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Full-jitter exponential backoff: uniform(0, min(MAX_DELAY, base * 2^n)).
+    """
+    return random.uniform(0, min(MAX_DELAY, INITIAL_DELAY * (2 ** (attempt - 1))))
+
+
+def _generate(
+    prompt: str,
+    timeout: Optional[float] = None,
+    extra: Optional[dict] = None,
+    scope: Optional[str] = None,
+) -> str:
+    deadline = time.monotonic() + RETRY_DEADLINE
+    read_timeout = timeout or READ_TIMEOUT
     last_error = None
-    delay = INITIAL_DELAY
 
     for attempt in range(1, MAX_RETRIES + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
         try:
-            response = requests.post(
+            response = get_session().post(
                 f"{OLLAMA_HOST}/api/generate",
-                json={
-                    "model": OLLAMA_MODEL,
-                    "prompt": prompt,
-                    "stream": False,
-                },
-                timeout=120,
+                json=_payload(prompt, stream=False, extra=extra),
+                timeout=(CONNECT_TIMEOUT, min(read_timeout, remaining)),
             )
 
             if response.status_code == 200:
                 data = response.json()
+                generation_stats.record(scope, data, prompt)
                 return data.get("response", "").strip()
 
             last_error = response.text
@@ -34,13 +221,360 @@ def generate_answer(prompt: str) -> str:
         except Exception as e:
             last_error = str(e)
 
-        # 🟡 Ollama warming up → wait and retry
+        if attempt == MAX_RETRIES:
+            break
+
+        # 🟡 Ollama warming up → wait (jittered, within deadline) and retry
+        delay = min(backoff_delay(attempt), deadline - time.monotonic())
+        if delay <= 0:
+            break
         time.sleep(delay)
-        delay *= 2
+
+    logger.warning(f"⚠️ LLM call failed after retries: {last_error}")
 
     # ✅ Graceful fallback instead of crashing API
-    return (
-        "⚠️ AI engine is warming up.\n\n"
-        "Please retry in a few seconds. "
-        "This usually happens only after startup."
+    return WARMING_UP_MESSAGE
+
+
+def _stream(
+    prompt: str, timeout: Optional[float] = None, scope: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Retries only happen before the first token is received; once output
+    has been yielded a broken stream raises StreamInterrupted.
+    """
+    deadline = time.monotonic() + RETRY_DEADLINE
+    read_timeout = timeout or READ_TIMEOUT
+    last_error = None
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        started = False
+        try:
+            with get_session().post(
+                f"{OLLAMA_HOST}/api/generate",
+                json=_payload(prompt, stream=True),
+                timeout=(CONNECT_TIMEOUT, min(read_timeout, remaining)),
+                stream=True,
+            ) as response:
+                if response.status_code == 200:
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        token = chunk.get("response", "")
+                        if token:
+                            started = True
+                            yield token
+                        if chunk.get("done"):
+                            generation_stats.record(scope, chunk, prompt)
+                            return
+                    last_error = "stream ended before the done chunk"
+                else:
+                    last_error = response.text
+
+        except Exception as e:
+            last_error = str(e)
+
+        if started:
+            logger.warning(f"⚠️ LLM stream interrupted: {last_error}")
+            raise StreamInterrupted(last_error)
+
+        if attempt == MAX_RETRIES:
+            break
+
+        delay = min(backoff_delay(attempt), deadline - time.monotonic())
+        if delay <= 0:
+            break
+        time.sleep(delay)
+
+    logger.warning(f"⚠️ LLM stream failed after retries: {last_error}")
+    yield WARMING_UP_MESSAGE
+
+
+async def _generate_async(
+    prompt: str,
+    timeout: Optional[float] = None,
+    extra: Optional[dict] = None,
+    scope: Optional[str] = None,
+    full: bool = False,
+):
+    """
+    Response text, or with full=True the whole Ollama response dict
+    (None after exhausting retries).
+    """
+    deadline = time.monotonic() + RETRY_DEADLINE
+    read_timeout = timeout or READ_TIMEOUT
+    last_error = None
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        try:
+            response = await get_async_client().post(
+                f"{OLLAMA_HOST}/api/generate",
+                json=_payload(prompt, stream=False, extra=extra),
+                timeout=httpx.Timeout(
+                    min(read_timeout, remaining), connect=CONNECT_TIMEOUT, pool=None
+                ),
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                generation_stats.record(scope, data, prompt)
+                return data if full else data.get("response", "").strip()
+
+            last_error = response.text
+
+        except Exception as e:
+            last_error = str(e)
+
+        if attempt == MAX_RETRIES:
+            break
+
+        delay = min(backoff_delay(attempt), deadline - time.monotonic())
+        if delay <= 0:
+            break
+        await asyncio.sleep(delay)
+
+    logger.warning(f"⚠️ LLM call failed after retries: {last_error}")
+    return None if full else WARMING_UP_MESSAGE
+
+
+async def _stream_async(
+    prompt: str, timeout: Optional[float] = None, scope: Optional[str] = None
+) -> AsyncIterator[str]:
+    deadline = time.monotonic() + RETRY_DEADLINE
+    read_timeout = timeout or READ_TIMEOUT
+    last_error = None
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        started = False
+        try:
+            async with get_async_client().stream(
+                "POST",
+                f"{OLLAMA_HOST}/api/generate",
+                json=_payload(prompt, stream=True),
+                timeout=httpx.Timeout(
+                    min(read_timeout, remaining), connect=CONNECT_TIMEOUT, pool=None
+                ),
+            ) as response:
+                if response.status_code == 200:
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        token = chunk.get("response", "")
+                        if token:
+                            started = True
+                            yield token
+                        if chunk.get("done"):
+                            generation_stats.record(scope, chunk, prompt)
+                            return
+                    last_error = "stream ended before the done chunk"
+                else:
+                    last_error = (await response.aread()).decode(errors="replace")
+
+        except Exception as e:
+            last_error = str(e)
+
+        if started:
+            logger.warning(f"⚠️ LLM stream interrupted: {last_error}")
+            raise StreamInterrupted(last_error)
+
+        if attempt == MAX_RETRIES:
+            break
+
+        delay = min(backoff_delay(attempt), deadline - time.monotonic())
+        if delay <= 0:
+            break
+        await asyncio.sleep(delay)
+
+    logger.warning(f"⚠️ LLM stream failed after retries: {last_error}")
+    yield WARMING_UP_MESSAGE
+
+
+# =========================================================
+# PUBLIC API
+#   response cache (per scope) → single-flight → admission queue → Ollama
+#
+#   `scope` names the calling endpoint ("ask", "evaluate", "plan", ...);
+#   it selects the cache TTL and the scheduling priority.
+# =========================================================
+def _cache_for(scope: Optional[str]):
+    return get_response_cache() if ttl_for(scope) > 0 else None
+
+
+def _extra(response_format) -> Optional[dict]:
+    return {"format": response_format} if response_format else None
+
+
+def _cache_prompt(prompt: str, extra: Optional[dict]) -> str:
+    # Same prompt with a different output format is a different entry
+    return prompt if not extra else f"{prompt}\0{json.dumps(extra, sort_keys=True)}"
+
+
+def _store(cache, scope, prompt, answer, started, semantic_key):
+    if cache and answer != WARMING_UP_MESSAGE:
+        cache.store(
+            scope, OLLAMA_MODEL, prompt, answer,
+            time.perf_counter() - started, semantic_key,
+        )
+
+
+def generate_answer(
+    prompt: str,
+    timeout: Optional[float] = None,
+    scope: Optional[str] = None,
+    semantic_key: Optional[str] = None,
+    response_format=None,
+) -> str:
+    """
+    `response_format` is passed to Ollama's `format` ("json" or a JSON schema).
+    """
+    extra = _extra(response_format)
+    cache_prompt = _cache_prompt(prompt, extra)
+
+    cache = _cache_for(scope)
+    if cache:
+        cached = cache.lookup(scope, OLLAMA_MODEL, cache_prompt, semantic_key)
+        if cached is not None:
+            return cached
+
+    def produce():
+        with get_llm_scheduler().slot(priority_for(scope)):
+            started = time.perf_counter()
+            answer = _generate(prompt, timeout, extra, scope)
+        _store(cache, scope, cache_prompt, answer, started, semantic_key)
+        return answer
+
+    return get_singleflight().do(flight_key(OLLAMA_MODEL, prompt, extra), produce)
+
+
+def stream_answer(
+    prompt: str,
+    timeout: Optional[float] = None,
+    scope: Optional[str] = None,
+    semantic_key: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Token-by-token variant of generate_answer.
+
+    Sync streams are not coalesced; the request path uses stream_answer_async.
+    """
+    cache = _cache_for(scope)
+    if cache:
+        cached = cache.lookup(scope, OLLAMA_MODEL, prompt, semantic_key)
+        if cached is not None:
+            yield cached
+            return
+
+    with get_llm_scheduler().slot(priority_for(scope)):
+        started = time.perf_counter()
+        parts = []
+        for token in _stream(prompt, timeout, scope):
+            parts.append(token)
+            yield token
+
+    # Not reached when the stream was cut off (StreamInterrupted)
+    _store(cache, scope, prompt, "".join(parts).strip(), started, semantic_key)
+
+
+async def generate_answer_async(
+    prompt: str,
+    timeout: Optional[float] = None,
+    scope: Optional[str] = None,
+    semantic_key: Optional[str] = None,
+    response_format=None,
+) -> str:
+    """
+    Non-blocking generate_answer on the shared httpx.AsyncClient.
+    """
+    extra = _extra(response_format)
+    cache_prompt = _cache_prompt(prompt, extra)
+
+    cache = _cache_for(scope)
+    if cache:
+        cached = await asyncio.to_thread(
+            cache.lookup, scope, OLLAMA_MODEL, cache_prompt, semantic_key
+        )
+        if cached is not None:
+            return cached
+
+    async def produce():
+        async with get_llm_scheduler().aslot(priority_for(scope)):
+            started = time.perf_counter()
+            answer = await _generate_async(prompt, timeout, extra, scope)
+        await asyncio.to_thread(
+            _store, cache, scope, cache_prompt, answer, started, semantic_key
+        )
+        return answer
+
+    return await get_singleflight().do_async(
+        flight_key(OLLAMA_MODEL, prompt, extra), produce
     )
+
+
+async def stream_answer_async(
+    prompt: str,
+    timeout: Optional[float] = None,
+    scope: Optional[str] = None,
+    semantic_key: Optional[str] = None,
+) -> AsyncIterator[str]:
+    cache = _cache_for(scope)
+    if cache:
+        cached = await asyncio.to_thread(
+            cache.lookup, scope, OLLAMA_MODEL, prompt, semantic_key
+        )
+        if cached is not None:
+            yield cached
+            return
+
+    async def produce():
+        async with get_llm_scheduler().aslot(priority_for(scope)):
+            started = time.perf_counter()
+            parts = []
+            async for token in _stream_async(prompt, timeout, scope):
+                parts.append(token)
+                yield token
+        # Not reached when the stream was cut off (StreamInterrupted)
+        await asyncio.to_thread(
+            _store, cache, scope, prompt, "".join(parts).strip(),
+            started, semantic_key,
+        )
+
+    async for token in get_singleflight().stream_async(
+        flight_key(OLLAMA_MODEL, prompt), produce
+    ):
+        yield token
+
+
+async def generate_with_context_async(
+    prompt: str,
+    context: Optional[list] = None,
+    timeout: Optional[float] = None,
+    scope: Optional[str] = None,
+):
+    """
+    Continue a conversation from Ollama's returned `context` tokens.
+
+    Returns (answer, new_context). The prompt only carries the new turn, so
+    earlier turns are not re-sent or re-tokenised. Conversation state is
+    private → no response cache or single-flight, just admission control.
+    """
+    extra = {"context": context} if context else None
+    async with get_llm_scheduler().aslot(priority_for(scope)):
+        data = await _generate_async(prompt, timeout, extra, scope, full=True)
+
+    if data is None:
+        return WARMING_UP_MESSAGE, context
+    return data.get("response", "").strip(), data.get("context") or context
@@ -0,0 +1,238 @@
+# agents/llm_scheduler.py
+"""
+Admission control in front of the single local Ollama backend.
+
+At most LLM_MAX_CONCURRENCY generations run at once; the rest wait in a
+priority queue (interactive ask/evaluate ahead of background plan/blog).
+When the queue is too deep a call is shed with LLMOverloaded, which the
+API turns into 503 + Retry-After.
+"""
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+# Background work is shed earlier so it never crowds out interactive users
+BACKGROUND_QUEUE_SHARE = float(os.getenv("LLM_BACKGROUND_QUEUE_SHARE", "0.5"))
+
+INTERACTIVE = 0
+NORMAL = 1
+BACKGROUND = 2
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", NORMAL: "normal", BACKGROUND: "background"}
+
+SCOPE_PRIORITIES = {
+    "ask": INTERACTIVE,
+    "evaluate": INTERACTIVE,
+    "evaluate_batch": NORMAL,
+    "question": INTERACTIVE,
+    "session": INTERACTIVE,
+    "summary": BACKGROUND,
+    "plan": BACKGROUND,
+    "blog": BACKGROUND,
+}
+
+
+def priority_for(scope: Optional[str]) -> int:
+    return SCOPE_PRIORITIES.get(scope, NORMAL)
+
+
+class LLMOverloaded(Exception):
+    def __init__(self, retry_after: int, queue_depth: int):
+        super().__init__(f"LLM queue full ({queue_depth} waiting)")
+        self.retry_after = retry_after
+        self.queue_depth = queue_depth
+
+
+class _Waiter:
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+        self.woken = False
+        self.cancelled = False
+
+    def wake(self):
+        self.woken = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class _Timings:
+    def __init__(self):
+        self.admitted = 0
+        self.shed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.service_total = 0.0
+        self.service_max = 0.0
+
+    def as_dict(self) -> dict:
+        n = self.admitted or 1
+        return {
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "avg_wait_ms": round(self.wait_total / n * 1000, 1),
+            "max_wait_ms": round(self.wait_max * 1000, 1),
+            "avg_service_ms": round(self.service_total / n * 1000, 1),
+            "max_service_ms": round(self.service_max * 1000, 1),
+        }
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, max_queue: int = MAX_QUEUE):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queue = []
+        self._seq = itertools.count()
+        self._timings = {p: _Timings() for p in PRIORITY_NAMES}
+        self._service_ewma = 30.0  # seconds; refined as calls complete
+
+    def _queue_limit(self, priority: int) -> int:
+        if priority == BACKGROUND:
+            return max(1, int(self.max_queue * BACKGROUND_QUEUE_SHARE))
+        return self.max_queue
+
+    def _overloaded(self, priority: int) -> LLMOverloaded:
+        depth = len(self._queue)
+        retry_after = math.ceil((depth + 1) * self._service_ewma / self.max_concurrency)
+        self._timings[priority].shed += 1
+        return LLMOverloaded(max(1, retry_after), depth)
+
+    def ensure_capacity(self, priority: int = NORMAL):
+        """
+        Raise LLMOverloaded now if a call at `priority` would be shed.
+
+        Used before starting a streaming response, where a 503 can no longer
+        be sent once the first byte is out.
+        """
+        with self._lock:
+            if (
+                self._active >= self.max_concurrency
+                and len(self._queue) >= self._queue_limit(priority)
+            ):
+                raise self._overloaded(priority)
+
+    def _admit(self, priority: int, waiter: _Waiter) -> bool:
+        """
+        True → slot granted now; False → queued (waiter is woken later).
+        """
+        with self._lock:
+            if self._active < self.max_concurrency and not self._queue:
+                self._active += 1
+                return True
+
+            if len(self._queue) >= self._queue_limit(priority):
+                raise self._overloaded(priority)
+
+            heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+            return False
+
+    def _release(self):
+        with self._lock:
+            while self._queue:
+                _, _, waiter = heapq.heappop(self._queue)
+                if not waiter.cancelled:
+                    # Hand the slot straight to the next waiter
+                    waiter.wake()
+                    return
+            self._active -= 1
+
+    def _record(self, priority: int, waited: float, served: float):
+        with self._lock:
+            timings = self._timings[priority]
+            timings.admitted += 1
+            timings.wait_total += waited
+            timings.wait_max = max(timings.wait_max, waited)
+            timings.service_total += served
+            timings.service_max = max(timings.service_max, served)
+            self._service_ewma = 0.8 * self._service_ewma + 0.2 * served
+
+    @contextmanager
+    def slot(self, priority: int = NORMAL):
+        queued_at = time.perf_counter()
+        waiter = _Waiter()
+        if not self._admit(priority, waiter):
+            waiter.event.wait()
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release()
+            self._record(priority, started - queued_at, time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def aslot(self, priority: int = NORMAL):
+        queued_at = time.perf_counter()
+        waiter = _Waiter(asyncio.get_running_loop())
+        if not self._admit(priority, waiter):
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    handed_over = waiter.woken
+                    waiter.cancelled = True
+                    if not handed_over:
+                        self._queue = [e for e in self._queue if e[2] is not waiter]
+                        heapq.heapify(self._queue)
+                if handed_over:
+                    self._release()
+                raise
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release()
+            self._record(priority, started - queued_at, time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, waiter in self._queue:
+                if not waiter.cancelled:
+                    queued[PRIORITY_NAMES[priority]] += 1
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": queued,
+                "est_service_seconds": round(self._service_ewma, 2),
+                "by_priority": {
+                    PRIORITY_NAMES[p]: t.as_dict() for p, t in self._timings.items()
+                },
+            }
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    global _scheduler
+
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+
+    return _scheduler
@@ -4,11 +4,9 @@ from zoneinfo import ZoneInfo
 
 def get_today_plan():
     """
-    Public planner interface.
-    Called by:
-    - FastAPI
-    - Streamlit UI
-    - Background jobs (later)
+    Public planner interface: a fresh plan on every call.
+    The API's stored daily plan does not come from here; api.daily
+    calls agents.planner_agent.generate_daily_plan directly.
     """
 
     tz = ZoneInfo("Asia/Kolkata")
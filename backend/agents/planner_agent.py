@@ -1,10 +1,14 @@
+import asyncio
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from rag.retrieve import query_articles
-from agents.llm import generate_answer
+from rag.retrieve import build_context
+from agents.prompts import assemble, count_tokens, static
+from agents.llm import (
+    generate_answer, stream_answer, generate_answer_async, stream_answer_async
+)
 
-SYSTEM_PROMPT = """
+SYSTEM_PROMPT = static("""
 You are a Principal DevOps / Platform Engineer interviewing at NVIDIA.
 
 Your responsibility:
@@ -20,36 +24,9 @@ Core evaluation dimensions at this level:
 - Clear reasoning under constraints
 
 This is NOT entry-level DevOps.
-"""
-
-def generate_daily_plan():
-    # 🇮🇳 India timezone
-    tz = ZoneInfo("Asia/Kolkata")
-    now = datetime.now(tz)
-
-    today = now.strftime("%A, %d %B %Y")
-
-    # Pull RAG context focused on GPU infra + DevOps
-    docs = query_articles(
-        query=(
-            "NVIDIA GPU infrastructure Kubernetes CUDA "
-            "performance optimization DevOps MLOps SRE"
-        ),
-        k=3
-    )
-
-    context = "\n".join(
-        f"- {d.get('content', '')[:500]}" for d in docs
-    ) or "No specific reference context available."
-
-    prompt = f"""
-{SYSTEM_PROMPT}
-
-Date: {today}
-
-Reference Context (optional background):
-{context}
+""")
 
+PLAN_TASK = static("""
 TASK:
 Create a **2-hour senior DevOps interview preparation plan**.
 
@@ -89,7 +66,44 @@ Rules:
 - Avoid generic DevOps buzzwords
 - Assume interviewer challenges every decision
 - Prioritize reasoning, trade-offs, and impact
-"""
+""")
+
+# Pull RAG context focused on GPU infra + DevOps
+PLAN_QUERY = (
+    "NVIDIA GPU infrastructure Kubernetes CUDA "
+    "performance optimization DevOps MLOps SRE"
+)
+
+def build_plan_prompt():
+    # 🇮🇳 India timezone
+    today = datetime.now(ZoneInfo("Asia/Kolkata")).strftime("%A, %d %B %Y")
+
+    # Static persona + format first; only the date and context vary
+    return assemble(
+        prefix=[SYSTEM_PROMPT, PLAN_TASK],
+        context=lambda budget: build_context(
+            PLAN_QUERY, token_budget=budget, count_tokens=count_tokens
+        ),
+        empty_context="No specific reference context available.",
+        context_label="Reference Context (optional background)",
+        dynamic=[("Date", today)],
+    )
+
+
+def generate_daily_plan():
+    return generate_answer(build_plan_prompt(), scope="plan")
+
+
+def stream_daily_plan():
+    return stream_answer(build_plan_prompt(), scope="plan")
+
+
+async def generate_daily_plan_async():
+    prompt = await asyncio.to_thread(build_plan_prompt)
+    return await generate_answer_async(prompt, scope="plan")
 
-    return generate_answer(prompt)
 
+async def stream_daily_plan_async():
+    prompt = await asyncio.to_thread(build_plan_prompt)
+    async for token in stream_answer_async(prompt, scope="plan"):
+        yield token
@@ -0,0 +1,112 @@
+# agents/prompts.py
+"""
+Shared prompt layout for every agent.
+
+Static text (system prompt, task instructions, output format) comes
+first and is normalised once at import, so its bytes — and therefore its
+tokens — are identical on every call and Ollama can reuse the KV cache
+for that prefix. Per-call text (date, retrieved context, the question)
+comes last, and the whole prompt is kept inside the context window.
+"""
+from typing import Callable, List, Optional, Tuple
+import logging
+import os
+import re
+import textwrap
+
+from agents.llm import NUM_CTX
+from rag.hybrid import CONTEXT_TOKENS as MAX_CONTEXT_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# Tokens kept free for the model's answer
+RESERVED_OUTPUT_TOKENS = int(os.getenv("PROMPT_RESERVED_OUTPUT_TOKENS", "1024"))
+# Optional tokenizer.json for exact counts (e.g. the served model's); else estimate
+TOKENIZER_PATH = os.getenv("PROMPT_TOKENIZER_PATH", "")
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_tokenizer = None
+
+
+def _load_tokenizer():
+    global _tokenizer, TOKENIZER_PATH
+
+    if _tokenizer is None and TOKENIZER_PATH:
+        try:
+            from tokenizers import Tokenizer
+            _tokenizer = Tokenizer.from_file(TOKENIZER_PATH)
+        except Exception as e:
+            logger.warning(f"⚠️ Prompt tokenizer unavailable, estimating: {e}")
+            TOKENIZER_PATH = ""
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """
+    Local token count: exact with PROMPT_TOKENIZER_PATH, otherwise a
+    SentencePiece-style estimate (long words split into ~4-char pieces,
+    punctuation is its own token).
+    """
+    if not text:
+        return 0
+    tokenizer = _load_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text).ids)
+    return sum(max(1, (len(piece) + 3) // 4) for piece in _PIECE_RE.findall(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    if count_tokens(text) <= max_tokens:
+        return text
+    # Binary search on characters; counts are monotonic enough for this
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low].rstrip() + " …"
+
+
+def static(text: str) -> str:
+    """
+    Canonical form of a prompt constant: dedented, trailing spaces and
+    surrounding blank lines stripped.
+    """
+    lines = textwrap.dedent(text).strip().splitlines()
+    return "\n".join(line.rstrip() for line in lines)
+
+
+def prompt_budget() -> int:
+    return NUM_CTX - RESERVED_OUTPUT_TOKENS
+
+
+def assemble(
+    prefix: List[str],
+    dynamic: List[Tuple[str, str]],
+    context: Optional[Callable[[int], str]] = None,
+    empty_context: str = "No relevant documents found.",
+    context_label: str = "Context",
+) -> str:
+    """
+    prefix   → static blocks, emitted first and verbatim
+    context  → called with the tokens left in the budget; returns packed text
+    dynamic  → (label, text) blocks emitted last
+    """
+    head = "\n\n".join(prefix) + "\n\n"
+    tail = "\n\n".join(f"{label}:\n{text.strip()}" for label, text in dynamic) + "\n"
+
+    if context is None:
+        return head + tail
+
+    remaining = prompt_budget() - count_tokens(head) - count_tokens(tail) - 16
+    packed = context(min(MAX_CONTEXT_TOKENS, remaining)) if remaining > 0 else ""
+    return head + f"{context_label}:\n{packed.strip() or empty_context}\n\n" + tail
+
+
+def fit_input(text: str, share: float = 0.25) -> str:
+    """
+    Cap user-supplied text to a share of the prompt budget.
+    """
+    return truncate_tokens(text.strip(), int(prompt_budget() * share))
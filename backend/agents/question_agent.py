@@ -1,12 +1,15 @@
-from agents.llm import generate_answer
+from agents.prompts import static
+from agents.llm import generate_answer, generate_answer_async
 
-QUESTION_PROMPT = """
+QUESTION_PROMPT = static("""
 You are a senior NVIDIA interviewer.
 Generate ONE clear, technical interview question.
 Focus on CUDA, GPU architecture, performance, or system design.
 Do not provide the answer.
-"""
+""")
 
 def generate_interview_question():
-    return generate_answer(QUESTION_PROMPT)
+    return generate_answer(QUESTION_PROMPT, scope="question")
 
+async def generate_interview_question_async():
+    return await generate_answer_async(QUESTION_PROMPT, scope="question")
@@ -0,0 +1,270 @@
+# agents/response_cache.py
+"""
+SQLite-backed cache of LLM completions.
+
+Entries are keyed by (scope, model, prompt hash). A scope can also match
+on the cosine similarity of a short "semantic key" (e.g. the user's
+question) so near-identical questions reuse an answer. Caching is opt-in
+per scope: a scope with TTL 0 is never cached.
+"""
+from array import array
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "/data/llm_cache.db")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+# Cosine similarity of semantic keys; 0 disables semantic matching
+SEMANTIC_THRESHOLD = float(os.getenv("LLM_CACHE_SEMANTIC_THRESHOLD", "0.95"))
+SEMANTIC_SCAN_LIMIT = int(os.getenv("LLM_CACHE_SEMANTIC_SCAN_LIMIT", "1000"))
+
+# Per-endpoint opt-in (seconds). Evaluations must stay fresh → never cached.
+CACHE_TTLS = {
+    "plan": float(os.getenv("LLM_CACHE_TTL_PLAN", str(6 * 3600))),
+    "blog": float(os.getenv("LLM_CACHE_TTL_BLOG", str(6 * 3600))),
+    "ask": float(os.getenv("LLM_CACHE_TTL_ASK", "3600")),
+    "question": float(os.getenv("LLM_CACHE_TTL_QUESTION", "0")),
+    "evaluate": 0.0,
+}
+# Same prompt every day, different answer: keyed per Asia/Kolkata day
+DAILY_SCOPES = ("plan", "blog")
+TZ = ZoneInfo("Asia/Kolkata")
+
+
+def ttl_for(scope: Optional[str]) -> float:
+    return CACHE_TTLS.get(scope, 0.0) if scope else 0.0
+
+
+def prompt_key(scope: str, model: str, prompt: str) -> str:
+    if scope in DAILY_SCOPES:
+        scope = f"{scope}@{datetime.now(TZ):%Y-%m-%d}"
+    return hashlib.sha256(f"{scope}\0{model}\0{prompt}".encode()).hexdigest()
+
+
+def _embed(text: str):
+    """
+    Unit-normalised float32 embedding of `text`, or None without a model.
+    """
+    from rag.embed_store import get_embeddings
+    import numpy as np
+
+    embeddings = get_embeddings()
+    if not embeddings:
+        return None
+
+    vector = np.asarray(embeddings.embed_query(text), dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str = RESPONSE_CACHE_PATH,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        semantic_threshold: float = SEMANTIC_THRESHOLD,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.semantic_threshold = semantic_threshold
+        self._lock = threading.Lock()
+        self._conn = None
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                " key TEXT PRIMARY KEY,"
+                " scope TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " embedding BLOB,"
+                " generation_seconds REAL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_responses_scope"
+                " ON llm_responses (scope, model, expires_at)"
+            )
+            self._conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ LLM response cache disabled: {e}")
+            self._conn = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def lookup(
+        self,
+        scope: str,
+        model: str,
+        prompt: str,
+        semantic_key: Optional[str] = None,
+    ) -> Optional[str]:
+        if not self.enabled or ttl_for(scope) <= 0:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, generation_seconds FROM llm_responses"
+                " WHERE key = ? AND expires_at > ?",
+                (prompt_key(scope, model, prompt), now),
+            ).fetchone()
+
+        if row:
+            self._hit("exact", row[1])
+            return row[0]
+
+        if semantic_key and self.semantic_threshold > 0:
+            hit = self._semantic_lookup(scope, model, semantic_key, now)
+            if hit:
+                self._hit("semantic", hit[1])
+                return hit[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _semantic_lookup(self, scope, model, semantic_key, now):
+        import numpy as np
+
+        try:
+            query = _embed(semantic_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Semantic cache lookup skipped: {e}")
+            return None
+        if query is None:
+            return None
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT response, generation_seconds, embedding FROM llm_responses"
+                " WHERE scope = ? AND model = ? AND expires_at > ?"
+                " AND embedding IS NOT NULL"
+                " ORDER BY created_at DESC LIMIT ?",
+                (scope, model, now, SEMANTIC_SCAN_LIMIT),
+            ).fetchall()
+
+        if not rows:
+            return None
+
+        matrix = np.stack([np.frombuffer(r[2], dtype=np.float32) for r in rows])
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+
+        if scores[best] >= self.semantic_threshold:
+            return rows[best][0], rows[best][1]
+        return None
+
+    def _hit(self, kind: str, generation_seconds: Optional[float]):
+        with self._lock:
+            if kind == "exact":
+                self.exact_hits += 1
+            else:
+                self.semantic_hits += 1
+            self.saved_seconds += generation_seconds or 0.0
+
+    def store(
+        self,
+        scope: str,
+        model: str,
+        prompt: str,
+        response: str,
+        generation_seconds: float,
+        semantic_key: Optional[str] = None,
+    ):
+        ttl = ttl_for(scope)
+        if not self.enabled or ttl <= 0 or not response:
+            return
+
+        embedding = None
+        if semantic_key and self.semantic_threshold > 0:
+            try:
+                vector = _embed(semantic_key)
+                if vector is not None:
+                    embedding = array("f", vector.tolist()).tobytes()
+            except Exception as e:
+                logger.warning(f"⚠️ Semantic cache key not stored: {e}")
+
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses"
+                    " (key, scope, model, response, embedding,"
+                    "  generation_seconds, created_at, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        prompt_key(scope, model, prompt), scope, model, response,
+                        embedding, generation_seconds, now, now + ttl,
+                    ),
+                )
+                self._evict(now)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ LLM response cache write failed: {e}")
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+        self._conn.execute(
+            "DELETE FROM llm_responses WHERE key IN ("
+            " SELECT key FROM llm_responses ORDER BY created_at DESC"
+            " LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = 0
+            if self.enabled:
+                entries = self._conn.execute(
+                    "SELECT COUNT(*) FROM llm_responses"
+                ).fetchone()[0]
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": entries,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "ttls": CACHE_TTLS,
+            }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    global _cache
+
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+
+    return _cache
@@ -0,0 +1,121 @@
+"""
+Follow-up questions for multi-round interview sessions.
+
+Each question is generated by continuing Ollama's `context` from the
+previous turn, so only the candidate's new answer is prefilled. When the
+carried context would no longer fit the window, the conversation is
+restarted from the static prompt + rolling summary + the last few turns,
+which keeps every prompt bounded however long the session runs.
+"""
+import os
+from typing import List, Optional
+
+from agents.prompts import assemble, count_tokens, fit_input, prompt_budget, static, truncate_tokens
+from agents.llm import WARMING_UP_MESSAGE, generate_answer_async, generate_with_context_async
+
+# Answered turns kept verbatim; older ones are folded into the summary
+RECENT_TURNS = int(os.getenv("SESSION_RECENT_TURNS", "2"))
+SUMMARY_TOKENS = int(os.getenv("SESSION_SUMMARY_TOKENS", "300"))
+
+INTERVIEWER_PROMPT = static("""
+You are a senior NVIDIA engineer running a multi-round technical interview.
+Ask ONE question at a time and never answer it yourself.
+Build on the candidate's previous answers: probe gaps and hand-waving,
+go one level deeper on strong answers, and move to a related area once a
+topic is well covered.
+Focus on CUDA, GPU architecture, performance, or system design.
+Reply with the question only.
+""")
+
+SUMMARY_PROMPT = static("""
+You keep running notes on a technical interview.
+Merge the new exchanges into the notes: topics covered, what the candidate
+got right, gaps and misconceptions, and how the difficulty has progressed.
+Reply with the updated notes only, in at most 150 words.
+""")
+
+FIRST_TASK = "Ask the first question."
+NEXT_TASK = "Ask the next question."
+
+
+def render_turns(turns: List[dict]) -> str:
+    return "\n\n".join(
+        f"Q{t['position'] + 1}: {t['question']}\n"
+        f"A{t['position'] + 1}: {fit_input(t['answer'] or '', share=0.1)}"
+        for t in turns
+    )
+
+
+def _topic(topic: Optional[str]) -> str:
+    return topic or "Any NVIDIA engineering area"
+
+
+def restart_prompt(topic: Optional[str], summary: Optional[str], turns: List[dict]) -> str:
+    dynamic = [("Topic", _topic(topic))]
+    if summary:
+        dynamic.append(("Interview notes so far", summary))
+    if turns:
+        dynamic.append(("Recent exchanges", render_turns(turns)))
+    dynamic.append(("Task", NEXT_TASK if turns else FIRST_TASK))
+    return assemble(prefix=[INTERVIEWER_PROMPT], dynamic=dynamic)
+
+
+def continuation_prompt(answer: str) -> str:
+    # The previous question is already in the carried context
+    return f"Candidate answer:\n{fit_input(answer, share=0.25)}\n\n{NEXT_TASK}\n"
+
+
+def fits(context: Optional[list], prompt: str) -> bool:
+    return bool(context) and len(context) + count_tokens(prompt) <= prompt_budget()
+
+
+async def first_question(topic: Optional[str] = None):
+    """
+    (question, context) for a new session.
+    """
+    return await generate_with_context_async(
+        restart_prompt(topic, None, []), scope="session"
+    )
+
+
+async def next_question(
+    answer: str,
+    context: Optional[list],
+    topic: Optional[str],
+    summary: Optional[str],
+    recent: List[dict],
+):
+    """
+    (question, context, reused) for the turn after `answer`.
+
+    `recent` are the answered turns not yet in `summary`, including the
+    one just answered; they are only used when the context is rebuilt.
+    """
+    prompt = continuation_prompt(answer)
+    if fits(context, prompt):
+        question, context = await generate_with_context_async(
+            prompt, context=context, scope="session"
+        )
+        return question, context, True
+
+    question, context = await generate_with_context_async(
+        restart_prompt(topic, summary, recent[-RECENT_TURNS:]), scope="session"
+    )
+    return question, context, False
+
+
+async def summarize(summary: Optional[str], turns: List[dict]) -> Optional[str]:
+    """
+    Fold `turns` into the running notes; None if the model is unavailable.
+    """
+    prompt = assemble(
+        prefix=[SUMMARY_PROMPT],
+        dynamic=[
+            ("Current notes", summary or "None yet."),
+            ("New exchanges", render_turns(turns)),
+        ],
+    )
+    notes = await generate_answer_async(prompt, scope="summary")
+    if not notes or notes == WARMING_UP_MESSAGE:
+        return None
+    return truncate_tokens(notes, SUMMARY_TOKENS)
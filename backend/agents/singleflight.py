@@ -0,0 +1,334 @@
+# agents/singleflight.py
+"""
+Request coalescing for identical in-flight LLM prompts.
+
+Within a process, concurrent callers with the same key share one
+upstream generation (threads, asyncio tasks, and token streams). Across
+uvicorn worker processes a SQLite lease file makes one worker the
+leader for a key; the others poll until it publishes the result.
+"""
+from typing import AsyncIterator, Callable, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+CROSS_PROCESS = os.getenv("LLM_SINGLEFLIGHT_CROSS_PROCESS", "true").lower() == "true"
+LEASE_PATH = os.getenv("LLM_SINGLEFLIGHT_PATH", "/data/llm_singleflight.db")
+LEASE_TTL = float(os.getenv("LLM_SINGLEFLIGHT_LEASE_TTL", "300"))  # seconds
+POLL_INTERVAL = float(os.getenv("LLM_SINGLEFLIGHT_POLL_INTERVAL", "0.25"))
+RESULT_RETENTION = 60  # seconds a published result stays readable
+
+
+def flight_key(model: str, prompt: str, extra: Optional[dict] = None) -> str:
+    raw = json.dumps([model, prompt, extra or {}], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class LeaseStore:
+    """
+    Cross-process leader election + result hand-off in a local SQLite file.
+    """
+
+    def __init__(self, path: str = LEASE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def acquire(self, key: str, owner: str, ttl: float = LEASE_TTL) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM leases WHERE key = ? AND expires_at <= ?", (key, now)
+            )
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, owner, now + ttl),
+            )
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def release(self, key: str, owner: str, result: Optional[str]):
+        now = time.time()
+        with self._lock:
+            if result is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, response, created_at)"
+                    " VALUES (?, ?, ?)",
+                    (key, result, now),
+                )
+            self._conn.execute(
+                "DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner)
+            )
+            self._conn.execute(
+                "DELETE FROM results WHERE created_at < ?", (now - RESULT_RETENTION,)
+            )
+            self._conn.commit()
+
+    def result_since(self, key: str, since: float) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM results WHERE key = ? AND created_at >= ?",
+                (key, since),
+            ).fetchone()
+        return row[0] if row else None
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class _Broadcast:
+    """
+    Token fan-out: every subscriber replays what it missed, then follows live.
+    """
+
+    def __init__(self):
+        self.tokens = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._cond = asyncio.Condition()
+
+    async def push(self, token: str):
+        async with self._cond:
+            self.tokens.append(token)
+            self._cond.notify_all()
+
+    async def close(self, error: Optional[BaseException] = None):
+        async with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        seen = 0
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: len(self.tokens) > seen or self.done)
+                fresh = self.tokens[seen:]
+                done = self.done
+
+            for token in fresh:
+                yield token
+            seen += len(fresh)
+
+            if done and seen >= len(self.tokens):
+                if self.error:
+                    raise self.error
+                return
+
+
+class SingleFlight:
+    def __init__(self, leases: Optional[LeaseStore] = None):
+        self.leases = leases
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+        self._streams = {}
+
+        self.leaders = 0
+        self.followers = 0
+        self.remote_followers = 0
+
+    # ---------- cross-process lease ----------
+    def _run_leased(self, key: str, fn: Callable[[], str]) -> str:
+        if self.leases is None:
+            return fn()
+
+        owner = uuid.uuid4().hex
+        waiting_since = time.time()
+        deadline = time.monotonic() + LEASE_TTL
+
+        while True:
+            # A peer finished this prompt while we waited → reuse its result
+            result = self.leases.result_since(key, waiting_since)
+            if result is not None:
+                self.remote_followers += 1
+                return result
+
+            if self.leases.acquire(key, owner):
+                result = None
+                try:
+                    result = fn()
+                    return result
+                finally:
+                    self.leases.release(key, owner, result)
+
+            if time.monotonic() > deadline:
+                return fn()
+            time.sleep(POLL_INTERVAL)
+
+    async def _wait_remote(self, key: str, owner: str, waiting_since: float):
+        """
+        Poll until we hold the lease (True) or a peer published a result (str).
+        """
+        deadline = time.monotonic() + LEASE_TTL
+        while True:
+            result = await asyncio.to_thread(self.leases.result_since, key, waiting_since)
+            if result is not None:
+                self.remote_followers += 1
+                return result
+
+            if await asyncio.to_thread(self.leases.acquire, key, owner):
+                return True
+
+            if time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def _run_leased_async(self, key: str, fn) -> str:
+        if self.leases is None:
+            return await fn()
+
+        owner = uuid.uuid4().hex
+        outcome = await self._wait_remote(key, owner, time.time())
+        if isinstance(outcome, str):
+            return outcome
+
+        result = None
+        try:
+            result = await fn()
+            return result
+        finally:
+            if outcome:
+                await asyncio.to_thread(self.leases.release, key, owner, result)
+
+    # ---------- threads ----------
+    def do(self, key: str, fn: Callable[[], str]) -> str:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_leased(key, fn)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    # ---------- asyncio ----------
+    async def do_async(self, key: str, fn) -> str:
+        """
+        `fn` is an async callable; the shared task survives caller cancellation.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(self._run_leased_async(key, fn))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.followers += 1
+
+        return await asyncio.shield(task)
+
+    async def stream_async(self, key: str, fn) -> AsyncIterator[str]:
+        """
+        `fn` returns an async token iterator; followers join the live stream.
+        """
+        flight = self._streams.get(key)
+        if flight is None:
+            self.leaders += 1
+            flight = _Broadcast()
+            self._streams[key] = flight
+            asyncio.ensure_future(self._pump(key, flight, fn))
+        else:
+            self.followers += 1
+
+        async for token in flight.subscribe():
+            yield token
+
+    async def _pump(self, key: str, flight: _Broadcast, fn):
+        owner = uuid.uuid4().hex
+        error = None
+        try:
+            outcome = True
+            if self.leases is not None:
+                outcome = await self._wait_remote(key, owner, time.time())
+
+            if isinstance(outcome, str):
+                await flight.push(outcome)
+                return
+
+            # Only a stream that ran to the end is published; after an error
+            # (e.g. StreamInterrupted) other processes regenerate instead of
+            # taking the truncated text
+            result = None
+            try:
+                async for token in fn():
+                    await flight.push(token)
+                result = "".join(flight.tokens)
+            finally:
+                if self.leases is not None and outcome:
+                    await asyncio.to_thread(self.leases.release, key, owner, result)
+
+        except Exception as e:
+            error = e
+        finally:
+            self._streams.pop(key, None)
+            await flight.close(error)
+
+    def stats(self) -> dict:
+        return {
+            "cross_process": self.leases is not None,
+            "in_flight": len(self._calls) + len(self._tasks) + len(self._streams),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "remote_followers": self.remote_followers,
+        }
+
+
+_flights: Optional[SingleFlight] = None
+_flights_lock = threading.Lock()
+
+
+def get_singleflight() -> SingleFlight:
+    global _flights
+
+    if _flights is None:
+        with _flights_lock:
+            if _flights is None:
+                leases = None
+                if CROSS_PROCESS:
+                    try:
+                        leases = LeaseStore()
+                    except Exception as e:
+                        logger.warning(f"⚠️ Cross-process single-flight disabled: {e}")
+                _flights = SingleFlight(leases)
+
+    return _flights
@@ -1,16 +1,31 @@
-from agents.llm import generate_answer
+from agents.prompts import static
+from agents.llm import (
+    generate_answer, stream_answer, generate_answer_async, stream_answer_async
+)
 from datetime import datetime
 
-BLOG_PROMPT = """
+BLOG_PROMPT = static("""
 Write a senior-level DevOps engineering blog.
 Topic should be practical, production-focused, and concise.
-"""
-
-def generate_daily_blog():
-    content = generate_answer(BLOG_PROMPT)
+""")
 
+def extract_title(content: str) -> str:
     title = "Daily DevOps Insight"
     if content and len(content.splitlines()) > 0:
         title = content.splitlines()[0][:80]
 
-    return title, content
+    return title
+
+def generate_daily_blog():
+    content = generate_answer(BLOG_PROMPT, scope="blog")
+    return extract_title(content), content
+
+def stream_daily_blog():
+    return stream_answer(BLOG_PROMPT, scope="blog")
+
+async def generate_daily_blog_async():
+    content = await generate_answer_async(BLOG_PROMPT, scope="blog")
+    return extract_title(content), content
+
+def stream_daily_blog_async():
+    return stream_answer_async(BLOG_PROMPT, scope="blog")
@@ -0,0 +1,228 @@
+# api/daily.py
+"""
+Daily plan / blog, generated once per Asia/Kolkata day and served from the DB.
+
+A background thread precomputes today's content shortly after midnight
+IST. Requests that arrive before it is ready go through a per-(kind, day)
+single-flight lock, so concurrent first requests trigger one generation.
+"""
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.exc import IntegrityError
+
+from agents.llm import WARMING_UP_MESSAGE, StreamInterrupted
+from agents.planner_agent import generate_daily_plan, stream_daily_plan_async
+from api.blog import generate_daily_blog, stream_daily_blog_async, extract_title
+from api.database import SessionLocal
+from api import models
+
+logger = logging.getLogger(__name__)
+
+TZ = ZoneInfo("Asia/Kolkata")
+PRECOMPUTE_ENABLED = os.getenv("DAILY_PRECOMPUTE_ENABLED", "true").lower() == "true"
+PRECOMPUTE_AT = os.getenv("DAILY_PRECOMPUTE_AT", "00:05")  # HH:MM, IST
+PRECOMPUTE_RETRY_SECONDS = float(os.getenv("DAILY_PRECOMPUTE_RETRY_SECONDS", "300"))
+PLAN_TITLE = "Daily Interview Prep Plan"
+
+_locks: dict = {}
+_locks_guard = threading.Lock()
+
+
+def today_key(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(TZ)).strftime("%Y-%m-%d")
+
+
+def _lock_for(kind: str, day: str) -> threading.Lock:
+    with _locks_guard:
+        # Drop locks for past days so the dict stays tiny
+        for key in [k for k in _locks if k[1] != day and not _locks[k].locked()]:
+            del _locks[key]
+        return _locks.setdefault((kind, day), threading.Lock())
+
+
+def _as_dict(row: models.DailyContent) -> dict:
+    return {
+        "kind": row.kind,
+        "day": row.day,
+        "title": row.title,
+        "content": row.content,
+        "created_at": row.created_at,
+    }
+
+
+def load(kind: str, day: str) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        row = db.query(models.DailyContent).filter_by(kind=kind, day=day).first()
+        return _as_dict(row) if row else None
+    finally:
+        db.close()
+
+
+def save(kind: str, day: str, content: str) -> Optional[dict]:
+    """
+    Insert the day's content once; a concurrent winner's row is returned instead.
+    """
+    if not content or content == WARMING_UP_MESSAGE:
+        return None
+
+    title = extract_title(content) if kind == "blog" else PLAN_TITLE
+
+    db = SessionLocal()
+    try:
+        db.add(models.DailyContent(kind=kind, day=day, title=title, content=content))
+        if kind == "blog":
+            # Blog history keeps exactly one row per day
+            db.add(models.DailyBlog(title=title, content=content))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+    finally:
+        db.close()
+
+    return load(kind, day)
+
+
+def _generate(kind: str) -> str:
+    if kind == "plan":
+        return generate_daily_plan()
+    _, content = generate_daily_blog()
+    return content
+
+
+def get_or_create(kind: str, day: Optional[str] = None) -> dict:
+    day = day or today_key()
+
+    stored = load(kind, day)
+    if stored:
+        return stored
+
+    with _lock_for(kind, day):
+        stored = load(kind, day)
+        if stored:
+            return stored
+
+        content = _generate(kind)
+        stored = save(kind, day, content)
+
+    if stored:
+        return stored
+
+    # Generation failed → don't persist, let the next request retry
+    return {
+        "kind": kind,
+        "day": day,
+        "title": PLAN_TITLE if kind == "plan" else extract_title(content),
+        "content": content,
+        "created_at": None,
+    }
+
+
+async def stream_or_create(kind: str):
+    """
+    Stream today's content: stored text at once, otherwise live tokens,
+    saved only once the stream completed.
+    """
+    day = today_key()
+
+    stored = await asyncio.to_thread(load, kind, day)
+    if stored:
+        yield stored["content"]
+        return
+
+    lock = _lock_for(kind, day)
+    if not lock.acquire(blocking=False):
+        # Someone else is generating → wait for their result
+        stored = await asyncio.to_thread(get_or_create, kind, day)
+        yield stored["content"]
+        return
+
+    try:
+        stored = await asyncio.to_thread(load, kind, day)
+        if stored:
+            yield stored["content"]
+            return
+
+        tokens = stream_daily_plan_async() if kind == "plan" else stream_daily_blog_async()
+        parts = []
+        try:
+            async for token in tokens:
+                parts.append(token)
+                yield token
+        except StreamInterrupted:
+            # A truncated plan/blog would be today's row for good → keep none
+            logger.warning(f"⚠️ Daily {kind} stream interrupted, not saved")
+            return
+
+        await asyncio.to_thread(save, kind, day, "".join(parts).strip())
+    finally:
+        lock.release()
+
+
+class DailyScheduler(threading.Thread):
+    """
+    Precomputes today's plan and blog, then sleeps until PRECOMPUTE_AT IST.
+    """
+
+    def __init__(self):
+        super().__init__(name="daily-precompute", daemon=True)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            day = today_key()
+            ready = True
+            for kind in ("plan", "blog"):
+                if self._stop_event.is_set():
+                    return
+                try:
+                    stored = get_or_create(kind, day)
+                    ready = ready and stored["created_at"] is not None
+                except Exception as e:
+                    logger.warning(f"⚠️ Daily {kind} precompute failed: {e}")
+                    ready = False
+
+            if ready:
+                logger.info(f"✅ Daily content ready for {day}")
+                self._stop_event.wait(self.seconds_until_next_run())
+            else:
+                # Ollama still warming up → try again shortly
+                self._stop_event.wait(PRECOMPUTE_RETRY_SECONDS)
+
+    @staticmethod
+    def seconds_until_next_run(now: Optional[datetime] = None) -> float:
+        now = now or datetime.now(TZ)
+        hour, minute = (int(part) for part in PRECOMPUTE_AT.split(":"))
+        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        return (target - now).total_seconds()
+
+    def stop(self, timeout: float = 5):
+        self._stop_event.set()
+        self.join(timeout)
+
+
+_scheduler: Optional[DailyScheduler] = None
+
+
+def start_scheduler():
+    global _scheduler
+
+    if PRECOMPUTE_ENABLED and _scheduler is None:
+        _scheduler = DailyScheduler()
+        _scheduler.start()
+
+
+def stop_scheduler():
+    global _scheduler
+
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
@@ -0,0 +1,278 @@
+# api/jobs.py
+"""
+Durable local job queue for long-running generations (SQLite).
+
+The API enqueues and returns a job id at once; `python -m api.worker`
+claims jobs, runs the agent and stores the result. A claim is a lease:
+if a worker dies mid-job the lease expires and another worker picks the
+job up again. Identical active jobs (same dedupe_key) are coalesced, so a
+client that resubmits gets the existing job instead of a second run.
+"""
+from typing import Optional
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+JOBS_PATH = os.getenv("JOBS_DB_PATH", "/data/jobs.db")
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+# A running job's worker renews its lease this often (see JobQueue.renew)
+HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", str(LEASE_SECONDS / 3)))
+RETRY_DELAY_SECONDS = float(os.getenv("JOB_RETRY_DELAY_SECONDS", "30"))
+RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_HOURS", "24")) * 3600
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))  # seconds
+
+FINISHED = ("done", "failed")
+
+# Only the attempt that holds the lease may finish a job; a reclaim bumps
+# `attempts`, so a worker whose lease expired cannot overwrite the new run
+_LEASED = (
+    " WHERE id = ? AND status = 'running' AND lease_until IS NOT NULL"
+    " AND attempts = ?"
+)
+
+_COLUMNS = (
+    "id, kind, status, payload, result, error, attempts,"
+    " created_at, started_at, finished_at"
+)
+
+
+def public(job: dict) -> dict:
+    """
+    API view of a job (the payload may hold a long candidate answer).
+    """
+    return {key: value for key, value in job.items() if key != "payload"}
+
+
+def _as_dict(row) -> Optional[dict]:
+    if row is None:
+        return None
+    (job_id, kind, status, payload, result, error, attempts,
+     created_at, started_at, finished_at) = row
+    return {
+        "id": job_id,
+        "kind": kind,
+        "status": status,
+        "payload": json.loads(payload),
+        "result": json.loads(result) if result is not None else None,
+        "error": error,
+        "attempts": attempts,
+        "created_at": created_at,
+        "started_at": started_at,
+        "finished_at": finished_at,
+    }
+
+
+class JobQueue:
+    def __init__(self, path: str = JOBS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Autocommit; claims take an explicit write lock (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=10, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " dedupe_key TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " available_at REAL NOT NULL,"
+            " lease_until REAL,"
+            " worker TEXT,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_jobs_status_available"
+            " ON jobs (status, available_at)"
+        )
+        # At most one active job per dedupe_key
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_jobs_active_dedupe ON jobs (dedupe_key)"
+            " WHERE status IN ('queued', 'running') AND dedupe_key IS NOT NULL"
+        )
+
+    def submit(
+        self,
+        kind: str,
+        payload: Optional[dict] = None,
+        dedupe_key: Optional[str] = None,
+        result: Optional[dict] = None,
+    ) -> dict:
+        """
+        Enqueue a job, or return the active job with the same dedupe_key.
+        With `result` the job is recorded as already done.
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        status = "done" if result is not None else "queued"
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, kind, status, payload, result, dedupe_key,"
+                    " available_at, created_at, finished_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        job_id, kind, status, json.dumps(payload or {}),
+                        json.dumps(result) if result is not None else None,
+                        dedupe_key, now, now, now if result is not None else None,
+                    ),
+                )
+                return self._get(job_id)
+            except sqlite3.IntegrityError:
+                existing = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM jobs WHERE dedupe_key = ?"
+                    " AND status IN ('queued', 'running')",
+                    (dedupe_key,),
+                ).fetchone()
+
+        if existing is not None:
+            return _as_dict(existing)
+        # The active job finished between our insert and select
+        return self.submit(kind, payload, None, result)
+
+    def _get(self, job_id: str) -> Optional[dict]:
+        row = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return _as_dict(row)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._get(job_id)
+
+    def claim(self, worker: str, kinds=None) -> Optional[dict]:
+        """
+        Lease the oldest runnable job (queued, or running with an expired
+        lease and attempts left).
+        """
+        now = time.time()
+        kind_filter = ""
+        params = [now, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            params += list(kinds)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Lease ran out on the last attempt (the worker died, or the job
+                # kills it) → give up instead of re-leasing the job forever
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', lease_until = NULL, finished_at = ?,"
+                    " error = 'Lease expired on attempt ' || attempts"
+                    " WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now, MAX_ATTEMPTS),
+                )
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE ((status = 'queued' AND available_at <= ?)"
+                    " OR (status = 'running' AND lease_until < ?))" + kind_filter +
+                    " ORDER BY available_at LIMIT 1",
+                    params,
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?,"
+                    " attempts = attempts + 1, started_at = ? WHERE id = ?",
+                    (worker, now + LEASE_SECONDS, now, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._get(row[0])
+
+    def renew(self, job_id: str, attempt: int) -> bool:
+        """
+        Extend the lease of the running `attempt`; False once it was lost.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ?" + _LEASED,
+                (time.time() + LEASE_SECONDS, job_id, attempt),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, attempt: int, result: dict) -> bool:
+        """
+        Store the result of the claimed `attempt`. False when its lease was
+        lost (the job was reclaimed or finished elsewhere) and nothing changed.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL,"
+                " lease_until = NULL, finished_at = ?" + _LEASED,
+                (json.dumps(result), time.time(), job_id, attempt),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, attempt: int, error: str, retry: bool = True) -> bool:
+        """
+        Requeue with a delay until MAX_ATTEMPTS, then mark failed.
+        False when the lease of `attempt` was lost and nothing changed.
+        """
+        now = time.time()
+        with self._lock:
+            if retry and attempt < MAX_ATTEMPTS:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, lease_until = NULL,"
+                    " available_at = ?" + _LEASED,
+                    (error, now + RETRY_DELAY_SECONDS * attempt, job_id, attempt),
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, lease_until = NULL,"
+                    " finished_at = ?" + _LEASED,
+                    (error, now, job_id, attempt),
+                )
+        return cursor.rowcount == 1
+
+    def purge(self, older_than: float = RETENTION_SECONDS) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (time.time() - older_than,),
+            )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
@@ -1,80 +1,483 @@
-from fastapi import FastAPI, Depends
-from sqlalchemy.orm import Session
-from api.database import SessionLocal, engine
+# Imported first so the import-time breakdown starts here
+from api.startup import startup
+
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import BackgroundTasks, FastAPI, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.database import AsyncSessionLocal, async_engine
 from api import models, schemas
-from agents.interview_agent import answer_question
-from agents.planner_agent import generate_daily_plan
-from agents.evaluator_agent import evaluate_answer
-from agents.question_agent import generate_interview_question
-from api.blog import generate_daily_blog
+from api.pagination import PageParams, fetch_page
+from api import scores, search, sessions
+from api.write_behind import get_writer
+from api.jobs import FINISHED, POLL_INTERVAL, get_job_queue, public
+from api.worker import daily_result, start_embedded, stop_embedded
+from agents import llm
+from rag.vector_store import get_vector_store, close_vector_store
+from rag.bm25 import get_bm25, warm_up_bm25
+from rag.embed_store import embedding_cache_stats, warm_up_embeddings
+from agents.response_cache import get_response_cache
+from agents.singleflight import get_singleflight
+from agents.llm_scheduler import (
+    LLMOverloaded, get_llm_scheduler, priority_for
+)
+from agents.interview_agent import (
+    answer_question_async, stream_answer_question_async
+)
+from agents.evaluator_agent import (
+    BATCH_MAX_ITEMS, evaluate_answer_async, evaluate_answers,
+    stream_evaluation_async, parse_evaluation,
+)
+from agents.question_agent import generate_interview_question_async
+from api import daily
 
-models.Base.metadata.create_all(bind=engine)
+startup.mark_imported()
 
-app = FastAPI(title="NVIDIA Interview AI Agent")
 
-@app.get("/health")
-def health():
-    return {"status": "ok"}
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🔥 Load the embedding model + open the vector store in the background;
+    # the app serves immediately and /ready flips once they are warm
+    startup.start([
+        ("embeddings", warm_up_embeddings),
+        ("vector_store", lambda: get_vector_store().open() is not None),
+        ("bm25", lambda: warm_up_bm25(get_vector_store())),
+    ])
+    # 🗓️ Precompute today's plan + blog in the background
+    daily.start_scheduler()
+    # 📝 Batched chat/evaluation inserts off the request path
+    get_writer().start()
+    # 👷 Only when no separate `python -m api.worker` is deployed
+    start_embedded()
 
+    yield
+    stop_embedded()
+    daily.stop_scheduler()
+    # Drain queued records before the engine goes away
+    await get_writer().stop()
+    # 🧹 Graceful shutdown: release pooled connections
+    await llm.close_async_client()
+    llm.close_session()
+    await async_engine.dispose()
+    close_vector_store()
+    get_bm25().close()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+
+app = FastAPI(title="NVIDIA Interview AI Agent", lifespan=lifespan)
+
+
+@app.exception_handler(LLMOverloaded)
+async def llm_overloaded(request: Request, exc: LLMOverloaded):
+    # 🚦 Shed load instead of letting requests time out in the queue
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "AI engine is busy, please retry shortly.",
+            "queue_depth": exc.queue_depth,
+        },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
+@app.get("/ready")
+async def ready():
+    report = startup.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    response_cache = get_response_cache()
+    return {
+        "query_embeddings": embedding_cache_stats(),
+        "llm_responses": (
+            response_cache.stats() if response_cache else {"enabled": False}
+        ),
+        "llm_singleflight": get_singleflight().stats(),
+    }
+
+@app.get("/metrics/db")
+async def db_metrics():
+    return {"write_behind": get_writer().stats()}
+
+@app.get("/metrics/llm")
+async def llm_metrics():
+    return {
+        "scheduler": get_llm_scheduler().stats(),
+        # Ollama-reported prefill/decode timings per scope
+        "generation": llm.generation_stats.snapshot(),
+    }
+
+
+def chat_row(question: str, answer: str) -> models.ChatHistory:
+    # Stamp now, not at flush time, so history order matches request order
+    return models.ChatHistory(
+        question=question, answer=answer, timestamp=datetime.utcnow()
+    )
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 @app.get("/interview/question")
-def get_interview_question():
-    return {"question": generate_interview_question()}
+async def get_interview_question():
+    return {"question": await generate_interview_question_async()}
+
+# =========================================================
+# INTERVIEW SESSIONS (multi-round, state kept server-side)
+# =========================================================
+@app.post("/sessions")
+async def create_session(req: schemas.SessionCreate):
+    return await sessions.create(req.topic)
+
+@app.get("/sessions")
+async def list_sessions(
+    page: PageParams = Depends(), db: AsyncSession = Depends(get_db)
+):
+    t = models.InterviewSession
+    columns = [t.id, t.topic, t.status, t.created_at, t.updated_at]
+    return await fetch_page(db, columns, t.created_at, t.id, page)
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: int):
+    return await sessions.get(session_id)
+
+@app.post("/sessions/{session_id}/answer")
+async def answer_session(
+    session_id: int, req: schemas.SessionAnswer, background: BackgroundTasks
+):
+    result = await sessions.answer(session_id, req.answer)
+    if result.pop("needs_summary"):
+        # Keeps the rebuild prompt bounded; off the response path
+        background.add_task(sessions.fold_summary, session_id)
+    return result
+
+@app.post("/sessions/{session_id}/end")
+async def end_session(session_id: int):
+    return await sessions.end(session_id)
 
 @app.get("/plan/today")
-def plan_today():
-    return {"plan": generate_daily_plan()}
+async def plan_today():
+    stored = await asyncio.to_thread(daily.get_or_create, "plan")
+    return {"plan": stored["content"], "date": stored["day"]}
 
 @app.post("/ask")
-def ask(req: schemas.AskRequest, db: Session = Depends(get_db)):
-    answer = answer_question(req.question)
-    db.add(models.ChatHistory(question=req.question, answer=answer))
-    db.commit()
+async def ask(req: schemas.AskRequest):
+    answer = await answer_question_async(req.question)
+    await get_writer().submit(chat_row(req.question, answer))
     return {"answer": answer}
 
 @app.post("/evaluate")
-def evaluate(req: schemas.EvalRequest, db: Session = Depends(get_db)):
-    feedback = evaluate_answer(req.question, req.answer)
-    score = next(
-        (line for line in feedback.splitlines() if "score" in line.lower()),
-        "Score not found"
+async def evaluate(req: schemas.EvalRequest):
+    result = await evaluate_answer_async(req.question, req.answer)
+    await get_writer().submit(*scores.evaluation_writes(req.question, result))
+    return {
+        "evaluation": result["feedback"],
+        "score": result["score"],
+        "dimensions": result["dimensions"],
+    }
+
+async def evaluate_batch_lines(items):
+    """
+    One NDJSON line per item as it finishes, then a summary line once
+    every row is committed (single transaction).
+    """
+    started = time.perf_counter()
+    pairs = [(item.question, item.answer) for item in items]
+    done, failed = [], 0
+
+    async for index, result in evaluate_answers(pairs):
+        if "error" in result:
+            failed += 1
+            line = {"index": index, "error": result["error"]}
+        else:
+            done.append((pairs[index][0], result))
+            line = {
+                "index": index,
+                "evaluation": result["feedback"],
+                "score": result["score"],
+                "dimensions": result["dimensions"],
+            }
+        yield json.dumps(line) + "\n"
+
+    summary = {
+        "items": len(pairs),
+        "unique": len({(q.strip(), a.strip()) for q, a in pairs}),
+        "evaluated": len(done),
+        "failed": failed,
+        "persisted": 0,
+    }
+    if done:
+        try:
+            summary["persisted"] = await scores.save_evaluations(done)
+        except Exception as e:
+            summary["persist_error"] = str(e)
+
+    elapsed = time.perf_counter() - started
+    summary["seconds"] = round(elapsed, 3)
+    summary["items_per_s"] = round(len(pairs) / elapsed, 2) if elapsed else None
+    yield json.dumps({"summary": summary}) + "\n"
+
+@app.post("/evaluate/batch")
+async def evaluate_batch(req: schemas.EvalBatchRequest):
+    if not req.items:
+        raise HTTPException(status_code=422, detail="items must not be empty")
+    if len(req.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {BATCH_MAX_ITEMS} items per batch"
+        )
+    get_llm_scheduler().ensure_capacity(priority_for("evaluate_batch"))
+
+    return StreamingResponse(
+        evaluate_batch_lines(req.items),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    db.add(models.Evaluation(
-        question=req.question,
-        score=score,
-        feedback=feedback
-    ))
-    db.commit()
-    return {"evaluation": feedback}
+
+@app.get("/stats/scores")
+async def score_stats(
+    bucket: str = Query("day", pattern="^(day|week)$"),
+    window: int = Query(7, ge=1, le=90),
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    # Served from the per-day rollup, not a scan over every evaluation
+    return await scores.score_stats(db, bucket, window, since, until)
+
+# =========================================================
+# HISTORY (keyset-paginated list projections + detail fetch)
+# =========================================================
+async def get_or_404(db: AsyncSession, model, row_id: int):
+    row = await db.get(model, row_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return row
 
 @app.get("/history/chat")
-def chat_history(db: Session = Depends(get_db)):
-    return db.query(models.ChatHistory).all()
+async def chat_history(
+    page: PageParams = Depends(), db: AsyncSession = Depends(get_db)
+):
+    t = models.ChatHistory
+    columns = [t.id, t.question, t.timestamp]
+    if page.include_body:
+        columns.append(t.answer)
+    return await fetch_page(db, columns, t.timestamp, t.id, page)
+
+@app.get("/history/chat/{chat_id}")
+async def chat_detail(chat_id: int, db: AsyncSession = Depends(get_db)):
+    return await get_or_404(db, models.ChatHistory, chat_id)
 
 @app.get("/history/scores")
-def score_history(db: Session = Depends(get_db)):
-    return db.query(models.Evaluation).all()
+async def score_history(
+    page: PageParams = Depends(), db: AsyncSession = Depends(get_db)
+):
+    t = models.Evaluation
+    columns = [t.id, t.question, t.score, t.score_value, t.timestamp]
+    if page.include_body:
+        columns.append(t.feedback)
+    return await fetch_page(db, columns, t.timestamp, t.id, page)
+
+@app.get("/history/scores/{evaluation_id}")
+async def score_detail(evaluation_id: int, db: AsyncSession = Depends(get_db)):
+    return await get_or_404(db, models.Evaluation, evaluation_id)
+
+@app.get("/search")
+async def search_history(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[List[str]] = Query(
+        None, description=f"Any of {', '.join(search.INDEXES)}; all when omitted"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    # Ranked hits with <mark>-highlighted snippets; bodies via the detail routes
+    unknown = set(kind or ()) - set(search.INDEXES)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown kind: {', '.join(sorted(unknown))}")
+    return await search.search(db, q, kind, limit, offset)
 
 @app.get("/blog/daily", response_model=schemas.BlogResponse)
-def daily_blog(db: Session = Depends(get_db)):
-    title, content = generate_daily_blog()
-    db.add(models.DailyBlog(title=title, content=content))
-    db.commit()
-    return {"title": title, "content": content}
+async def daily_blog():
+    # Idempotent per IST day: generated once, then served from the DB
+    stored = await asyncio.to_thread(daily.get_or_create, "blog")
+    return {"title": stored["title"], "content": stored["content"]}
 
 @app.get("/blog/history")
-def blog_history(db: Session = Depends(get_db)):
-    return db.query(models.DailyBlog).order_by(
-        models.DailyBlog.created_at.desc()
-    ).all()
+async def blog_history(
+    page: PageParams = Depends(), db: AsyncSession = Depends(get_db)
+):
+    t = models.DailyBlog
+    columns = [t.id, t.title, t.created_at]
+    if page.include_body:
+        columns.append(t.content)
+    return await fetch_page(db, columns, t.created_at, t.id, page)
+
+@app.get("/blog/{blog_id}")
+async def blog_detail(blog_id: int, db: AsyncSession = Depends(get_db)):
+    return await get_or_404(db, models.DailyBlog, blog_id)
+
+
+# =========================================================
+# JOBS (long generations run by `python -m api.worker`)
+# =========================================================
+def job_accepted(job: dict) -> JSONResponse:
+    return JSONResponse(
+        status_code=202, content={"job_id": job["id"], "status": job["status"]}
+    )
+
+async def submit_daily_job(kind: str) -> JSONResponse:
+    day = daily.today_key()
+    queue = get_job_queue()
+    stored = await asyncio.to_thread(daily.load, kind, day)
+    if stored:
+        # Already generated today → finished job, no worker round trip
+        job = await asyncio.to_thread(
+            queue.submit, kind, {"day": day}, None, daily_result(kind, stored)
+        )
+    else:
+        job = await asyncio.to_thread(queue.submit, kind, {"day": day}, f"{kind}:{day}")
+    return job_accepted(job)
+
+@app.post("/jobs/plan")
+async def submit_plan_job():
+    return await submit_daily_job("plan")
+
+@app.post("/jobs/blog")
+async def submit_blog_job():
+    return await submit_daily_job("blog")
+
+@app.post("/jobs/evaluate")
+async def submit_evaluate_job(req: schemas.EvalRequest):
+    # A resubmitted (retried) answer joins the job already in flight
+    digest = hashlib.sha256(f"{req.question}\0{req.answer}".encode()).hexdigest()
+    job = await asyncio.to_thread(
+        get_job_queue().submit, "evaluate",
+        {"question": req.question, "answer": req.answer}, f"evaluate:{digest}",
+    )
+    return job_accepted(job)
+
+@app.post("/jobs/sessions/{session_id}/answer")
+async def submit_session_answer_job(session_id: int, req: schemas.SessionAnswer):
+    """
+    POST /sessions/{id}/answer as a job: evaluation + next question can
+    outlast an HTTP timeout on CPU.
+    """
+    digest = hashlib.sha256(req.answer.encode()).hexdigest()
+    job = await asyncio.to_thread(
+        get_job_queue().submit, "session_answer",
+        {"session_id": session_id, "answer": req.answer},
+        f"session_answer:{session_id}:{digest}",
+    )
+    return job_accepted(job)
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await asyncio.to_thread(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return public(job)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-sent events: one per status change, ending with done/failed.
+    """
+    queue = get_job_queue()
+    if await asyncio.to_thread(queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last, last_sent = None, time.monotonic()
+        while True:
+            job = await asyncio.to_thread(queue.get, job_id)
+            if job is None:
+                return
+            state = (job["status"], job["attempts"])
+            if state != last:
+                last, last_sent = state, time.monotonic()
+                yield f"event: {job['status']}\ndata: {json.dumps(public(job))}\n\n"
+            elif time.monotonic() - last_sent > 15:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            if job["status"] in FINISHED:
+                return
+            await asyncio.sleep(POLL_INTERVAL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/metrics/jobs")
+async def job_metrics():
+    return {"jobs": await asyncio.to_thread(get_job_queue().stats)}
+
+
+# =========================================================
+# STREAMING (tokens as they arrive, persisted once complete)
+# =========================================================
+async def stream_and_persist(tokens, on_complete=None):
+    """
+    Relay LLM tokens to the client, then queue the (row, statements)
+    returned by on_complete(text) on the write-behind writer. An
+    interrupted stream just ends; nothing is persisted.
+    """
+    parts = []
+    try:
+        async for token in tokens:
+            parts.append(token)
+            yield token
+    except llm.StreamInterrupted:
+        # The client already has the partial text; don't store it as an answer
+        return
+
+    if on_complete is None:
+        return
+
+    await get_writer().submit(*on_complete("".join(parts)))
+
+
+def text_stream(tokens, on_complete=None):
+    return StreamingResponse(
+        stream_and_persist(tokens, on_complete),
+        media_type="text/plain; charset=utf-8",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/plan/today/stream")
+async def plan_today_stream():
+    return text_stream(daily.stream_or_create("plan"))
+
+@app.post("/ask/stream")
+async def ask_stream(req: schemas.AskRequest):
+    get_llm_scheduler().ensure_capacity(priority_for("ask"))
+
+    return text_stream(
+        stream_answer_question_async(req.question),
+        lambda answer: (chat_row(req.question, answer), ()),
+    )
+
+@app.post("/evaluate/stream")
+async def evaluate_stream(req: schemas.EvalRequest):
+    get_llm_scheduler().ensure_capacity(priority_for("evaluate"))
+
+    return text_stream(
+        stream_evaluation_async(req.question, req.answer),
+        lambda feedback: scores.evaluation_writes(req.question, parse_evaluation(feedback)),
+    )
+
+@app.get("/blog/daily/stream")
+async def daily_blog_stream():
+    return text_stream(daily.stream_or_create("blog"))
@@ -0,0 +1,145 @@
+# api/migrate.py
+"""
+Minimal forward-only schema upgrade for existing databases.
+
+Creates missing tables, and also adds the columns and indexes that were
+introduced after a table was first created. New
+columns must be nullable (or have a server default). Also builds the
+score rollup and the SQLite full-text indexes.
+
+Run once before the API / worker start (the Docker image does):
+
+    python -m api.migrate
+
+Concurrent runs (e.g. the API and worker containers booting together)
+are serialized by a lock, and every step skips objects that exist.
+"""
+from contextlib import contextmanager
+import fcntl
+import logging
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from api import models  # noqa: F401  (registers every table on Base)
+from api.database import Base
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock key for the Postgres equivalent of the lock file
+ADVISORY_LOCK_ID = 0x1E7A11
+
+
+def _already_exists(error: DBAPIError) -> bool:
+    message = str(error.orig).lower()
+    return "already exists" in message or "duplicate column" in message
+
+
+@contextmanager
+def migration_lock(engine: Engine):
+    """
+    Cross-process lock around a migration: a lock file next to the SQLite
+    database, or a session-level advisory lock on Postgres.
+    """
+    backend = engine.url.get_backend_name()
+
+    if backend == "sqlite":
+        database = engine.url.database
+        if not database or database == ":memory:":
+            yield
+            return
+        with open(f"{database}.migrate.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return
+
+    if backend == "postgresql":
+        with engine.connect() as conn:
+            conn.exec_driver_sql(f"SELECT pg_advisory_lock({ADVISORY_LOCK_ID})")
+            try:
+                yield
+            finally:
+                conn.exec_driver_sql(f"SELECT pg_advisory_unlock({ADVISORY_LOCK_ID})")
+        return
+
+    yield
+
+
+def _step(engine: Engine, ddl, description: str) -> bool:
+    # One transaction per DDL step so "already exists" only skips that step
+    try:
+        with engine.begin() as conn:
+            ddl(conn)
+        return True
+    except DBAPIError as e:
+        if not _already_exists(e):
+            raise
+        logger.info(f"↪️ {description} already exists")
+        return False
+
+
+def _add_column(table, column):
+    def ddl(conn):
+        ddl_type = column.type.compile(dialect=conn.dialect)
+        conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {ddl_type}')
+    return ddl
+
+
+def upgrade(engine: Engine):
+    for table in Base.metadata.sorted_tables:
+        _step(
+            engine,
+            lambda conn, table=table: table.create(bind=conn, checkfirst=True),
+            f"Table {table.name}",
+        )
+
+    with engine.connect() as conn:
+        inspector = inspect(conn)
+        existing = {
+            table.name: {c["name"] for c in inspector.get_columns(table.name)}
+            for table in Base.metadata.sorted_tables
+        }
+
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            if column.name in existing[table.name]:
+                continue
+            name = f"{table.name}.{column.name}"
+            if _step(engine, _add_column(table, column), f"Column {name}"):
+                logger.info(f"🛠️ Added column {name}")
+
+        for index in table.indexes:
+            _step(
+                engine,
+                lambda conn, index=index: index.create(bind=conn, checkfirst=True),
+                f"Index {index.name}",
+            )
+
+
+def migrate(engine: Engine):
+    """
+    Every startup schema step, once, under the migration lock.
+    """
+    from api import scores, search
+
+    with migration_lock(engine):
+        upgrade(engine)
+        scores.backfill(engine)
+        search.ensure_indexes(engine)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+
+    from api.database import engine
+
+    migrate(engine)
+    logger.info("✅ Database schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, Text, DateTime, String
+from sqlalchemy import (
+    Column, Integer, Text, DateTime, String, Float, UniqueConstraint, Index, ForeignKey
+)
 from datetime import datetime
 from api.database import Base
 
 class ChatHistory(Base):
     __tablename__ = "chat_history"
+    __table_args__ = (Index("ix_chat_history_timestamp_id", "timestamp", "id"),)
 
     id = Column(Integer, primary_key=True)
     question = Column(Text)
@@ -12,17 +15,84 @@ class ChatHistory(Base):
 
 class Evaluation(Base):
     __tablename__ = "evaluations"
+    __table_args__ = (Index("ix_evaluations_timestamp_id", "timestamp", "id"),)
 
     id = Column(Integer, primary_key=True)
     question = Column(Text)
-    score = Column(Text)
+    score = Column(Text)  # human-readable label, e.g. "Score: 7/10"
     feedback = Column(Text)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    # Structured result (0–10), see agents.evaluator_agent.RUBRIC
+    score_value = Column(Float)
+    technical_correctness = Column(Float)
+    depth = Column(Float)
+    system_thinking = Column(Float)
+    clarity = Column(Float)
+
 class DailyBlog(Base):
     __tablename__ = "daily_blogs"
+    __table_args__ = (Index("ix_daily_blogs_created_at_id", "created_at", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(200))
+    content = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class DailyContent(Base):
+    """
+    Precomputed plan / blog for one Asia/Kolkata calendar day.
+    """
+    __tablename__ = "daily_content"
+    __table_args__ = (UniqueConstraint("kind", "day"),)
 
     id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)  # "plan" | "blog"
+    day = Column(String(10), nullable=False)  # YYYY-MM-DD (IST)
     title = Column(String(200))
     content = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class ScoreDaily(Base):
+    """
+    Incrementally maintained per-day (IST) rollup of evaluation scores.
+    """
+    __tablename__ = "score_daily"
+
+    day = Column(String(10), primary_key=True)  # YYYY-MM-DD (IST)
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0.0)
+    min_score = Column(Float)
+    max_score = Column(Float)
+
+class InterviewSession(Base):
+    """
+    Multi-round interview; turns beyond the recent window live on as `summary`.
+    """
+    __tablename__ = "interview_sessions"
+    __table_args__ = (Index("ix_interview_sessions_created_at_id", "created_at", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(200))
+    status = Column(String(20), nullable=False, default="active")  # "active" | "ended"
+    summary = Column(Text)
+    summarized_turns = Column(Integer, nullable=False, default=0)
+    # Ollama `context` token ids after the last question, valid for llm_model only
+    llm_model = Column(String(100))
+    llm_context = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class Turn(Base):
+    __tablename__ = "interview_turns"
+    __table_args__ = (UniqueConstraint("session_id", "position"),)
+
+    id = Column(Integer, primary_key=True)
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), nullable=False)
+    position = Column(Integer, nullable=False)  # 0-based
+    question = Column(Text)
+    answer = Column(Text)
+    feedback = Column(Text)
+    score_value = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    answered_at = Column(DateTime)
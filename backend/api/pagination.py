@@ -0,0 +1,74 @@
+# api/pagination.py
+"""
+Keyset (cursor) pagination on (timestamp, id), newest first.
+
+Page fetches cost the same at any depth because the cursor turns into a
+range seek on the (timestamp, id) index instead of an OFFSET scan.
+"""
+import base64
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import select, tuple_
+
+MAX_PAGE_SIZE = 200
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        since: Optional[datetime] = Query(None, description="Inclusive lower bound (UTC)"),
+        until: Optional[datetime] = Query(None, description="Exclusive upper bound (UTC)"),
+        include_body: bool = Query(False, description="Include full text bodies"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.since = since
+        self.until = until
+        self.include_body = include_body
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    raw = f"{ts.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def page_query(columns, ts_col, id_col, params: PageParams):
+    stmt = select(*columns)
+
+    if params.since:
+        stmt = stmt.where(ts_col >= params.since)
+    if params.until:
+        stmt = stmt.where(ts_col < params.until)
+    if params.cursor:
+        cursor_ts, cursor_id = decode_cursor(params.cursor)
+        stmt = stmt.where(tuple_(ts_col, id_col) < tuple_(cursor_ts, cursor_id))
+
+    return stmt.order_by(ts_col.desc(), id_col.desc()).limit(params.limit + 1)
+
+
+def to_page(rows, ts_key: str, limit: int) -> dict:
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last[ts_key], last["id"])
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def fetch_page(db, columns, ts_col, id_col, params: PageParams) -> dict:
+    result = await db.execute(page_query(columns, ts_col, id_col, params))
+    return to_page(result.mappings().all(), ts_col.key, params.limit)
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 class AskRequest(BaseModel):
@@ -7,6 +9,15 @@ class EvalRequest(BaseModel):
     question: str
     answer: str
 
+class EvalBatchRequest(BaseModel):
+    items: List[EvalRequest]
+
 class BlogResponse(BaseModel):
     title: str
     content: str
+
+class SessionCreate(BaseModel):
+    topic: Optional[str] = None
+
+class SessionAnswer(BaseModel):
+    answer: str
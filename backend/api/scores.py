@@ -0,0 +1,206 @@
+# api/scores.py
+"""
+Numeric evaluation scores and their per-day rollup.
+
+Every Evaluation insert also upserts its IST day in `score_daily`, so
+/stats/scores reads a few hundred rollup rows instead of every evaluation.
+"""
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import bindparam, case, func, select, text, update
+from sqlalchemy.engine import Engine
+
+from agents.evaluator_agent import RUBRIC, parse_score
+from api import models
+from api.database import AsyncSessionLocal, engine
+
+TZ = ZoneInfo("Asia/Kolkata")
+
+
+def ist_day(ts: datetime) -> str:
+    """
+    Calendar day in IST for a naive-UTC timestamp.
+    """
+    return ts.replace(tzinfo=timezone.utc).astimezone(TZ).strftime("%Y-%m-%d")
+
+
+def _insert(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def rollup_statement(day: str, score: float, dialect_name: Optional[str] = None):
+    return rollup_upsert(day, 1, score, score, score, dialect_name)
+
+
+def rollup_upsert(
+    day: str,
+    count: int,
+    total: float,
+    min_score: float,
+    max_score: float,
+    dialect_name: Optional[str] = None,
+):
+    t = models.ScoreDaily
+    insert = _insert(dialect_name or engine.dialect.name)
+
+    stmt = insert(t).values(
+        day=day, count=count, total=total, min_score=min_score, max_score=max_score
+    )
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[t.day],
+        set_={
+            "count": t.count + excluded.count,
+            "total": t.total + excluded.total,
+            "min_score": case(
+                (excluded.min_score < t.min_score, excluded.min_score),
+                else_=t.min_score,
+            ),
+            "max_score": case(
+                (excluded.max_score > t.max_score, excluded.max_score),
+                else_=t.max_score,
+            ),
+        },
+    )
+
+
+def evaluation_writes(question: str, result: dict, timestamp: Optional[datetime] = None):
+    """
+    The Evaluation row plus the rollup statement(s) to run in the same transaction.
+    """
+    timestamp = timestamp or datetime.utcnow()
+    row = models.Evaluation(
+        question=question,
+        score=result["score_label"],
+        feedback=result["feedback"],
+        timestamp=timestamp,
+        score_value=result["score"],
+        **{name: result["dimensions"].get(name) for name in RUBRIC},
+    )
+
+    statements = []
+    if result["score"] is not None:
+        statements.append(rollup_statement(ist_day(timestamp), result["score"]))
+    return row, statements
+
+
+async def save_evaluations(items, timestamp: Optional[datetime] = None) -> int:
+    """
+    Insert a batch of (question, result) in one transaction with a single
+    rollup upsert for the whole batch.
+    """
+    timestamp = timestamp or datetime.utcnow()
+    rows = [evaluation_writes(question, result, timestamp)[0] for question, result in items]
+    scored = [row.score_value for row in rows if row.score_value is not None]
+
+    async with AsyncSessionLocal() as db:
+        db.add_all(rows)
+        if scored:
+            await db.execute(rollup_upsert(
+                ist_day(timestamp), len(scored), sum(scored), min(scored), max(scored)
+            ))
+        await db.commit()
+    return len(rows)
+
+
+def _period(day: str, bucket: str) -> str:
+    if bucket == "week":
+        year, week, _ = date.fromisoformat(day).isocalendar()
+        return f"{year}-W{week:02d}"
+    return day
+
+
+async def score_stats(
+    db,
+    bucket: str = "day",
+    window: int = 7,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    limit: int = 365,
+) -> dict:
+    t = models.ScoreDaily
+    stmt = select(t.day, t.count, t.total, t.min_score, t.max_score).order_by(t.day)
+    if since:
+        stmt = stmt.where(t.day >= since.isoformat())
+    if until:
+        stmt = stmt.where(t.day < until.isoformat())
+
+    periods = OrderedDict()
+    for row in (await db.execute(stmt)).all():
+        p = periods.setdefault(_period(row.day, bucket), {
+            "count": 0, "total": 0.0, "min": None, "max": None,
+        })
+        p["count"] += row.count
+        p["total"] += row.total
+        p["min"] = row.min_score if p["min"] is None else min(p["min"], row.min_score)
+        p["max"] = row.max_score if p["max"] is None else max(p["max"], row.max_score)
+
+    points, trailing = [], []
+    for period, p in periods.items():
+        trailing = (trailing + [p])[-window:]
+        window_count = sum(x["count"] for x in trailing)
+        points.append({
+            "period": period,
+            "count": p["count"],
+            "mean": round(p["total"] / p["count"], 2),
+            "min": p["min"],
+            "max": p["max"],
+            # Count-weighted mean over the trailing `window` buckets
+            "moving_avg": round(sum(x["total"] for x in trailing) / window_count, 2),
+        })
+
+    return {"bucket": bucket, "window": window, "points": points[-limit:]}
+
+
+def ist_day_sql(column, dialect_name: str):
+    """
+    ist_day() in SQL (IST is a fixed UTC+05:30, no DST).
+    """
+    if dialect_name == "postgresql":
+        return func.to_char(column + text("INTERVAL '330 minutes'"), "YYYY-MM-DD")
+    # Whole seconds: SQLite rounds ".9999995" up into the next day
+    return func.date(func.substr(column, 1, 19), "+330 minutes")
+
+
+def backfill(bind: Engine = engine):
+    """
+    One-off after upgrade (run by api.migrate): score legacy rows and build
+    the rollup from them, in one transaction.
+    """
+    e, t = models.Evaluation, models.ScoreDaily
+
+    with bind.begin() as conn:
+        if conn.execute(select(t.day).limit(1)).first() is not None:
+            return
+
+        legacy = conn.execute(
+            select(e.id, e.score, e.feedback).where(e.score_value.is_(None))
+        ).all()
+        scored = []
+        for row_id, label, feedback in legacy:
+            value = parse_score(label or "") or parse_score(feedback or "")
+            if value is not None:
+                scored.append({"row_id": row_id, "value": value})
+        if scored:
+            conn.execute(
+                update(e).where(e.id == bindparam("row_id")).values(score_value=bindparam("value")),
+                scored,
+            )
+
+        day = ist_day_sql(e.timestamp, conn.dialect.name)
+        conn.execute(t.__table__.insert().from_select(
+            ["day", "count", "total", "min_score", "max_score"],
+            select(
+                day, func.count(), func.sum(e.score_value),
+                func.min(e.score_value), func.max(e.score_value),
+            ).where(
+                e.score_value.isnot(None), e.timestamp.isnot(None)
+            ).group_by(day),
+        ))
@@ -0,0 +1,331 @@
+# api/search.py
+"""
+Full-text search over chat, evaluation and blog history (SQLite FTS5).
+
+Each searchable table gets an external-content FTS5 index kept in sync
+by AFTER INSERT/UPDATE/DELETE triggers, so every writer — the API, the
+write-behind queue, the job worker — updates it in the same transaction
+as the row itself. Other databases fall back to a LIKE scan.
+"""
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from typing import FrozenSet, List, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from api.database import IS_SQLITE
+
+logger = logging.getLogger(__name__)
+
+MARK_START, MARK_END = "<mark>", "</mark>"
+MAX_OFFSET = 1000
+SNIPPET_TOKENS = 16
+# bm25 ranks only the newest N matches per kind; without a bound a common
+# term means scoring most of the table on every search
+RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "1000"))
+DENSE_SHARE = 0.5
+# bm25's IDF pass reads every query term's whole doclist, which no window
+# bounds; terms in more rows than this (estimated) are not ranked
+RANK_MAX_DOCS = int(os.getenv("SEARCH_RANK_MAX_DOCS", "15000"))
+# How long a worker trusts "index missing" before asking sqlite_master again
+FTS_RECHECK_SECONDS = float(os.getenv("SEARCH_FTS_RECHECK_SECONDS", "30"))
+
+
+class FtsSpec:
+    def __init__(self, kind: str, table: str, columns: tuple, title: str, ts: str):
+        self.kind = kind
+        self.table = table
+        self.columns = columns  # indexed text columns; the last is the LIKE-fallback snippet
+        self.title = title  # column shown as the hit's title
+        self.ts = ts
+        self.fts = f"{table}_fts"
+
+
+INDEXES = {
+    "chat": FtsSpec("chat", "chat_history", ("question", "answer"), "question", "timestamp"),
+    "evaluation": FtsSpec("evaluation", "evaluations", ("question", "feedback"), "question", "timestamp"),
+    "blog": FtsSpec("blog", "daily_blogs", ("title", "content"), "title", "created_at"),
+}
+
+_fts_tables: FrozenSet[str] = frozenset()
+_fts_checked_at = float("-inf")
+
+
+def _ddl(spec: FtsSpec) -> List[str]:
+    cols = ", ".join(spec.columns)
+    new = ", ".join(f"new.{c}" for c in spec.columns)
+    old = ", ".join(f"old.{c}" for c in spec.columns)
+    delete = (
+        f"INSERT INTO {spec.fts}({spec.fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    )
+    insert = f"INSERT INTO {spec.fts}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        # Prefix indexes keep search-as-you-type ("tens*") off a term-range scan
+        f"CREATE VIRTUAL TABLE {spec.fts} USING fts5({cols},"
+        f" content='{spec.table}', content_rowid='id', tokenize='porter unicode61',"
+        f" prefix='2 3 4')",
+        f"CREATE TRIGGER {spec.fts}_ai AFTER INSERT ON {spec.table} BEGIN {insert} END",
+        f"CREATE TRIGGER {spec.fts}_ad AFTER DELETE ON {spec.table} BEGIN {delete} END",
+        f"CREATE TRIGGER {spec.fts}_au AFTER UPDATE ON {spec.table} BEGIN {delete} {insert} END",
+        # Index rows that existed before the triggers
+        f"INSERT INTO {spec.fts}({spec.fts}) VALUES ('rebuild')",
+    ]
+
+
+def ensure_indexes(engine: Engine):
+    """
+    Create missing FTS tables + triggers (and backfill them). Runs in the
+    migration step; the API only looks the tables up, see fts_tables().
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    try:
+        with engine.begin() as conn:
+            existing = dict(conn.exec_driver_sql(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'table'"
+            ).all())
+            for spec in INDEXES.values():
+                statements = _ddl(spec)
+                if existing.get(spec.fts) == statements[0]:
+                    continue
+                if spec.fts in existing:
+                    # Definition changed (e.g. new prefix sizes) → rebuild
+                    for suffix in ("ai", "ad", "au"):
+                        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {spec.fts}_{suffix}")
+                    conn.exec_driver_sql(f"DROP TABLE {spec.fts}")
+                for statement in statements:
+                    conn.exec_driver_sql(statement)
+                logger.info(f"🛠️ Built full-text index {spec.fts}")
+    except Exception as e:
+        logger.warning(f"⚠️ Full-text search unavailable, using LIKE: {e}")
+
+
+async def fts_tables(db) -> FrozenSet[str]:
+    """
+    FTS indexes present in sqlite_master. Cached once every index exists;
+    until then (migration not run yet, or failed) re-checked every
+    FTS_RECHECK_SECONDS, so all workers converge on the same answer.
+    """
+    global _fts_tables, _fts_checked_at
+
+    if not IS_SQLITE:
+        return frozenset()
+    if len(_fts_tables) == len(INDEXES):
+        return _fts_tables
+    if time.monotonic() - _fts_checked_at < FTS_RECHECK_SECONDS:
+        return _fts_tables
+
+    names = [spec.fts for spec in INDEXES.values()]
+    rows = await db.execute(
+        text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN :names"
+        ).bindparams(bindparam("names", expanding=True)),
+        {"names": names},
+    )
+    _fts_tables = frozenset(rows.scalars().all())
+    _fts_checked_at = time.monotonic()
+    return _fts_tables
+
+
+def forget_fts_tables():
+    """
+    Drop the cached lookup (e.g. after an FTS query failed).
+    """
+    global _fts_tables, _fts_checked_at
+
+    _fts_tables = frozenset()
+    _fts_checked_at = float("-inf")
+
+
+def terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())[:16]
+
+
+def match_expression(words: List[str]) -> str:
+    """
+    User text → safe FTS5 query: every word must match, the last one as a
+    prefix (search-as-you-type). Quoting keeps FTS5 operators inert.
+    """
+    quoted = [f'"{w}"' for w in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def highlight(value: str, words: List[str], width: int = 160) -> str:
+    """
+    LIKE-fallback snippet: a window around the first hit, words marked.
+    """
+    value = value or ""
+    lowered = value.lower()
+    first = min((lowered.find(w) for w in words if w in lowered), default=0)
+    start = max(0, first - width // 3)
+    window = value[start:start + width]
+    for w in words:
+        window = re.sub(
+            f"({re.escape(w)}\\w*)", f"{MARK_START}\\1{MARK_END}", window, flags=re.IGNORECASE
+        )
+    return ("…" if start else "") + window + ("…" if start + width < len(value) else "")
+
+
+def window_sql(spec: FtsSpec) -> str:
+    """
+    Size and rowid span of the newest :window matches of one index.
+    """
+    return (
+        f"SELECT COUNT(*), MIN(rowid), MAX(rowid) FROM (SELECT rowid FROM {spec.fts}"
+        f" WHERE {spec.fts} MATCH :match ORDER BY rowid DESC LIMIT :window)"
+    )
+
+
+def worth_ranking(count: int, low: Optional[int], high: Optional[int], window: int) -> bool:
+    """
+    False when scoring costs more than it tells:
+    - the newest window is mostly matches: a term in over half the rows
+      gets a clamped (~0) bm25 IDF, yet scoring it walks its whole doclist;
+    - the window's density, extrapolated to the table, puts the term in
+      more than RANK_MAX_DOCS rows.
+    """
+    if count < window:
+        return True
+    span = high - low + 1
+    if count > DENSE_SHARE * span:
+        return False
+    return count / span * high <= RANK_MAX_DOCS
+
+
+def probe_matches(words: List[str]) -> List[str]:
+    """
+    MATCH expressions whose newest windows decide ranking: every word of a
+    multi-word query on its own, then the whole query (its window's lowest
+    rowid is the scan floor).
+    """
+    match = match_expression(words)
+    return (match.split() if len(words) > 1 else []) + [match]
+
+
+def _fts_query(spec: FtsSpec, ranked: bool = True) -> str:
+    # rowid >= :floor_<kind> is applied inside the FTS5 scan, so only the
+    # newest RANK_WINDOW matches are scored. Unranked kinds score 0, where
+    # bm25 would put them anyway, and come newest first.
+    rank, order = (f"bm25({spec.fts})", "rank") if ranked else ("0.0", f"{spec.fts}.rowid DESC")
+    # Each index is cut to the best :cap hits before the kinds are merged
+    return (
+        f"SELECT * FROM (SELECT '{spec.kind}' AS kind, t.id, t.{spec.title} AS title,"
+        f" t.{spec.ts} AS ts,"
+        f" snippet({spec.fts}, -1, '{MARK_START}', '{MARK_END}', '…', {SNIPPET_TOKENS}) AS snippet,"
+        f" {rank} AS rank"
+        f" FROM {spec.fts} JOIN {spec.table} t ON t.id = {spec.fts}.rowid"
+        f" WHERE {spec.fts} MATCH :match AND {spec.fts}.rowid >= :floor_{spec.kind}"
+        f" ORDER BY {order} LIMIT :cap)"
+    )
+
+
+def _like_query(spec: FtsSpec, words: List[str]) -> str:
+    clauses = " AND ".join(
+        "(" + " OR ".join(f"LOWER(t.{c}) LIKE :w{i}" for c in spec.columns) + ")"
+        for i in range(len(words))
+    )
+    return (
+        f"SELECT * FROM (SELECT '{spec.kind}' AS kind, t.id, t.{spec.title} AS title,"
+        f" t.{spec.ts} AS ts, t.{spec.columns[-1]} AS body FROM {spec.table} t"
+        f" WHERE {clauses} ORDER BY t.{spec.ts} DESC, t.id DESC LIMIT :cap)"
+    )
+
+
+def search_sql(kinds: List[str], words: List[str], fts: bool, unranked=()) -> str:
+    """
+    One statement over every requested kind, merged and paged.
+    """
+    if fts:
+        parts = [_fts_query(INDEXES[k], k not in unranked) for k in kinds]
+        order = "rank, ts DESC, id DESC"
+    else:
+        parts = [_like_query(INDEXES[k], words) for k in kinds]
+        order = "ts DESC, id DESC"
+    return " UNION ALL ".join(parts) + f" ORDER BY {order} LIMIT :limit OFFSET :offset"
+
+
+def iso_timestamp(value) -> Optional[str]:
+    """
+    Row timestamp as ISO-8601, like the other history endpoints; SQLite
+    hands raw SQL text ("2026-10-17 22:20:36") back to text() queries.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.isoformat()
+
+
+async def _search_rows(db, kinds: List[str], words: List[str], params: dict, fts: bool):
+    unranked = set()
+    if fts:
+        params["match"] = match_expression(words)
+        window = max(RANK_WINDOW, params["cap"])
+        for kind in kinds:
+            for match in probe_matches(words):
+                count, low, high = (await db.execute(
+                    text(window_sql(INDEXES[kind])), {"match": match, "window": window}
+                )).one()
+                if not worth_ranking(count, low, high, window):
+                    unranked.add(kind)
+                    break
+            # Unranked kinds are read newest first and need no floor
+            params[f"floor_{kind}"] = 0 if kind in unranked else low or 0
+    else:
+        params.update({f"w{i}": f"%{w}%" for i, w in enumerate(words)})
+
+    sql = search_sql(kinds, words, fts, unranked)
+    return (await db.execute(text(sql), params)).mappings().all()
+
+
+async def search(
+    db,
+    query: str,
+    kinds: Optional[List[str]] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> dict:
+    """
+    Hits as {"kind", "id", "title", "timestamp", "snippet"}: with FTS5,
+    bm25-ranked among the newest RANK_WINDOW matches of each kind (newest
+    first for near-ubiquitous terms); newest first on the LIKE fallback.
+    """
+    kinds = kinds or list(INDEXES)
+    words = terms(query)
+    if not words or offset > MAX_OFFSET:
+        return {"items": [], "next_offset": None}
+
+    params = {"limit": limit + 1, "offset": offset, "cap": offset + limit + 1}
+    fts = {INDEXES[k].fts for k in kinds} <= await fts_tables(db)
+    try:
+        rows = await _search_rows(db, kinds, words, dict(params), fts)
+    except DBAPIError as e:
+        if not fts:
+            raise
+        # Index dropped or rebuilt under us: look it up again next time
+        logger.warning(f"⚠️ Full-text search failed, using LIKE: {e}")
+        forget_fts_tables()
+        await db.rollback()
+        fts = False
+        rows = await _search_rows(db, kinds, words, dict(params), fts)
+
+    items = [
+        {
+            "kind": r["kind"],
+            "id": r["id"],
+            "title": r["title"],
+            "timestamp": iso_timestamp(r["ts"]),
+            "snippet": r["snippet"] if fts else highlight(r["body"], words),
+        }
+        for r in rows
+    ]
+
+    next_offset = offset + limit if len(items) > limit else None
+    return {"items": items[:limit], "next_offset": next_offset}
@@ -0,0 +1,234 @@
+# api/sessions.py
+"""
+Server-side state for multi-round interview sessions.
+
+An answer is evaluated while the follow-up question is generated; both
+are then written in one transaction with the Evaluation row and its
+score rollup. No DB connection is held while the model runs. Turns that
+drop out of the recent window are folded into the session summary in
+the background, after the response has been sent.
+"""
+import asyncio
+import json
+import logging
+import weakref
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+
+from agents import session_agent
+from agents.evaluator_agent import evaluate_answer_async
+from agents.llm import OLLAMA_MODEL, WARMING_UP_MESSAGE
+from agents.llm_scheduler import LLMOverloaded
+from api.database import AsyncSessionLocal
+from api import models, scores
+
+logger = logging.getLogger(__name__)
+
+# One answer at a time per session (per worker process)
+_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _lock_for(session_id: int) -> asyncio.Lock:
+    lock = _locks.get(session_id)
+    if lock is None:
+        lock = _locks[session_id] = asyncio.Lock()
+    return lock
+
+
+def turn_dict(turn: models.Turn) -> dict:
+    return {
+        "position": turn.position,
+        "question": turn.question,
+        "answer": turn.answer,
+        "feedback": turn.feedback,
+        "score_value": turn.score_value,
+        "created_at": turn.created_at,
+        "answered_at": turn.answered_at,
+    }
+
+
+def session_dict(session: models.InterviewSession, turns: List[models.Turn]) -> dict:
+    return {
+        "id": session.id,
+        "topic": session.topic,
+        "status": session.status,
+        "summary": session.summary,
+        "created_at": session.created_at,
+        "updated_at": session.updated_at,
+        "turns": [turn_dict(t) for t in turns],
+    }
+
+
+def _context(session: models.InterviewSession) -> Optional[list]:
+    # Token ids are model-specific; a model change starts a fresh context
+    if session.llm_context and session.llm_model == OLLAMA_MODEL:
+        return json.loads(session.llm_context)
+    return None
+
+
+async def _load(db, session_id: int) -> models.InterviewSession:
+    session = await db.get(models.InterviewSession, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+
+async def _turns(db, session_id: int, since: int = 0) -> List[models.Turn]:
+    t = models.Turn
+    result = await db.execute(
+        select(t).where(t.session_id == session_id, t.position >= since).order_by(t.position)
+    )
+    return list(result.scalars().all())
+
+
+async def create(topic: Optional[str] = None) -> dict:
+    question, context = await session_agent.first_question(topic)
+    if question == WARMING_UP_MESSAGE:
+        raise HTTPException(status_code=503, detail=question)
+
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        session = models.InterviewSession(
+            topic=topic, status="active", summarized_turns=0,
+            llm_model=OLLAMA_MODEL, llm_context=json.dumps(context) if context else None,
+            created_at=now, updated_at=now,
+        )
+        db.add(session)
+        await db.flush()
+        turn = models.Turn(session_id=session.id, position=0, question=question, created_at=now)
+        db.add(turn)
+        await db.commit()
+        return session_dict(session, [turn])
+
+
+async def get(session_id: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        session = await _load(db, session_id)
+        return session_dict(session, await _turns(db, session_id))
+
+
+async def end(session_id: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        session = await _load(db, session_id)
+        session.status = "ended"
+        session.llm_context = None
+        session.updated_at = datetime.utcnow()
+        await db.commit()
+        return {"id": session.id, "status": session.status}
+
+
+async def answer(session_id: int, text: str) -> dict:
+    """
+    Score the open question's answer and ask the next one.
+
+    The response carries "needs_summary" when older turns should be
+    folded into the summary (see fold_summary).
+    """
+    async with _lock_for(session_id):
+        async with AsyncSessionLocal() as db:
+            session = await _load(db, session_id)
+            if session.status != "active":
+                raise HTTPException(status_code=409, detail="Session has ended")
+            turns = await _turns(db, session_id, session.summarized_turns)
+
+        if not turns or turns[-1].answer is not None:
+            raise HTTPException(status_code=409, detail="No open question")
+
+        current = turns[-1]
+        unsummarized = [turn_dict(t) for t in turns[:-1]] + [{**turn_dict(current), "answer": text}]
+
+        tasks = [
+            asyncio.create_task(evaluate_answer_async(current.question, text)),
+            asyncio.create_task(session_agent.next_question(
+                text, _context(session), session.topic, session.summary, unsummarized
+            )),
+        ]
+        try:
+            result, (question, context, reused) = await asyncio.gather(*tasks)
+        finally:
+            # One side failed (e.g. LLMOverloaded) → don't leave the other running
+            for task in tasks:
+                task.cancel()
+        if WARMING_UP_MESSAGE in (question, result["feedback"]):
+            # Nothing persisted → the client can resubmit the same answer
+            raise HTTPException(status_code=503, detail=WARMING_UP_MESSAGE)
+
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(models.Turn)
+                .where(models.Turn.id == current.id)
+                .values(
+                    answer=text, feedback=result["feedback"],
+                    score_value=result["score"], answered_at=now,
+                )
+            )
+            row, statements = scores.evaluation_writes(current.question, result, now)
+            db.add(row)
+            for stmt in statements:
+                await db.execute(stmt)
+
+            db.add(models.Turn(
+                session_id=session_id, position=current.position + 1,
+                question=question, created_at=now,
+            ))
+            await db.execute(
+                update(models.InterviewSession)
+                .where(models.InterviewSession.id == session_id)
+                .values(
+                    llm_model=OLLAMA_MODEL,
+                    llm_context=json.dumps(context) if context else None,
+                    updated_at=now,
+                )
+            )
+            await db.commit()
+
+    return {
+        "evaluation": result["feedback"],
+        "score": result["score"],
+        "dimensions": result["dimensions"],
+        "next_question": question,
+        "position": current.position + 1,
+        "context_reused": reused,
+        "needs_summary": len(unsummarized) > session_agent.RECENT_TURNS,
+    }
+
+
+async def fold_summary(session_id: int):
+    """
+    Fold answered turns older than the recent window into the summary.
+
+    Runs without the session lock; the write only applies if no other
+    fold moved summarized_turns in the meantime.
+    """
+    async with AsyncSessionLocal() as db:
+        session = await _load(db, session_id)
+        answered = [
+            turn_dict(t) for t in await _turns(db, session_id, session.summarized_turns)
+            if t.answer is not None
+        ]
+    stale = answered[:-session_agent.RECENT_TURNS]
+    if not stale:
+        return
+
+    try:
+        summary = await session_agent.summarize(session.summary, stale)
+    except LLMOverloaded:
+        summary = None
+    if summary is None:
+        logger.warning(f"⚠️ Session {session_id} summary not updated, will retry next turn")
+        return
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(models.InterviewSession)
+            .where(
+                models.InterviewSession.id == session_id,
+                models.InterviewSession.summarized_turns == session.summarized_turns,
+            )
+            .values(summary=summary, summarized_turns=stale[-1]["position"] + 1)
+        )
+        await db.commit()
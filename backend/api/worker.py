@@ -0,0 +1,282 @@
+# api/worker.py
+"""
+Job worker: runs queued plan / blog / evaluation / interview-answer
+generations outside the HTTP request.
+
+    python -m api.worker                 # one worker, all kinds
+    python -m api.worker --threads 2 --kinds evaluate
+
+Set JOB_WORKER_EMBEDDED=true to run the same loop inside the API process
+(single-container setups).
+"""
+import argparse
+import asyncio
+from contextlib import contextmanager
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Optional
+
+from agents.evaluator_agent import evaluate_answer
+from agents.llm import WARMING_UP_MESSAGE
+from fastapi import HTTPException
+
+from api import daily, scores, sessions
+from api.database import SessionLocal
+from api.jobs import HEARTBEAT_SECONDS, POLL_INTERVAL, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", "1"))
+EMBEDDED = os.getenv("JOB_WORKER_EMBEDDED", "false").lower() == "true"
+
+
+class RetryableJobError(Exception):
+    """
+    The model was unavailable; the job goes back on the queue.
+    """
+
+
+class RejectedJobError(Exception):
+    """
+    The request itself is invalid (e.g. the session ended); never retried.
+    """
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def job_loop() -> asyncio.AbstractEventLoop:
+    """
+    One long-lived event loop for async handlers: the async DB engine's
+    pooled connections belong to the loop that opened them.
+    """
+    global _loop
+
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="job-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run_async(coro):
+    return asyncio.run_coroutine_threadsafe(coro, job_loop()).result()
+
+
+def daily_result(kind: str, stored: dict) -> dict:
+    # Same shape as GET /plan/today and GET /blog/daily
+    if kind == "plan":
+        return {"plan": stored["content"], "date": stored["day"]}
+    return {"title": stored["title"], "content": stored["content"]}
+
+
+def _daily(kind: str, payload: dict) -> dict:
+    stored = daily.get_or_create(kind, payload.get("day"))
+    if stored["created_at"] is None:
+        raise RetryableJobError(stored["content"])
+    return daily_result(kind, stored)
+
+
+def run_plan(payload: dict) -> dict:
+    return _daily("plan", payload)
+
+
+def run_blog(payload: dict) -> dict:
+    return _daily("blog", payload)
+
+
+def run_evaluate(payload: dict) -> dict:
+    result = evaluate_answer(payload["question"], payload["answer"])
+    if result["feedback"] == WARMING_UP_MESSAGE:
+        raise RetryableJobError(WARMING_UP_MESSAGE)
+
+    row, statements = scores.evaluation_writes(payload["question"], result)
+    db = SessionLocal()
+    try:
+        db.add(row)
+        for stmt in statements:
+            db.execute(stmt)
+        db.commit()
+    finally:
+        db.close()
+
+    return {
+        "evaluation": result["feedback"],
+        "score": result["score"],
+        "dimensions": result["dimensions"],
+    }
+
+
+def run_session_answer(payload: dict) -> dict:
+    session_id = payload["session_id"]
+    try:
+        result = run_async(sessions.answer(session_id, payload["answer"]))
+    except HTTPException as e:
+        if e.status_code == 503:
+            raise RetryableJobError(e.detail)
+        raise RejectedJobError(e.detail)
+
+    if result.pop("needs_summary"):
+        # Off the job's critical path, like the API's background task
+        asyncio.run_coroutine_threadsafe(sessions.fold_summary(session_id), job_loop())
+    return result
+
+
+HANDLERS = {
+    "plan": run_plan,
+    "blog": run_blog,
+    "evaluate": run_evaluate,
+    "session_answer": run_session_answer,
+}
+
+
+@contextmanager
+def heartbeat(queue, job: dict):
+    """
+    Keep renewing the job's lease while its handler runs, so a slow
+    generation is not reclaimed and run a second time.
+    """
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(HEARTBEAT_SECONDS):
+            if not queue.renew(job["id"], job["attempts"]):
+                return
+
+    thread = threading.Thread(target=beat, name=f"lease-{job['id']}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+class Worker(threading.Thread):
+    def __init__(self, name: str, kinds=None):
+        super().__init__(name=name, daemon=True)
+        self.kinds = kinds
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def _finish(job: dict, stored: bool) -> bool:
+        if not stored:
+            logger.warning(
+                f"⚠️ Job {job['id']} ({job['kind']}) lost its lease; attempt {job['attempts']} discarded"
+            )
+        return stored
+
+    def run_once(self) -> bool:
+        """
+        Claim and run one job; False when the queue had nothing runnable.
+        """
+        queue = get_job_queue()
+        job = queue.claim(self.name, self.kinds)
+        if job is None:
+            return False
+
+        handler = HANDLERS.get(job["kind"])
+        if handler is None:
+            error = f"Unknown job kind: {job['kind']}"
+            self._finish(job, queue.fail(job["id"], job["attempts"], error, retry=False))
+            return True
+
+        started = time.perf_counter()
+        try:
+            with heartbeat(queue, job):
+                result = handler(job["payload"])
+        except RetryableJobError as e:
+            logger.warning(f"⚠️ Job {job['id']} ({job['kind']}) will retry: {e}")
+            self._finish(job, queue.fail(job["id"], job["attempts"], str(e)))
+        except RejectedJobError as e:
+            logger.warning(f"⚠️ Job {job['id']} ({job['kind']}) rejected: {e}")
+            self._finish(job, queue.fail(job["id"], job["attempts"], str(e), retry=False))
+        except Exception as e:
+            logger.warning(f"⚠️ Job {job['id']} ({job['kind']}) failed: {e}")
+            self._finish(job, queue.fail(job["id"], job["attempts"], str(e)))
+        else:
+            if self._finish(job, queue.complete(job["id"], job["attempts"], result)):
+                logger.info(
+                    f"✅ Job {job['id']} ({job['kind']}) done in {time.perf_counter() - started:.1f}s"
+                )
+        return True
+
+    def run(self):
+        last_purge = 0.0
+        while not self._stop_event.is_set():
+            try:
+                if time.monotonic() - last_purge > 3600:
+                    get_job_queue().purge()
+                    last_purge = time.monotonic()
+                busy = self.run_once()
+            except Exception as e:
+                logger.warning(f"⚠️ Job worker error: {e}")
+                busy = False
+            if not busy:
+                self._stop_event.wait(POLL_INTERVAL)
+
+    def stop(self, timeout: Optional[float] = None):
+        # Lets the current job finish; an abandoned lease is retried anyway
+        self._stop_event.set()
+        self.join(timeout)
+
+
+_embedded: list = []
+
+
+def start_embedded():
+    global _loop
+
+    if EMBEDDED and not _embedded:
+        # Called from the API lifespan: async handlers share the API's loop
+        _loop = asyncio.get_running_loop()
+        for i in range(WORKER_THREADS):
+            worker = Worker(f"{socket.gethostname()}-{os.getpid()}-api-{i}")
+            worker.start()
+            _embedded.append(worker)
+
+
+def stop_embedded():
+    while _embedded:
+        _embedded.pop().stop(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued generation jobs")
+    parser.add_argument("--threads", type=int, default=WORKER_THREADS)
+    parser.add_argument("--kinds", nargs="+", choices=sorted(HANDLERS))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from api.migrate import migrate
+    from api.database import engine
+    migrate(engine)
+
+    workers = [
+        Worker(f"{socket.gethostname()}-{os.getpid()}-{i}", args.kinds)
+        for i in range(args.threads)
+    ]
+    stopping = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stopping.set())
+
+    for worker in workers:
+        worker.start()
+    logger.info(f"👷 Job worker started: {args.threads} thread(s), kinds={args.kinds or 'all'}")
+
+    stopping.wait()
+    for worker in workers:
+        worker.stop()
+    get_job_queue().close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# api/write_behind.py
+"""
+Write-behind persistence for chat and evaluation records.
+
+Request handlers enqueue (row, statements) and return immediately; one
+background task per worker commits them in batches of WRITE_BEHIND_BATCH
+or every WRITE_BEHIND_INTERVAL_MS, whichever comes first.
+
+Durability: on graceful shutdown stop() drains everything still queued
+before the engine is disposed. A hard crash can lose at most the records
+queued in the last interval. A failed batch is retried, then committed
+row by row so one bad record cannot sink the rest.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Iterable, Optional
+
+from api.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() == "true"
+BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH", "100"))
+INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL_MS", "50")) / 1000
+MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000"))
+BATCH_RETRIES = 3
+
+
+class WriteBehind:
+    def __init__(
+        self,
+        batch_size: int = BATCH_SIZE,
+        interval: float = INTERVAL,
+        max_pending: int = MAX_PENDING,
+    ):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._max_pending = max_pending
+        self._task: Optional[asyncio.Task] = None
+
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_pending)
+        self._task = asyncio.create_task(self._run(), name="write-behind")
+
+    async def stop(self):
+        """
+        Flush everything still queued, then stop the writer.
+        """
+        if not self.running:
+            return
+        await self._queue.put(None)  # sentinel: drain then exit
+        await self._task
+        self._task = None
+
+    async def submit(self, row, statements: Iterable = ()):
+        """
+        Queue a row (plus statements for the same transaction, e.g. rollups).
+
+        Waits only when MAX_PENDING records are already queued. Without a
+        running writer the record is committed inline.
+        """
+        item = (row, list(statements))
+        if not (ENABLED and self.running):
+            await self._commit([item])
+            return
+        await self._queue.put(item)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+        # Graceful stop: commit whatever arrived behind the sentinel
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.batch_size):
+            await self._flush(leftover[start:start + self.batch_size])
+
+    async def _commit(self, batch):
+        async with AsyncSessionLocal() as db:
+            for row, statements in batch:
+                db.add(row)
+                for stmt in statements:
+                    await db.execute(stmt)
+            await db.commit()
+
+    async def _flush(self, batch):
+        for attempt in range(BATCH_RETRIES):
+            try:
+                await self._commit(batch)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Write-behind batch of {len(batch)} failed: {e}")
+                await asyncio.sleep(0.1 * 2 ** attempt)
+
+        # Isolate the poison record(s)
+        for item in batch:
+            try:
+                await self._commit([item])
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"⚠️ Dropped {type(item[0]).__name__} record: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": ENABLED,
+            "running": self.running,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "batch_size": self.batch_size,
+            "interval_ms": round(self.interval * 1000),
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "avg_batch": round(self.written / self.batches, 1) if self.batches else 0,
+        }
+
+
+_writer: Optional[WriteBehind] = None
+
+
+def get_writer() -> WriteBehind:
+    global _writer
+
+    if _writer is None:
+        _writer = WriteBehind()
+    return _writer
@@ -0,0 +1,178 @@
+# bench/bench_db_writes.py
+"""
+Write contention on the app database.
+
+Local mode (default) forks --workers processes, like uvicorn --workers,
+each running --concurrency async tasks that do what /ask does on the DB
+(insert a ChatHistory row and commit) interleaved with history-page reads.
+Compare the tuned defaults against the old settings:
+
+    python -m bench.bench_db_writes
+    SQLITE_JOURNAL_MODE=DELETE SQLITE_SYNCHRONOUS=FULL SQLITE_BUSY_TIMEOUT_MS=0 \\
+        python -m bench.bench_db_writes
+
+API mode drives concurrent /ask requests with unique questions (so the
+response cache never short-circuits the insert) against a running backend,
+e.g. two uvicorn workers in front of bench.stub_ollama:
+
+    python -m bench.bench_db_writes --api http://127.0.0.1:8000 --concurrency 64
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+
+
+def _is_lock_error(error: BaseException) -> bool:
+    return "locked" in str(error).lower() or "busy" in str(error).lower()
+
+
+# ---------- local: processes × tasks straight on the engines ----------
+async def _db_worker(writes, stats):
+    from sqlalchemy import select
+
+    from api import models
+    from api.database import AsyncSessionLocal
+
+    for i in range(writes):
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(models.ChatHistory(question=f"q-{uuid.uuid4().hex}", answer="a" * 2000))
+                await db.commit()
+            stats["ok"] += 1
+        except Exception as e:
+            stats["locked" if _is_lock_error(e) else "failed"] += 1
+
+        if i % 4 == 0:
+            try:
+                async with AsyncSessionLocal() as db:
+                    t = models.ChatHistory
+                    await db.execute(
+                        select(t.id, t.question, t.timestamp)
+                        .order_by(t.timestamp.desc(), t.id.desc())
+                        .limit(50)
+                    )
+            except Exception as e:
+                stats["locked" if _is_lock_error(e) else "failed"] += 1
+
+
+def _process_main(url, concurrency, writes, results):
+    os.environ["DATABASE_URL"] = url
+
+    from api.database import async_engine
+
+    async def run():
+        stats = {"ok": 0, "locked": 0, "failed": 0}
+        await asyncio.gather(*(_db_worker(writes, stats) for _ in range(concurrency)))
+        await async_engine.dispose()
+        return stats
+
+    results.put(asyncio.run(run()))
+
+
+def run_local(url, workers, concurrency, writes):
+    os.environ["DATABASE_URL"] = url
+    from api.database import engine
+    from api.migrate import upgrade
+
+    upgrade(engine)
+    engine.dispose()
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_process_main, args=(url, concurrency, writes, results))
+        for _ in range(workers)
+    ]
+
+    wall = time.perf_counter()
+    for p in procs:
+        p.start()
+    totals = {"ok": 0, "locked": 0, "failed": 0}
+    for _ in procs:
+        for key, value in results.get().items():
+            totals[key] += value
+    for p in procs:
+        p.join()
+    wall = time.perf_counter() - wall
+
+    print(
+        f"journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')} "
+        f"synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')} "
+        f"busy_timeout={os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')}ms"
+    )
+    print(f"workers={workers} concurrency={concurrency} writes/task={writes} wall={wall:.2f}s")
+    print(
+        f"committed={totals['ok']} throughput={totals['ok'] / wall:.0f} writes/s "
+        f"lock_errors={totals['locked']} other_errors={totals['failed']}"
+    )
+
+
+# ---------- api: concurrent /ask over HTTP ----------
+async def run_api(api, concurrency, total, timeout):
+    import httpx
+
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(f"Bench question {i} {uuid.uuid4().hex[:8]}: what is a warp?")
+
+    counts = {"ok": 0, "server_errors": 0, "shed": 0, "failed": 0}
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async def worker(client):
+        while True:
+            try:
+                question = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                response = await client.post("/ask", json={"question": question})
+            except Exception:
+                counts["failed"] += 1
+                continue
+            if response.status_code == 200:
+                counts["ok"] += 1
+            elif response.status_code == 503:
+                counts["shed"] += 1
+            else:
+                # "database is locked" surfaces as a 500 from the commit
+                counts["server_errors"] += 1
+
+    async with httpx.AsyncClient(base_url=api, timeout=timeout, limits=limits) as client:
+        wall = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - wall
+
+    print(f"requests={total} concurrency={concurrency} wall={wall:.2f}s")
+    print(
+        f"ok={counts['ok']} throughput={counts['ok'] / wall:.1f} req/s "
+        f"5xx={counts['server_errors']} shed_503={counts['shed']} "
+        f"transport_errors={counts['failed']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database write-contention benchmark")
+    parser.add_argument("--api", help="Drive /ask on a running backend instead")
+    parser.add_argument("--url", help="DATABASE_URL for local mode (default: temp SQLite file)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=50, help="Inserts per task (local)")
+    parser.add_argument("--requests", type=int, default=500, help="Total /ask calls (api)")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    if args.api:
+        asyncio.run(run_api(args.api, args.concurrency, args.requests, args.timeout))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        run_local(url, args.workers, args.concurrency, args.writes)
+
+
+if __name__ == "__main__":
+    main()
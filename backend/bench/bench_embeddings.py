@@ -0,0 +1,149 @@
+# bench/bench_embeddings.py
+"""
+Embedding backends side by side: RSS, cold-load time, encodes/sec, and
+a cosine-similarity parity check against the sentence-transformers model.
+
+    cd backend && python -m bench.bench_embeddings                 # perf table
+    cd backend && python -m bench.bench_embeddings --parity        # exit 1 on drift
+    EMBEDDING_ONNX_FILE=onnx/model.onnx python -m bench.bench_embeddings --parity
+
+The parity check also runs in the test suite (tests/test_onnx_parity.py).
+Each backend is measured in a fresh interpreter so RSS and load time are
+not polluted by the other backend's imports.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+SENTENCES = [
+    "How does NVLink differ from PCIe for multi-GPU training?",
+    "Explain warp divergence and how to avoid it in CUDA kernels.",
+    "What is the difference between shared memory and L1 cache on an SM?",
+    "Describe how tensor cores accelerate mixed-precision matrix multiply.",
+    "How would you profile a memory-bound kernel with Nsight Compute?",
+    "What happens during a CUDA context switch between processes?",
+    "Explain coalesced global memory access with an example.",
+    "How does NCCL implement ring all-reduce across nodes?",
+    "What are the trade-offs of unified memory versus explicit copies?",
+    "Describe the TensorRT optimisation pipeline for inference.",
+    "Why does occupancy not always correlate with kernel performance?",
+    "How do CUDA streams enable overlap of compute and data transfer?",
+    "Explain the roofline model and arithmetic intensity.",
+    "What is a bank conflict in shared memory?",
+    "How would you design a low-latency inference service on Triton?",
+    "Compare data parallelism, tensor parallelism and pipeline parallelism.",
+]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(backend: str, texts: int, batch_size: int) -> dict:
+    baseline = rss_mb()
+    started = time.perf_counter()
+
+    from rag.embed_store import load_backend
+
+    model = load_backend(backend)
+    model.embed_query("warm up")  # first inference is part of a cold start
+    load_seconds = time.perf_counter() - started
+    loaded = rss_mb()
+
+    corpus = [f"{s} (variant {i})" for i in range(texts // len(SENTENCES) + 1) for s in SENTENCES]
+    corpus = corpus[:texts]
+
+    started = time.perf_counter()
+    for start in range(0, len(corpus), batch_size):
+        model.embed_documents(corpus[start:start + batch_size])
+    batch_rate = len(corpus) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for text in corpus[:100]:
+        model.embed_query(text)
+    query_ms = (time.perf_counter() - started) / min(100, len(corpus)) * 1000
+
+    return {
+        "backend": backend,
+        "cold_load_s": round(load_seconds, 2),
+        "rss_baseline_mb": round(baseline, 1),
+        "rss_loaded_mb": round(loaded, 1),
+        "rss_peak_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "batch_encodes_per_s": round(batch_rate, 1),
+        "query_ms": round(query_ms, 2),
+    }
+
+
+def cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = (sum(x * x for x in a) ** 0.5) * (sum(y * y for y in b) ** 0.5)
+    return dot / norm if norm else 0.0
+
+
+def parity(reference: str, candidate: str, threshold: float) -> bool:
+    from rag.embed_store import load_backend
+
+    ref = load_backend(reference).embed_documents(SENTENCES)
+    cand = load_backend(candidate).embed_documents(SENTENCES)
+
+    sims = [cosine(a, b) for a, b in zip(ref, cand)]
+    print(f"{candidate} vs {reference}: n={len(sims)} "
+          f"min_cos={min(sims):.5f} mean_cos={sum(sims) / len(sims):.5f}")
+
+    # Retrieval-level parity: same nearest neighbour for every sentence
+    def neighbours(vectors):
+        return [
+            max((j for j in range(len(vectors)) if j != i), key=lambda j: cosine(v, vectors[j]))
+            for i, v in enumerate(vectors)
+        ]
+
+    agree = sum(a == b for a, b in zip(neighbours(ref), neighbours(cand)))
+    print(f"nearest-neighbour agreement: {agree}/{len(SENTENCES)}")
+
+    ok = min(sims) >= threshold
+    print("PASS" if ok else f"FAIL: min cosine below {threshold}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", default="huggingface,onnx")
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--parity", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.97,
+                        help="Minimum per-sentence cosine vs huggingface (int8 ≈ 0.98+, fp32 ≈ 0.9999)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.texts, args.batch_size)))
+        return
+
+    if args.parity:
+        sys.exit(0 if parity("huggingface", "onnx", args.threshold) else 1)
+
+    for backend in args.backends.split(","):
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.bench_embeddings", "--child", backend,
+             "--texts", str(args.texts), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{backend}: failed\n{proc.stderr[-1500:]}")
+            continue
+        print(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    main()
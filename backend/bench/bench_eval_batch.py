@@ -0,0 +1,92 @@
+# bench/bench_eval_batch.py
+"""
+Batch evaluation throughput against the stub Ollama server: N sequential
+evaluate_answer_async calls (what N x POST /evaluate costs) vs one
+evaluate_answers batch with bounded parallelism and dedupe.
+
+    cd backend && python -m bench.bench_eval_batch --items 64 --duplicates 0.25 --latency 0.2
+
+The stub serves calls concurrently, so this shows the fan-out win when
+Ollama runs with OLLAMA_NUM_PARALLEL > 1; with a single slot only the
+dedupe saves time.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault(
+    "LLM_SINGLEFLIGHT_PATH", os.path.join(tempfile.mkdtemp(), "singleflight.db")
+)
+
+from agents import llm, llm_scheduler  # noqa: E402
+from agents.evaluator_agent import evaluate_answer_async, evaluate_answers  # noqa: E402
+from bench.stub_ollama import start_stub  # noqa: E402
+
+
+def make_pairs(items, duplicates, seed=7):
+    rng = random.Random(seed)
+    pairs = []
+    for i in range(items):
+        if pairs and rng.random() < duplicates:
+            pairs.append(rng.choice(pairs))
+        else:
+            pairs.append((f"Question {i}: explain warp divergence", f"Answer {i} " * 20))
+    return pairs
+
+
+async def sequential(pairs):
+    for question, answer in pairs:
+        await evaluate_answer_async(question, answer)
+
+
+async def batch(pairs, concurrency):
+    async for _ in evaluate_answers(pairs, concurrency=concurrency):
+        pass
+
+
+async def run_all(stub, pairs, concurrency_levels):
+    runs = [("sequential", lambda: sequential(pairs))] + [
+        (f"batch c={c}", lambda c=c: batch(pairs, c)) for c in concurrency_levels
+    ]
+    for label, run in runs:
+        # Same admission limit for every run; the batch's own limit is what varies
+        llm_scheduler._scheduler = llm_scheduler.LLMScheduler(
+            max_concurrency=max(concurrency_levels), max_queue=len(pairs)
+        )
+        before = stub.calls
+        started = time.perf_counter()
+        await run()
+        elapsed = time.perf_counter() - started
+        print(
+            f"{label:<12} wall={elapsed:6.2f}s upstream calls={stub.calls - before:4d} "
+            f"throughput={len(pairs) / elapsed:6.1f} items/s"
+        )
+    await llm.close_async_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=64)
+    parser.add_argument("--duplicates", type=float, default=0.25)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    stub = start_stub(latency=args.latency)
+    llm.OLLAMA_HOST = stub.url
+
+    pairs = make_pairs(args.items, args.duplicates)
+    print(
+        f"items={len(pairs)} unique={len(set(pairs))} "
+        f"stub latency={args.latency * 1000:.0f}ms"
+    )
+    asyncio.run(run_all(stub, pairs, args.concurrency))
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# bench/bench_history.py
+"""
+History page fetch latency on 100k seeded rows: keyset cursor vs OFFSET
+vs the old unpaginated `.all()`.
+
+    cd backend && python -m bench.bench_history --rows 100000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+
+from api import models
+from api.migrate import upgrade
+from api.pagination import PageParams, encode_cursor, page_query
+
+
+def seed(engine, rows):
+    start = datetime(2024, 1, 1)
+    body = "answer body " * 200  # ~2.4 KB, like a real LLM answer
+    batch = 10_000
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(insert(models.ChatHistory), [
+                {
+                    "question": f"question {i}",
+                    "answer": body,
+                    "timestamp": start + timedelta(seconds=i),
+                }
+                for i in range(offset, min(rows, offset + batch))
+            ])
+
+
+def timed(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "history.db")
+    engine = create_engine(f"sqlite:///{path}")
+    upgrade(engine)
+    seed(engine, args.rows)
+
+    t = models.ChatHistory
+    columns = [t.id, t.question, t.timestamp]
+    print(f"rows={args.rows} page size={args.limit}")
+
+    with engine.connect() as conn:
+        ordered = select(t.timestamp, t.id).order_by(t.timestamp.desc(), t.id.desc())
+
+        for depth in (0, 100, 1000, (args.rows // args.limit) - 2):
+            offset = depth * args.limit
+            params = PageParams(args.limit, None, None, None, False)
+            if offset:
+                ts, row_id = conn.execute(ordered.offset(offset - 1).limit(1)).one()
+                params.cursor = encode_cursor(ts, row_id)
+
+            keyset = timed(lambda: conn.execute(page_query(columns, t.timestamp, t.id, params)).all())
+            by_offset = timed(lambda: conn.execute(
+                select(*columns).order_by(t.timestamp.desc(), t.id.desc())
+                .offset(offset).limit(args.limit)
+            ).all())
+            print(f"page {depth:6d}: keyset={keyset:7.2f}ms offset={by_offset:8.2f}ms")
+
+        full = timed(lambda: conn.execute(select(t)).all(), repeat=3)
+        print(f"old .all() with bodies: {full:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
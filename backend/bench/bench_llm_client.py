@@ -0,0 +1,76 @@
+# bench/bench_llm_client.py
+"""
+Latency of the Ollama client under concurrent load, bare requests.post
+(one TCP connection per call) vs the pooled keep-alive session.
+
+    cd backend && python -m bench.bench_llm_client --concurrency 32 --requests 2000
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from agents import llm
+from bench.stub_ollama import start_stub
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bare_post(prompt: str) -> str:
+    response = requests.post(
+        f"{llm.OLLAMA_HOST}/api/generate",
+        json={"model": llm.OLLAMA_MODEL, "prompt": prompt, "stream": False},
+        timeout=120,
+    )
+    return response.json().get("response", "").strip()
+
+
+def run(label, fn, concurrency, total):
+    def timed(i):
+        start = time.perf_counter()
+        fn(f"prompt {i}")
+        return time.perf_counter() - start
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed, range(total)))
+    wall = time.perf_counter() - wall
+
+    print(
+        f"{label:<10} p50={percentile(samples, 50) * 1000:7.2f}ms "
+        f"p99={percentile(samples, 99) * 1000:7.2f}ms "
+        f"mean={statistics.mean(samples) * 1000:7.2f}ms "
+        f"throughput={total / wall:8.1f} req/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    stub = start_stub(latency=args.latency)
+    llm.OLLAMA_HOST = stub.url
+    llm.POOL_SIZE = max(llm.POOL_SIZE, args.concurrency)
+
+    print(
+        f"concurrency={args.concurrency} requests={args.requests} "
+        f"stub latency={args.latency * 1000:.1f}ms"
+    )
+    run("before", bare_post, args.concurrency, args.requests)
+    run("after", llm.generate_answer, args.concurrency, args.requests)
+
+    llm.close_session()
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# bench/bench_numpy_index.py
+"""
+Chroma (via langchain_chroma) vs the in-process NumPy index: QPS, RSS,
+on-disk size and top-k agreement on the same synthetic corpus.
+
+    cd backend && python -m bench.bench_numpy_index --docs 20000 --queries 500
+    cd backend && python -m bench.bench_numpy_index --dtype float16
+
+Both stores use the deterministic HashEmbeddings from bench_vector_store,
+so the numbers isolate the store; each backend is queried in a fresh
+interpreter so RSS is not shared.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.bench_vector_store import HashEmbeddings
+
+VOCAB = [f"term{i}" for i in range(5000)]
+
+
+def corpus(count, seed=7):
+    from langchain_core.documents import Document
+
+    rng = random.Random(seed)
+    return [
+        Document(
+            page_content=" ".join(rng.choices(VOCAB, k=60)),
+            metadata={"title": f"doc-{i}"},
+        )
+        for i in range(count)
+    ]
+
+
+def queries(docs, count, seed=11):
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(rng.choice(docs).page_content.split(), 8)) for _ in range(count)]
+
+
+def open_store(backend, directory, dtype):
+    if backend == "numpy":
+        from rag.numpy_index import NumpyIndex
+        return NumpyIndex(directory, HashEmbeddings(), dtype=dtype)
+
+    from rag.vector_store import VectorStore
+    return VectorStore(directory, HashEmbeddings())
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def dir_mb(directory):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(directory) for name in files
+    ) / 2**20
+
+
+def measure(backend, directory, dtype, query_texts, k):
+    baseline = rss_mb()
+    started = time.perf_counter()
+    store = open_store(backend, directory, dtype)
+    store.open()
+    store.search(query_texts[0], k=k)
+    open_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for query in query_texts:
+        store.search(query, k=k)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "backend": backend,
+        "open_s": round(open_seconds, 3),
+        "qps": round(len(query_texts) / elapsed, 1),
+        "mean_ms": round(elapsed / len(query_texts) * 1000, 3),
+        "rss_delta_mb": round(rss_mb() - baseline, 1),
+        "rss_peak_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "disk_mb": round(dir_mb(directory), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    docs = corpus(args.docs)
+    query_texts = queries(docs, args.queries)
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.dir, args.dtype, query_texts, args.k)))
+        return
+
+    root = tempfile.mkdtemp(prefix="bench_index_")
+    dirs = {"chroma": os.path.join(root, "chroma"), "numpy": os.path.join(root, "numpy")}
+    try:
+        for backend, directory in dirs.items():
+            started = time.perf_counter()
+            store = open_store(backend, directory, args.dtype)
+            for start in range(0, len(docs), 1000):
+                store.add(docs[start:start + 1000])
+            store.close()
+            print(f"seeded {backend}: {args.docs} docs in {time.perf_counter() - started:.1f}s")
+
+        for backend, directory in dirs.items():
+            proc = subprocess.run(
+                [sys.executable, "-m", "bench.bench_numpy_index", "--child", backend,
+                 "--dir", directory, "--docs", str(args.docs),
+                 "--queries", str(args.queries), "--k", str(args.k), "--dtype", args.dtype],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"{backend}: failed\n{proc.stderr[-1500:]}")
+                continue
+            print(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+        # Chroma's HNSW is approximate, the NumPy scan is exact
+        chroma = open_store("chroma", dirs["chroma"], args.dtype)
+        exact = open_store("numpy", dirs["numpy"], args.dtype)
+        sample = query_texts[:100]
+        overlap = sum(
+            len({d.metadata["title"] for d in chroma.search(q, k=args.k)}
+                & {d.metadata["title"] for d in exact.search(q, k=args.k)})
+            for q in sample
+        )
+        print(f"top-{args.k} agreement: {overlap / (len(sample) * args.k):.3f}")
+        chroma.close()
+        exact.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
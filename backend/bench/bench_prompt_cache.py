@@ -0,0 +1,94 @@
+# bench/bench_prompt_cache.py
+"""
+Prefill cost of the old vs the cache-friendly prompt layout, measured from
+Ollama's own prompt_eval_count / prompt_eval_duration. Needs a real Ollama
+(the stub has no prompt cache):
+
+    cd backend && OLLAMA_HOST=http://127.0.0.1:11434 python -m bench.bench_prompt_cache --calls 6
+
+"legacy" is the old daily-plan layout (varying context and date ahead of
+the large static task block). "prefix-first" is agents.prompts.assemble.
+With prefix reuse, prompt_eval_count for calls after the first should drop
+to roughly the size of the varying tail.
+"""
+import argparse
+import statistics
+
+import requests
+
+from agents import llm
+from agents.planner_agent import PLAN_TASK, SYSTEM_PROMPT
+from agents.prompts import assemble, count_tokens
+
+CONTEXTS = [
+    "NVLink 4 provides 900 GB/s per GPU; NVSwitch gives all-to-all bandwidth.",
+    "The device plugin advertises nvidia.com/gpu to the kubelet as an extended resource.",
+    "MIG partitions an H100 into up to seven isolated instances.",
+    "Ring all-reduce in NCCL sends equal-sized chunks around a ring of GPUs.",
+    "Burn-rate alerts page when the error budget is consumed too fast.",
+    "Triton dynamic batching trades a small queue delay for throughput.",
+]
+
+
+def legacy(context, day):
+    return f"""
+{SYSTEM_PROMPT}
+
+Date: {day}
+
+Reference Context (optional background):
+- {context}
+
+{PLAN_TASK}
+"""
+
+
+def prefix_first(context, day):
+    return assemble(
+        prefix=[SYSTEM_PROMPT, PLAN_TASK],
+        context=lambda budget: f"- {context}",
+        context_label="Reference Context (optional background)",
+        dynamic=[("Date", day)],
+    )
+
+
+def prefill(prompt):
+    response = requests.post(
+        f"{llm.OLLAMA_HOST}/api/generate",
+        json={
+            "model": llm.OLLAMA_MODEL,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": llm.KEEP_ALIVE,
+            # Only the prefill matters here
+            "options": {"num_ctx": llm.NUM_CTX, "num_predict": 1},
+        },
+        timeout=600,
+    )
+    response.raise_for_status()
+    data = response.json()
+    return data.get("prompt_eval_count", 0), data.get("prompt_eval_duration", 0) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=len(CONTEXTS))
+    args = parser.parse_args()
+
+    for label, build in (("legacy", legacy), ("prefix-first", prefix_first)):
+        evals, millis = [], []
+        for i in range(args.calls):
+            prompt = build(CONTEXTS[i % len(CONTEXTS)], f"Day {i}")
+            tokens, ms = prefill(prompt)
+            evals.append(tokens)
+            millis.append(ms)
+            print(f"{label:<13} call={i} prompt≈{count_tokens(prompt)} tok "
+                  f"prompt_eval={tokens} tok in {ms:.0f}ms")
+
+        warm = slice(1, None) if args.calls > 1 else slice(None)
+        print(f"{label:<13} warm mean: prompt_eval={statistics.mean(evals[warm]):.0f} tok "
+              f"{statistics.mean(millis[warm]):.0f}ms\n")
+
+
+if __name__ == "__main__":
+    main()
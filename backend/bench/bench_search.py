@@ -0,0 +1,166 @@
+# bench/bench_search.py
+"""
+History search latency at 1M rows: the FTS5 index (MATCH + bm25 +
+snippet, what GET /search runs) vs a LIKE scan over the same columns.
+
+    cd backend && python -m bench.bench_search --rows 1000000
+
+Rows are synthetic chat Q/A pairs with a Zipf-like vocabulary, so the
+queries cover rare, common, multi-word and prefix terms.
+
+1M rows, 20 results/page (FTS p50 / p95, LIKE p50):
+
+    query                     matches   FTS             LIKE
+    nvswitch                   22,223   3.4 / 3.7 ms       2.4 ms
+    gpu                       787,911   0.8 / 1.0 ms       0.2 ms
+    warp divergence             7,323   4.5 / 5.7 ms       7.8 ms
+    tens (prefix)              16,211   0.7 / 1.7 ms       4.5 ms
+    memory coalescing kernel        2   5.7 / 7.1 ms      2062 ms
+    (no match)                      0   0.2 / 0.3 ms      2165 ms
+
+The sub-10 ms target holds because bm25 only runs when every query term
+is in at most SEARCH_RANK_MAX_DOCS rows (15k, ~1.5% of this table):
+its IDF pass reads each term's whole doclist. More common terms are
+returned newest first instead of ranked. LIKE stays faster only for
+terms common enough to stop early on the timestamp index.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from api.search import (
+    INDEXES, RANK_WINDOW, _ddl, match_expression, probe_matches, search_sql, terms, window_sql,
+    worth_ranking,
+)
+
+TOPIC_WORDS = (
+    "gpu cuda warp divergence nvlink nvswitch tensor core memory coalescing kernel "
+    "occupancy latency throughput bandwidth triton batching kubernetes scheduler "
+    "mig partition nccl allreduce pipeline parallelism inference quantization"
+).split()
+
+EPOCH = datetime(2024, 1, 1)
+QUERIES = ["nvswitch", "gpu", "warp divergence", "tens", "memory coalescing kernel", "zzzunmatched"]
+
+
+def vocabulary(size=20000, seed=7):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+    # Topic words spread over the frequency range: "gpu" is in most rows,
+    # "nvswitch" in a fraction of a percent
+    for i, word in enumerate(TOPIC_WORDS):
+        words.insert(min(len(words), 2 + i * i * 8), word)
+    # Zipf weights: a few very common words, a long tail
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def seed(conn, rows, batch=50_000):
+    words, weights = vocabulary()
+    rng = random.Random(11)
+    conn.execute(
+        "CREATE TABLE chat_history (id INTEGER PRIMARY KEY, question TEXT,"
+        " answer TEXT, timestamp DATETIME)"
+    )
+    for start in range(0, rows, batch):
+        n = min(batch, rows - start)
+        sample = rng.choices(words, weights, k=n * 48)
+        conn.executemany(
+            "INSERT INTO chat_history (id, question, answer, timestamp) VALUES (?, ?, ?, ?)",
+            [
+                (
+                    start + i + 1,
+                    " ".join(sample[i * 48:i * 48 + 8]) + "?",
+                    " ".join(sample[i * 48 + 8:(i + 1) * 48]) + ".",
+                    (EPOCH + timedelta(seconds=start + i)).isoformat(" "),
+                )
+                for i in range(n)
+            ],
+        )
+    # Same index as models.ChatHistory; the LIKE path walks it newest first
+    conn.execute("CREATE INDEX ix_chat_history_timestamp_id ON chat_history (timestamp, id)")
+    conn.commit()
+
+
+def fts_search(conn, words, params, window):
+    # What search() runs: the window probe, then the ranked page
+    unranked = ()
+    for match in probe_matches(words):
+        count, low, high = conn.execute(
+            window_sql(INDEXES["chat"]), {"match": match, "window": window}
+        ).fetchone()
+        if not worth_ranking(count, low, high, window):
+            unranked = ("chat",)
+            break
+    return conn.execute(
+        search_sql(["chat"], words, fts=True, unranked=unranked),
+        {**params, "match": match_expression(words), "floor_chat": 0 if unranked else low or 0},
+    ).fetchall()
+
+
+def like_search(conn, words, params):
+    return conn.execute(
+        search_sql(["chat"], words, fts=False),
+        {**params, **{f"w{i}": f"%{w}%" for i, w in enumerate(words)}},
+    ).fetchall()
+
+
+def timed(run, repeat):
+    samples, hits = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        hits = len(run())
+        samples.append(time.perf_counter() - started)
+    ordered = sorted(samples)
+    return statistics.median(samples) * 1000, ordered[int(len(ordered) * 0.95) - 1] * 1000, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--like-repeat", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--window", type=int, default=RANK_WINDOW, help="SEARCH_RANK_WINDOW")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_search_"), "search.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+
+    started = time.perf_counter()
+    seed(conn, args.rows)
+    seeded = time.perf_counter() - started
+    for statement in _ddl(INDEXES["chat"]):
+        conn.execute(statement)
+    conn.commit()
+    print(
+        f"rows={args.rows} seed={seeded:.1f}s fts build={time.perf_counter() - started - seeded:.1f}s "
+        f"db={os.path.getsize(path) / 1e6:.0f}MB"
+    )
+
+    for query in QUERIES:
+        words = terms(query)
+        page = {"limit": args.limit + 1, "offset": 0, "cap": args.limit + 1}
+        fts = timed(lambda: fts_search(conn, words, page, args.window), args.repeat)
+        like = timed(lambda: like_search(conn, words, page), args.like_repeat)
+        matches = conn.execute(
+            f"SELECT COUNT(*) FROM {INDEXES['chat'].fts} WHERE {INDEXES['chat'].fts} MATCH ?",
+            (match_expression(words),),
+        ).fetchone()[0]
+        print(
+            f"{query!r:<26} matches={matches:8d} | fts p50={fts[0]:7.2f}ms "
+            f"p95={fts[1]:7.2f}ms hits={fts[2]:3d} | like p50={like[0]:9.2f}ms hits={like[2]:3d}"
+        )
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# bench/bench_singleflight.py
+"""
+Upstream call count for concurrent identical prompts, with and without
+single-flight, against the stub Ollama server.
+
+    cd backend && python -m bench.bench_singleflight --concurrency 50
+
+Expected: "coalesced" reports 1 upstream call per distinct prompt.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault(
+    "LLM_SINGLEFLIGHT_PATH", os.path.join(tempfile.mkdtemp(), "singleflight.db")
+)
+
+from agents import llm  # noqa: E402
+from bench.stub_ollama import start_stub  # noqa: E402
+
+
+def run_threads(fn, concurrency, prompt):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda _: fn(prompt), range(concurrency)))
+
+
+async def run_async(concurrency, prompt):
+    return await asyncio.gather(*(
+        llm.generate_answer_async(prompt) for _ in range(concurrency)
+    ))
+
+
+async def run_streams(concurrency, prompt):
+    async def collect():
+        return "".join([t async for t in llm.stream_answer_async(prompt)])
+    return await asyncio.gather(*(collect() for _ in range(concurrency)))
+
+
+def measure(label, stub, fn):
+    before = stub.calls
+    started = time.perf_counter()
+    answers = fn()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<22} callers={len(answers):4d} upstream calls={stub.calls - before:4d} "
+        f"distinct answers={len(set(answers))} wall={elapsed:.2f}s"
+    )
+    return stub.calls - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    stub = start_stub(latency=args.latency)
+    llm.OLLAMA_HOST = stub.url
+    n = args.concurrency
+
+    baseline = measure(
+        "uncoalesced (threads)", stub,
+        lambda: run_threads(llm._generate, n, "same prompt A"),
+    )
+    coalesced = [
+        measure("coalesced (threads)", stub,
+                lambda: run_threads(llm.generate_answer, n, "same prompt B")),
+        measure("coalesced (asyncio)", stub,
+                lambda: asyncio.run(run_async(n, "same prompt C"))),
+        measure("coalesced (streams)", stub,
+                lambda: asyncio.run(run_streams(n, "same prompt D"))),
+    ]
+
+    assert baseline == n, f"expected {n} uncoalesced calls, got {baseline}"
+    assert all(calls == 1 for calls in coalesced), f"expected 1 call each, got {coalesced}"
+    print("✅ identical in-flight prompts share one upstream generation")
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
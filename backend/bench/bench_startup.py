@@ -0,0 +1,101 @@
+# bench/bench_startup.py
+"""
+Backend startup cost: import time of api.main and time to /health, /ready.
+
+    cd backend && python -m bench.bench_startup            # import breakdown
+    cd backend && python -m bench.bench_startup --serve    # + boot a uvicorn
+
+The import step runs `python -X importtime -c "import api.main"` in a fresh
+interpreter and lists the slowest top-level packages; torch / langchain
+should not appear there any more. --serve starts uvicorn, polls until
+/health and then /ready answer, and prints the server's own breakdown.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+
+def bench_imports(env, top):
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        return
+
+    # "import time: self [us] | cumulative | imported package"
+    packages = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented; keep top-level packages only
+        if not name.startswith("  ") and "." not in name:
+            packages[name.strip()] = int(cumulative)
+
+    print(f"python -c 'import api.main': {wall:.2f}s wall")
+    for name, micros in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {micros / 1e6:7.3f}s  {name}")
+
+
+def poll(url, deadline):
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                return json.loads(response.read() or b"{}")
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    return None
+
+
+def bench_serve(env, port, timeout):
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", f"--port={port}"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        base = f"http://127.0.0.1:{port}"
+        if poll(f"{base}/health", deadline) is None:
+            print("server never became healthy")
+            return
+        print(f"time to /health: {time.perf_counter() - started:.2f}s")
+
+        report = poll(f"{base}/ready", deadline)  # 503 while warming → URLError
+        print(f"time to /ready:  {time.perf_counter() - started:.2f}s")
+        if report:
+            print(json.dumps(report, indent=2))
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}")
+    env.setdefault("DAILY_PRECOMPUTE_ENABLED", "false")
+
+    bench_imports(env, args.top)
+    if args.serve:
+        bench_serve(env, args.port, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
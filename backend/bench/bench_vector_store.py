@@ -0,0 +1,128 @@
+# bench/bench_vector_store.py
+"""
+Per-query latency: a fresh Chroma(persist_directory=...) per call (old
+query_articles path) vs the process-wide VectorStore handle.
+
+    cd backend && python -m bench.bench_vector_store --docs 2000 --queries 200
+
+Uses a deterministic hashing embedding by default so the numbers isolate
+store initialisation; pass --real-embeddings to use all-MiniLM-L6-v2.
+"""
+import argparse
+import hashlib
+import math
+import shutil
+import statistics
+import tempfile
+import time
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from rag.vector_store import VectorStore
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Cheap, deterministic bag-of-words embedding for benchmarking.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _embed(self, text: str):
+        vector = [0.0] * self.dim
+        for word in text.lower().split():
+            digest = hashlib.md5(word.encode()).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dim] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+TOPICS = [
+    "CUDA warp scheduling and occupancy",
+    "Kubernetes GPU device plugin",
+    "NVLink bandwidth and topology",
+    "CI/CD for large monorepos",
+    "SLO based alerting",
+]
+
+
+def seed(directory, embeddings, count):
+    store = VectorStore(directory, embeddings)
+    docs = [
+        Document(
+            page_content=f"{TOPICS[i % len(TOPICS)]} article {i} " * 20,
+            metadata={"title": f"doc-{i}"},
+        )
+        for i in range(count)
+    ]
+    for start in range(0, count, 500):
+        store.add(docs[start:start + 500])
+    store.close()
+
+
+def timed(fn, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label, samples):
+    ordered = sorted(samples)
+    print(
+        f"{label:<16} mean={statistics.mean(samples) * 1000:8.2f}ms "
+        f"p50={ordered[len(ordered) // 2] * 1000:8.2f}ms "
+        f"p99={ordered[int(len(ordered) * 0.99) - 1] * 1000:8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--real-embeddings", action="store_true")
+    args = parser.parse_args()
+
+    if args.real_embeddings:
+        from rag.embed_store import get_embeddings
+        embeddings = get_embeddings()
+    else:
+        embeddings = HashEmbeddings()
+
+    directory = tempfile.mkdtemp(prefix="bench_chroma_")
+    try:
+        seed(directory, embeddings, args.docs)
+        queries = [TOPICS[i % len(TOPICS)] for i in range(args.queries)]
+
+        def old_path(query):
+            from langchain_chroma import Chroma
+
+            vectordb = Chroma(
+                persist_directory=directory,
+                embedding_function=embeddings,
+            )
+            return vectordb.similarity_search(query, k=3)
+
+        store = VectorStore(directory, embeddings)
+        store.open()
+
+        print(f"docs={args.docs} queries={args.queries}")
+        report("per-call Chroma", timed(old_path, queries))
+        report("VectorStore", timed(lambda q: store.search(q, k=3), queries))
+        store.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
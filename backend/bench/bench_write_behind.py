@@ -0,0 +1,100 @@
+# bench/bench_write_behind.py
+"""
+Per-request persistence cost: inline commit vs the write-behind queue.
+
+Each simulated request persists one ChatHistory row, either with its own
+add + commit (the old /ask path) or via WriteBehind.submit(). Reports the
+latency the request pays and end-to-end rows/s including the final drain.
+
+    cd backend && python -m bench.bench_write_behind --requests 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(mode, total, concurrency):
+    from sqlalchemy import delete, func, select
+
+    from api import models
+    from api.database import AsyncSessionLocal, async_engine
+    from api.write_behind import WriteBehind
+
+    writer = WriteBehind()
+    if mode == "write-behind":
+        writer.start()
+
+    async def inline(row):
+        async with AsyncSessionLocal() as db:
+            db.add(row)
+            await db.commit()
+
+    persist = inline if mode == "inline" else writer.submit
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+    latencies = []
+
+    async def request():
+        while not queue.empty():
+            i = queue.get_nowait()
+            row = models.ChatHistory(
+                question=f"bench question {i}",
+                answer="answer body " * 200,
+                timestamp=datetime.utcnow(),
+            )
+            started = time.perf_counter()
+            await persist(row)
+            latencies.append(time.perf_counter() - started)
+
+    wall = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(concurrency)))
+    await writer.stop()
+    wall = time.perf_counter() - wall
+
+    async with AsyncSessionLocal() as db:
+        stored = (await db.execute(select(func.count(models.ChatHistory.id)))).scalar()
+        await db.execute(delete(models.ChatHistory))
+        await db.commit()
+    # Pooled connections belong to this event loop
+    await async_engine.dispose()
+
+    print(
+        f"{mode:>12}: p50={percentile(latencies, 50) * 1000:.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.2f}ms "
+        f"mean={statistics.mean(latencies) * 1000:.2f}ms "
+        f"throughput={total / wall:.0f} rows/s stored={stored}"
+    )
+    if mode == "write-behind":
+        print(f"{'':>12}  {writer.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    # Must be set before api.database is imported
+    os.environ.setdefault(
+        "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    )
+    from api.database import engine
+    from api.migrate import upgrade
+
+    upgrade(engine)
+    for mode in ("inline", "write-behind"):
+        asyncio.run(run(mode, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# bench/eval_retrieval.py
+"""
+Retrieval quality + latency on a small labelled set: vector-only vs
+BM25-only vs hybrid (RRF), plus hybrid with a metadata filter.
+
+    cd backend && python -m bench.eval_retrieval                     # hash embeddings
+    cd backend && python -m bench.eval_retrieval --real-embeddings   # all-MiniLM-L6-v2
+    cd backend && python -m bench.eval_retrieval --data my_labels.json --store chroma
+
+The data file holds {"documents": [{title, source, content}], "queries":
+[{query, relevant: [title, ...]}]}; recall@k is the share of relevant
+titles found in the top k, averaged over queries.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from langchain_core.documents import Document
+
+from bench.bench_vector_store import HashEmbeddings
+from rag.bm25 import BM25Index
+from rag.hybrid import HybridRetriever
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), "data", "retrieval_eval.json")
+KS = (1, 3, 5)
+
+
+def build(store_kind, directory, embeddings, documents):
+    if store_kind == "numpy":
+        from rag.numpy_index import NumpyIndex
+        store = NumpyIndex(os.path.join(directory, "vectors"), embeddings)
+    else:
+        from rag.vector_store import VectorStore
+        store = VectorStore(os.path.join(directory, "chroma"), embeddings)
+
+    retriever = HybridRetriever(store, BM25Index(os.path.join(directory, "bm25.db")))
+    retriever.add([
+        Document(page_content=d["content"], metadata={"title": d["title"], "source": d["source"]})
+        for d in documents
+    ])
+    return retriever
+
+
+def evaluate(retriever, queries, mode, sources=None):
+    recalls = {k: [] for k in KS}
+    latencies = []
+    for item in queries:
+        filters = {"source": sources[item["relevant"][0]]} if sources else None
+        started = time.perf_counter()
+        hits = retriever.search(item["query"], k=max(KS), filters=filters, mode=mode)
+        latencies.append(time.perf_counter() - started)
+
+        titles = [hit["document"].metadata["title"] for hit in hits]
+        relevant = {
+            t for t in item["relevant"] if not filters or sources[t] == filters["source"]
+        }
+        for k in KS:
+            recalls[k].append(len(relevant & set(titles[:k])) / len(relevant))
+
+    ordered = sorted(latencies)
+    return {
+        **{f"recall@{k}": round(statistics.mean(v), 3) for k, v in recalls.items()},
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--store", default="numpy", choices=["numpy", "chroma"])
+    parser.add_argument("--real-embeddings", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.data) as f:
+        data = json.load(f)
+
+    if args.real_embeddings:
+        from rag.embed_store import load_backend
+        embeddings = load_backend()
+    else:
+        embeddings = HashEmbeddings()
+
+    directory = tempfile.mkdtemp(prefix="eval_retrieval_")
+    try:
+        retriever = build(args.store, directory, embeddings, data["documents"])
+        sources = {d["title"]: d["source"] for d in data["documents"]}
+
+        print(f"documents={len(data['documents'])} queries={len(data['queries'])} store={args.store}")
+        for label, mode, filtered in (
+            ("vector", "vector", False),
+            ("bm25", "bm25", False),
+            ("hybrid", "hybrid", False),
+            ("hybrid+filter", "hybrid", True),
+        ):
+            result = evaluate(retriever, data["queries"], mode, sources if filtered else None)
+            print(f"{label:<14} " + " ".join(f"{k}={v}" for k, v in result.items()))
+
+        retriever.vector_store.close()
+        retriever.bm25.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# bench/load_test.py
+"""
+Concurrent load test for the FastAPI backend against a fake Ollama.
+
+Start the stub and a single-worker backend pointed at it, then drive it:
+
+    python -m bench.stub_ollama --port 11500 --latency 2 &
+    OLLAMA_HOST=http://127.0.0.1:11500 uvicorn api.main:app --port 8000 --workers 1 &
+    python -m bench.load_test --api http://127.0.0.1:8000 --concurrency 300
+
+With a 2s stub latency an async worker should complete ~concurrency/2
+requests per second; a saturated threadpool caps out near 40/2.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+REQUESTS = [
+    ("POST", "/ask", {"question": "How does NVLink differ from PCIe?"}),
+    ("POST", "/evaluate", {"question": "What is a warp?", "answer": "32 threads."}),
+    ("GET", "/interview/question", None),
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def worker(client, queue, latencies, errors):
+    while True:
+        try:
+            method, path, body = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(f"{path}: {e!r}")
+
+
+async def run(api, concurrency, total, timeout):
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(random.choice(REQUESTS))
+
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=api, timeout=timeout, limits=limits) as client:
+        wall = time.perf_counter()
+        await asyncio.gather(*(
+            worker(client, queue, latencies, errors) for _ in range(concurrency)
+        ))
+        wall = time.perf_counter() - wall
+
+    print(f"requests={total} concurrency={concurrency} wall={wall:.2f}s")
+    if latencies:
+        print(
+            f"ok={len(latencies)} throughput={len(latencies) / wall:.1f} req/s "
+            f"p50={percentile(latencies, 50) * 1000:.0f}ms "
+            f"p99={percentile(latencies, 99) * 1000:.0f}ms"
+        )
+    print(f"errors={len(errors)}")
+    for error in errors[:5]:
+        print(f"  {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend load test")
+    parser.add_argument("--api", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.api, args.concurrency, args.requests, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
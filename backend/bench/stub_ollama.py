@@ -0,0 +1,141 @@
+# bench/stub_ollama.py
+"""
+Minimal local stand-in for the Ollama HTTP API.
+
+Serves /api/generate (stream and non-stream) with a fixed latency so the
+backend can be benchmarked without a model. Run standalone:
+
+    python -m bench.stub_ollama --port 11500 --latency 0.2
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOKENS = "This is a stubbed answer from the fake Ollama server .".split(" ")
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": "stub"}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.server.record_call(body)
+
+        time.sleep(self.server.latency)
+
+        if body.get("stream", True):
+            self._send_stream()
+        else:
+            self._send_json({
+                "model": body.get("model", "stub"),
+                "response": " ".join(TOKENS),
+                "done": True,
+                **self.server.stats(body),
+            })
+
+    def _send_json(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for i, token in enumerate(TOKENS):
+            if i == self.server.cut_after:
+                # Simulated model crash: the body ends without a done chunk
+                self.wfile.write(b"0\r\n\r\n")
+                return
+            self._write_chunk({"response": token + " ", "done": False})
+            time.sleep(self.server.token_latency)
+
+        self._write_chunk({"response": "", "done": True, **self.server.stats({})})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, payload):
+        line = (json.dumps(payload) + "\n").encode()
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+
+class StubOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.1, token_latency=0.0):
+        super().__init__(address, StubOllamaHandler)
+        self.latency = latency
+        self.token_latency = token_latency
+        self.cut_after = None  # end streams after this many tokens
+        self.calls = 0
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def record_call(self, body):
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(body.get("prompt", ""))
+
+    def stats(self, body):
+        return {
+            "prompt_eval_count": len(body.get("prompt", "")) // 4,
+            "prompt_eval_duration": int(self.latency * 1e9),
+            "eval_count": len(TOKENS),
+            "eval_duration": int(self.token_latency * len(TOKENS) * 1e9),
+        }
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub(port=0, latency=0.1, token_latency=0.0) -> StubOllamaServer:
+    """
+    Start a stub server on a background thread and return it.
+    """
+    server = StubOllamaServer(("127.0.0.1", port), latency, token_latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Ollama server")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubOllamaServer(
+        ("127.0.0.1", args.port), args.latency, args.token_latency
+    )
+    print(f"🟢 Stub Ollama listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# rag/bm25.py
+"""
+Incrementally maintained BM25 keyword index in SQLite.
+
+Postings are written as documents are ingested, so exact terms like
+"NVLink" or "device plugin" are searchable immediately; corpus stats
+(N, average length) are kept in memory and updated on every add.
+
+    python -m rag.bm25 --rebuild    # index what is already in the vector store
+"""
+from collections import Counter
+from typing import Dict, List, Optional
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+BM25_PATH = os.getenv("BM25_INDEX_PATH", "rag/chroma_db/bm25.db")
+K1 = 1.2
+B = 0.75
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+#]+|(?:[._-][a-z0-9]+)*)")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to "
+    "was what when where which who why with does do you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        # "device-plugin" / "nvidia.com" also match their parts
+        if any(sep in token for sep in "._-"):
+            tokens.extend(p for p in re.split(r"[._-]", token) if p and p not in STOPWORDS)
+    return tokens
+
+
+def doc_key(document) -> str:
+    """
+    Identity shared by the keyword and vector sides of hybrid search.
+    """
+    metadata = document.metadata or {}
+    return metadata.get("content_hash") or hashlib.sha256(
+        document.page_content.encode()
+    ).hexdigest()
+
+
+def matches(metadata: dict, filters: Optional[Dict]) -> bool:
+    """
+    Equality filters; a list value means "any of".
+    """
+    for key, expected in (filters or {}).items():
+        value = (metadata or {}).get(key)
+        if isinstance(expected, (list, tuple, set)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class BM25Index:
+    def __init__(self, path: str = BM25_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.doc_count = 0
+        self.total_length = 0
+
+    def open(self):
+        if self._conn is not None:
+            return self
+
+        with self._lock:
+            if self._conn is not None:
+                return self
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                " doc_id TEXT PRIMARY KEY, length INTEGER NOT NULL,"
+                " content TEXT NOT NULL, metadata TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                " term TEXT NOT NULL, doc_id TEXT NOT NULL, tf INTEGER NOT NULL,"
+                " PRIMARY KEY (term, doc_id)) WITHOUT ROWID"
+            )
+            conn.commit()
+            self.doc_count, self.total_length = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+            ).fetchone()
+            self._conn = conn
+        return self
+
+    def __len__(self) -> int:
+        return self.doc_count
+
+    def add(self, documents: list) -> int:
+        """
+        Index documents not seen before; returns how many were added.
+        """
+        self.open()
+        added = 0
+        with self._lock:
+            for document in documents:
+                key = doc_key(document)
+                terms = Counter(tokenize(document.page_content))
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO docs (doc_id, length, content, metadata)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, sum(terms.values()), document.page_content,
+                     json.dumps(document.metadata or {})),
+                )
+                if cursor.rowcount != 1:
+                    continue
+                self._conn.executemany(
+                    "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                    [(term, key, tf) for term, tf in terms.items()],
+                )
+                self.doc_count += 1
+                self.total_length += sum(terms.values())
+                added += 1
+            self._conn.commit()
+        return added
+
+    def search(self, query: str, k: int = 10, filters: Optional[Dict] = None) -> list:
+        """
+        [(doc_id, score)] best first.
+        """
+        self.open()
+        terms = set(tokenize(query))
+        if not terms or not self.doc_count:
+            return []
+
+        avgdl = self.total_length / self.doc_count
+        scores: Dict[str, float] = {}
+        with self._lock:
+            for term in terms:
+                rows = self._conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p"
+                    " JOIN docs d ON d.doc_id = p.doc_id WHERE p.term = ?",
+                    (term,),
+                ).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (self.doc_count - len(rows) + 0.5) / (len(rows) + 0.5))
+                for doc_id, tf, length in rows:
+                    norm = tf + K1 * (1 - B + B * length / avgdl)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / norm
+
+        ranked = sorted(scores.items(), key=lambda kv: -kv[1])
+        if not filters:
+            return ranked[:k]
+
+        hits = []
+        for start in range(0, len(ranked), 200):
+            page = ranked[start:start + 200]
+            metadata = self._metadata([doc_id for doc_id, _ in page])
+            hits += [(d, s) for d, s in page if matches(metadata.get(d), filters)]
+            if len(hits) >= k:
+                break
+        return hits[:k]
+
+    def _metadata(self, doc_ids: List[str]) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doc_id, metadata FROM docs WHERE doc_id IN ({','.join('?' * len(doc_ids))})",
+                doc_ids,
+            ).fetchall()
+        return {doc_id: json.loads(metadata) for doc_id, metadata in rows}
+
+    def documents(self, doc_ids: List[str]) -> dict:
+        from langchain_core.documents import Document
+
+        if not doc_ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doc_id, content, metadata FROM docs WHERE doc_id IN ({','.join('?' * len(doc_ids))})",
+                doc_ids,
+            ).fetchall()
+        return {
+            doc_id: Document(page_content=content, metadata=json.loads(metadata))
+            for doc_id, content, metadata in rows
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+
+
+def iter_vector_store_documents(store, batch_size: int = 1000):
+    """
+    Every document already in the vector store (Chroma or NumPy backend).
+    """
+    from langchain_core.documents import Document
+
+    if store.open() is None:
+        return
+
+    if hasattr(store, "_client"):  # Chroma
+        collection = store._client.get_collection(store.collection_name)
+        offset = 0
+        while True:
+            batch = collection.get(
+                include=["documents", "metadatas"], limit=batch_size, offset=offset
+            )
+            if not batch["ids"]:
+                return
+            for text, meta in zip(batch["documents"], batch["metadatas"]):
+                yield Document(page_content=text or "", metadata=meta or {})
+            offset += len(batch["ids"])
+    else:  # NumPy index sidecar
+        for start in range(0, len(store), batch_size):
+            yield from store._documents(list(range(start, min(len(store), start + batch_size))))
+
+
+def rebuild_from(store, index: BM25Index) -> int:
+    added, batch = 0, []
+    for document in iter_vector_store_documents(store):
+        batch.append(document)
+        if len(batch) >= 500:
+            added += index.add(batch)
+            batch = []
+    return added + index.add(batch)
+
+
+def warm_up_bm25(store) -> bool:
+    """
+    Open the index; the first time, backfill it from the vector store.
+    """
+    index = get_bm25().open()
+    if len(index) == 0:
+        added = rebuild_from(store, index)
+        if added:
+            logger.info(f"✅ BM25 index built from vector store: {added} documents")
+    return True
+
+
+_index: Optional[BM25Index] = None
+_index_lock = threading.Lock()
+
+
+def get_bm25() -> BM25Index:
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = BM25Index()
+    return _index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the BM25 keyword index")
+    parser.add_argument("--rebuild", action="store_true", help="Index the vector store's documents")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    index = get_bm25().open()
+    if args.rebuild:
+        from rag.vector_store import get_vector_store
+        print(f"Indexed {rebuild_from(get_vector_store(), index)} new documents")
+    print(f"{index.path}: {len(index)} documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,89 @@
 # rag/embed_store.py
-from langchain_core.documents import Document
 from typing import Optional
 import logging
+import os
+import threading
 
 logger = logging.getLogger(__name__)
 
-CHROMA_DIR = "rag/chroma_db"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# "huggingface" (torch + sentence-transformers) or "onnx" (onnxruntime, no torch)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface").lower()
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
 
 _embeddings = None
 _embeddings_error: Optional[str] = None
+_embeddings_lock = threading.Lock()
 
 
 def get_embeddings():
     """
     Lazy + resilient embedding loader.
-    """
-    global _embeddings, _embeddings_error
 
+    langchain / torch are imported here, not at module import, so the
+    API process starts fast and the warm-up thread pays for the load.
+    """
     if _embeddings:
         return _embeddings
 
     if _embeddings_error:
         return None
 
+    with _embeddings_lock:
+        # Warm-up thread and a first request may race to load the model
+        if _embeddings or _embeddings_error:
+            return _embeddings
+        return _load_embeddings()
+
+
+def _huggingface():
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        encode_kwargs={"batch_size": EMBEDDING_BATCH_SIZE},
+    )
+
+
+def _onnx():
+    from rag.onnx_embeddings import OnnxEmbeddings
+
+    return OnnxEmbeddings(EMBEDDING_MODEL, batch_size=EMBEDDING_BATCH_SIZE)
+
+
+# Any langchain Embeddings implementation can be registered here
+BACKENDS = {
+    "huggingface": _huggingface,
+    "onnx": _onnx,
+}
+
+
+def load_backend(name: str = EMBEDDING_BACKEND):
+    """
+    Uncached model instance for a backend (benchmarks, parity checks).
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {name!r}, expected one of {list(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def _load_embeddings():
+    global _embeddings, _embeddings_error
+
     try:
-        from langchain_huggingface import HuggingFaceEmbeddings
+        from rag.embedding_cache import CachedEmbeddings
+
+        # Vectors differ slightly per backend → separate query-cache keys
+        cache_name = EMBEDDING_MODEL
+        if EMBEDDING_BACKEND != "huggingface":
+            cache_name = f"{EMBEDDING_MODEL}@{EMBEDDING_BACKEND}"
 
-        _embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
+        # Query embeddings are cached; repeated questions skip the model
+        _embeddings = CachedEmbeddings(
+            load_backend(EMBEDDING_BACKEND),
+            model_name=cache_name,
         )
-        logger.info("✅ Embeddings loaded")
+        logger.info(f"✅ Embeddings loaded ({EMBEDDING_BACKEND})")
 
         return _embeddings
 
@@ -39,26 +93,36 @@ def get_embeddings():
         return None
 
 
-def store_article(title: str, content: str, metadata: dict):
+def warm_up_embeddings() -> bool:
+    """
+    Load the model and run one inference so the first query pays nothing.
+    """
     embeddings = get_embeddings()
-    if not embeddings:
+    if embeddings is None:
         return False
 
-    try:
-        from langchain_chroma import Chroma
+    # Straight to the model: keeps the warm-up out of the query cache stats
+    embeddings.inner.embed_documents(["warm up"])
+    return True
 
+
+def embedding_cache_stats() -> dict:
+    if _embeddings is None:
+        return {"loaded": False}
+    return {"loaded": True, **_embeddings.stats()}
+
+
+def store_article(title: str, content: str, metadata: dict):
+    from langchain_core.documents import Document
+    from rag.retrieve import add_documents
+
+    try:
         doc = Document(
             page_content=content,
             metadata={"title": title, **metadata},
         )
 
-        vectordb = Chroma(
-            persist_directory=CHROMA_DIR,
-            embedding_function=embeddings,
-        )
-
-        vectordb.add_documents([doc])
-        return True
+        return add_documents([doc])
 
     except Exception as e:
         logger.warning(f"⚠️ Failed to store article: {e}")
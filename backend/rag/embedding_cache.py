@@ -0,0 +1,183 @@
+# rag/embedding_cache.py
+from collections import OrderedDict
+from array import array
+from typing import List, Optional
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))
+# Optional on-disk tier, e.g. rag/chroma_db/embed_cache.db ("" = memory only)
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "")
+# Row cap for the on-disk tier; oldest entries are deleted past it
+EMBED_DISK_CACHE_SIZE = int(os.getenv("EMBED_DISK_CACHE_SIZE", "50000"))
+# Writes between trims, so the cap is enforced without a DELETE per insert
+DISK_TRIM_EVERY = 256
+
+
+def normalise_query(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Query-embedding cache in front of any langchain Embeddings.
+
+    Memory tier is an LRU keyed by (model, normalised text); the optional
+    SQLite tier survives restarts. Document embeddings pass straight through.
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        model_name: str,
+        max_entries: int = EMBED_CACHE_SIZE,
+        disk_path: Optional[str] = EMBED_CACHE_PATH or None,
+        max_disk_entries: int = EMBED_DISK_CACHE_SIZE,
+    ):
+        self.inner = inner
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._disk_writes = 0
+        self.saved_seconds = 0.0
+        self._miss_seconds = 0.0
+
+        if disk_path:
+            try:
+                os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+                self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+                self._disk.execute(
+                    "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                    " key TEXT PRIMARY KEY, vector BLOB, created_at REAL)"
+                )
+                self._disk.execute(
+                    "CREATE INDEX IF NOT EXISTS ix_query_embeddings_created_at"
+                    " ON query_embeddings (created_at)"
+                )
+                self._disk.commit()
+                self._disk_trim()
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding disk cache disabled: {e}")
+                self._disk = None
+
+    def _key(self, text: str) -> str:
+        raw = f"{self.model_name}\0{normalise_query(text)}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _avg_miss_seconds(self) -> float:
+        return self._miss_seconds / self.misses if self.misses else 0.0
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_get(self, key: str) -> Optional[List[float]]:
+        if self._disk is None:
+            return None
+        row = self._disk.execute(
+            "SELECT vector FROM query_embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        return array("f", row[0]).tolist() if row else None
+
+    def _disk_put(self, key: str, vector: List[float]):
+        if self._disk is None:
+            return
+        try:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?)",
+                (key, array("f", vector).tobytes(), time.time()),
+            )
+            self._disk.commit()
+            self._disk_writes += 1
+            if self._disk_writes % DISK_TRIM_EVERY == 0:
+                self._disk_trim()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Embedding disk cache write failed: {e}")
+
+    def _disk_trim(self):
+        """
+        Delete the oldest rows beyond max_disk_entries.
+        """
+        (rows,) = self._disk.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()
+        excess = rows - self.max_disk_entries
+        if excess <= 0:
+            return
+        self._disk.execute(
+            "DELETE FROM query_embeddings WHERE key IN ("
+            " SELECT key FROM query_embeddings ORDER BY created_at LIMIT ?)",
+            (excess,),
+        )
+        self._disk.commit()
+        self.disk_evictions += excess
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self.saved_seconds += self._avg_miss_seconds()
+                return vector
+
+            vector = self._disk_get(key)
+            if vector is not None:
+                self._remember(key, vector)
+                self.disk_hits += 1
+                self.saved_seconds += self._avg_miss_seconds()
+                return vector
+
+        started = time.perf_counter()
+        vector = self.inner.embed_query(text)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.misses += 1
+            self._miss_seconds += elapsed
+            self._remember(key, vector)
+            self._disk_put(key, vector)
+
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "avg_embed_ms": round(self._avg_miss_seconds() * 1000, 2),
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
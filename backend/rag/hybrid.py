@@ -0,0 +1,144 @@
+# rag/hybrid.py
+"""
+Hybrid retrieval: BM25 keyword hits + dense vector hits, fused with
+reciprocal rank fusion (RRF), then packed into a token budget.
+"""
+from typing import Callable, Dict, List, Optional
+import logging
+import os
+import re
+import time
+
+from rag.bm25 import doc_key
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")  # hybrid | vector | bm25
+RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+CANDIDATES = int(os.getenv("RAG_CANDIDATES", "20"))  # per retriever, before fusion
+CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "1200"))
+MIN_PARTIAL_TOKENS = 64  # don't pack a truncated tail shorter than this
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 chars per token for English with Llama/Mistral-style tokenizers
+    return max(1, len(text) // 4)
+
+
+class HybridRetriever:
+    def __init__(self, vector_store, bm25, mode: str = RETRIEVAL_MODE):
+        self.vector_store = vector_store
+        self.bm25 = bm25
+        self.mode = mode
+        self.last_timings: Dict[str, float] = {}
+
+    def add(self, documents: list, ids: Optional[List[str]] = None) -> bool:
+        """
+        True only once both indexes hold the documents. Re-adding is safe
+        (same ids / doc keys), so a False batch can simply be retried.
+        """
+        if not self.vector_store.add(documents, ids=ids):
+            return False
+        try:
+            self.bm25.add(documents)
+        except Exception as e:
+            logger.warning(f"⚠️ BM25 indexing failed: {e}")
+            return False
+        return True
+
+    def search(
+        self, query: str, k: int = 3, filters: Optional[dict] = None, mode: Optional[str] = None
+    ) -> List[dict]:
+        """
+        [{"document", "score", "sources"}] best first.
+        """
+        mode = mode or self.mode
+        depth = max(k, CANDIDATES)
+        rankings, documents = {}, {}
+        timings = {}
+
+        if mode in ("hybrid", "vector"):
+            started = time.perf_counter()
+            hits = self.vector_store.search(query, k=depth, filters=filters)
+            timings["vector_ms"] = (time.perf_counter() - started) * 1000
+            rankings["vector"] = []
+            for document in hits:
+                key = doc_key(document)
+                documents.setdefault(key, document)
+                rankings["vector"].append(key)
+
+        if mode in ("hybrid", "bm25"):
+            started = time.perf_counter()
+            hits = self.bm25.search(query, k=depth, filters=filters)
+            timings["bm25_ms"] = (time.perf_counter() - started) * 1000
+            rankings["bm25"] = [key for key, _ in hits]
+
+        fused: Dict[str, float] = {}
+        sources: Dict[str, list] = {}
+        for name, keys in rankings.items():
+            for rank, key in enumerate(keys, 1):
+                fused[key] = fused.get(key, 0.0) + 1.0 / (RRF_K + rank)
+                sources.setdefault(key, []).append(name)
+
+        top = sorted(fused, key=lambda key: -fused[key])[:k]
+        missing = [key for key in top if key not in documents]
+        if missing:
+            documents.update(self.bm25.documents(missing))
+
+        self.last_timings = {name: round(ms, 2) for name, ms in timings.items()}
+        return [
+            {"document": documents[key], "score": round(fused[key], 5), "sources": sources[key]}
+            for key in top if key in documents
+        ]
+
+
+def _truncate(text: str, tokens: int, count_tokens: Callable[[str], int] = estimate_tokens) -> str:
+    """
+    Cut to at most `tokens`, preferring a sentence, then a word boundary.
+    """
+    # Longest prefix that fits with room for the " …" marker
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= tokens - 2:
+            low = mid
+        else:
+            high = mid - 1
+    cut = text[:low]
+    sentence_end = max(cut.rfind(". "), cut.rfind(".\n"), cut.rfind("\n\n"))
+    if sentence_end > len(cut) // 2:
+        return cut[: sentence_end + 1]
+    return re.sub(r"\s+\S*$", "", cut) + " …"
+
+
+def pack_context(
+    hits: List[dict],
+    token_budget: int = CONTEXT_TOKENS,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+) -> List[dict]:
+    """
+    Greedily fill the budget in rank order: whole chunks while they fit,
+    then one truncated chunk if enough budget is left to be useful.
+    Pass the counter the budget was computed with (agents.prompts.count_tokens).
+    """
+    packed, used, seen = [], 0, set()
+    for hit in hits:
+        text = hit["document"].page_content.strip()
+        fingerprint = " ".join(text.split())[:200]
+        if not text or fingerprint in seen:
+            continue  # overlapping chunks from the same article
+        seen.add(fingerprint)
+
+        remaining = token_budget - used
+        cost = count_tokens(text)
+        if cost > remaining:
+            if remaining < MIN_PARTIAL_TOKENS:
+                break
+            text = _truncate(text, remaining, count_tokens)
+            cost = count_tokens(text)
+
+        packed.append({**hit, "content": text, "tokens": cost})
+        used += cost
+        if used >= token_budget:
+            break
+    return packed
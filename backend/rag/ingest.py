@@ -0,0 +1,226 @@
+# rag/ingest.py
+"""
+Batch ingestion into the knowledge base.
+
+Streams documents from a directory (.md/.txt/.jsonl) or a JSONL file,
+chunks them, and writes chunks to the vector store in bulk batches.
+Each chunk is keyed by its content hash; a checkpoint file records what
+has been ingested so a re-run skips it.
+
+    python -m rag.ingest data/articles/ --batch-size 128
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Iterator, Optional
+
+from langchain_core.documents import Document
+
+from rag.vector_store import VECTOR_BACKEND, get_vector_store
+from rag.retrieve import get_retriever
+
+logger = logging.getLogger(__name__)
+
+# One checkpoint per backend: switching backends must not skip chunks
+CHECKPOINT_PATH = os.getenv(
+    "RAG_INGEST_CHECKPOINT",
+    "rag/chroma_db/numpy_index/ingest_checkpoint.db" if VECTOR_BACKEND == "numpy"
+    else "rag/chroma_db/ingest_checkpoint.db",
+)
+TEXT_EXTENSIONS = (".md", ".txt")
+
+
+def content_hash(title: str, content: str) -> str:
+    return hashlib.sha256(f"{title}\n{content}".encode()).hexdigest()
+
+
+def iter_jsonl(path: str) -> Iterator[tuple]:
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"⚠️ Skipping {path}:{line_no}: {e}")
+                continue
+
+            content = record.get("content") or record.get("text") or ""
+            title = record.get("title") or f"{os.path.basename(path)}:{line_no}"
+            metadata = record.get("metadata") or {}
+            yield title, content, {"source": path, **metadata}
+
+
+def iter_documents(source: str) -> Iterator[tuple]:
+    """
+    Yield (title, content, metadata) tuples without loading the corpus.
+    """
+    if os.path.isfile(source):
+        paths = [source]
+    else:
+        paths = (
+            os.path.join(root, name)
+            for root, _, files in os.walk(source)
+            for name in sorted(files)
+        )
+
+    for path in paths:
+        if path.endswith(".jsonl"):
+            yield from iter_jsonl(path)
+        elif path.endswith(TEXT_EXTENSIONS):
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+            title = os.path.splitext(os.path.basename(path))[0]
+            yield title, content, {"source": path}
+
+
+class Checkpoint:
+    """
+    SQLite set of content hashes that are already in the collection.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingested ("
+            " hash TEXT PRIMARY KEY, source TEXT, ingested_at REAL)"
+        )
+
+    def __contains__(self, digest: str) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM ingested WHERE hash = ?", (digest,)
+        ).fetchone()
+        return row is not None
+
+    def mark(self, documents: list):
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO ingested (hash, source, ingested_at) VALUES (?, ?, ?)",
+            [(d.metadata["content_hash"], d.metadata.get("source"), now) for d in documents],
+        )
+        self._conn.commit()
+
+    def reset(self):
+        self._conn.execute("DELETE FROM ingested")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def ingest(
+    source: str,
+    batch_size: int = 64,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 150,
+    checkpoint_path: Optional[str] = CHECKPOINT_PATH,
+    store=None,
+) -> dict:
+    """
+    Ingest everything under `source`; returns throughput stats.
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    # Vector store + BM25 keyword index, written together
+    store = store or get_retriever()
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+
+    stats = {"documents": 0, "chunks": 0, "skipped": 0, "failed": 0}
+    batch, seen = [], set()
+    started = time.perf_counter()
+
+    def flush():
+        if not batch:
+            return
+        ids = [d.metadata["content_hash"] for d in batch]
+        if store.add(list(batch), ids=ids):
+            stats["chunks"] += len(batch)
+            if checkpoint:
+                checkpoint.mark(batch)
+        else:
+            stats["failed"] += len(batch)
+        batch.clear()
+
+    try:
+        for title, content, metadata in iter_documents(source):
+            if not content.strip():
+                continue
+            stats["documents"] += 1
+
+            for index, chunk in enumerate(splitter.split_text(content)):
+                digest = content_hash(title, chunk)
+                if digest in seen or (checkpoint and digest in checkpoint):
+                    stats["skipped"] += 1
+                    continue
+                seen.add(digest)
+
+                batch.append(Document(
+                    page_content=chunk,
+                    metadata={
+                        "title": title,
+                        "chunk": index,
+                        "content_hash": digest,
+                        **metadata,
+                    },
+                ))
+                if len(batch) >= batch_size:
+                    flush()
+
+        flush()
+
+    finally:
+        if checkpoint:
+            checkpoint.close()
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["docs_per_sec"] = round(stats["documents"] / elapsed, 1) if elapsed else 0.0
+    stats["chunks_per_sec"] = round(stats["chunks"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest articles into the RAG store")
+    parser.add_argument("source", help="Directory of .md/.txt/.jsonl files or a .jsonl file")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=150)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--reset", action="store_true", help="Forget the checkpoint first")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.reset:
+        checkpoint = Checkpoint(args.checkpoint)
+        checkpoint.reset()
+        checkpoint.close()
+
+    stats = ingest(
+        args.source,
+        batch_size=args.batch_size,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        checkpoint_path=args.checkpoint,
+    )
+    print(
+        f"✅ {stats['documents']} docs → {stats['chunks']} chunks "
+        f"({stats['skipped']} skipped, {stats['failed']} failed) in {stats['seconds']}s "
+        f"· {stats['docs_per_sec']} docs/s · {stats['chunks_per_sec']} chunks/s"
+    )
+    get_vector_store().close()
+    get_retriever().bm25.close()
+
+
+if __name__ == "__main__":
+    main()
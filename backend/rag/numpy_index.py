@@ -0,0 +1,390 @@
+# rag/numpy_index.py
+"""
+In-process exact vector index: a memory-mapped NumPy matrix of
+L2-normalised embeddings plus a SQLite sidecar for text and metadata.
+
+Same interface as rag.vector_store.VectorStore (open / search / add /
+close), selected with VECTOR_BACKEND=numpy. Adds are append-only: new
+rows are written to the end of `vectors.bin` and the matrix is re-mapped;
+an id that is already present is skipped. The ingest CLI, API workers and
+the job worker share one index: appends hold an exclusive lock file, and
+readers re-map when `vectors.bin` grows.
+
+    python -m rag.numpy_index --from-chroma    # copy the Chroma collection over
+"""
+from contextlib import contextmanager
+from typing import List, Optional
+import argparse
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from rag.embed_store import get_embeddings
+
+logger = logging.getLogger(__name__)
+
+# Inside rag/chroma_db so it lives on the same persistent volume
+INDEX_DIR = os.getenv("NUMPY_INDEX_DIR", "rag/chroma_db/numpy_index")
+INDEX_DTYPE = os.getenv("NUMPY_INDEX_DTYPE", "float32")  # or "float16" (half the RAM)
+SEARCH_CHUNK_ROWS = 65536  # bounds the float32 scratch buffer for float16 matrices
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+class NumpyIndex:
+    def __init__(
+        self,
+        directory: str = INDEX_DIR,
+        embedding_function=None,
+        dtype: str = INDEX_DTYPE,
+    ):
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self._embedding_function = embedding_function
+        self._embeddings = None
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._mapped_size = -1  # bytes of vectors.bin when last mapped
+        self.dim: Optional[int] = None
+
+    # ---------- storage ----------
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, "vectors.bin")
+
+    @property
+    def _header_path(self) -> str:
+        return os.path.join(self.directory, "index.json")
+
+    @property
+    def _lock_path(self) -> str:
+        return os.path.join(self.directory, "write.lock")
+
+    @contextmanager
+    def _write_lock(self):
+        """
+        Exclusive across threads and processes sharing the directory.
+        """
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @property
+    def is_open(self) -> bool:
+        return self._conn is not None and self._embeddings is not None
+
+    def __len__(self) -> int:
+        return 0 if self._matrix is None else self._matrix.shape[0]
+
+    def _load_header(self):
+        if not os.path.exists(self._header_path):
+            return
+        with open(self._header_path) as f:
+            header = json.load(f)
+        self.dim = header["dim"]
+        if np.dtype(header["dtype"]) != self.dtype:
+            logger.warning(
+                f"⚠️ Index stored as {header['dtype']}, ignoring NUMPY_INDEX_DTYPE={self.dtype}"
+            )
+            self.dtype = np.dtype(header["dtype"])
+
+    def _write_header(self):
+        with open(self._header_path, "w") as f:
+            json.dump({"dim": self.dim, "dtype": self.dtype.name}, f)
+
+    def _committed_rows(self) -> int:
+        return self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM docs").fetchone()[0]
+
+    def _remap(self, repair: bool = False):
+        """
+        Map every vector whose sidecar row is committed. With `repair` (only
+        under the write lock) also drop vectors left by a crashed append.
+        """
+        if self.dim is None:
+            self._load_header()  # another process may have created the index
+        rows = self._committed_rows()
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        if self.dim is None:
+            self._matrix, self._mapped_size = None, 0
+            return
+
+        row_bytes = self.dim * self.dtype.itemsize
+        if size != rows * row_bytes and repair:
+            # Crash between the vector append and the sidecar commit
+            on_disk = size // row_bytes
+            logger.warning(f"⚠️ Index has {size / row_bytes:g} vectors for {rows} rows, truncating")
+            rows = min(rows, on_disk)
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(rows * row_bytes)
+            self._conn.execute("DELETE FROM docs WHERE row >= ?", (rows,))
+            self._conn.commit()
+        else:
+            # Extra bytes belong to an append that has not committed yet
+            rows = min(rows, size // row_bytes)
+
+        # What is mapped, not the file size: a bigger file triggers a re-map
+        # until the appending process has committed its rows
+        self._mapped_size = rows * row_bytes
+        self._matrix = None if not rows else np.memmap(
+            self._vectors_path, dtype=self.dtype, mode="r", shape=(rows, self.dim)
+        )
+
+    def _refresh(self):
+        """
+        Re-map when another process (ingest, a sibling worker) appended.
+        """
+        try:
+            size = os.path.getsize(self._vectors_path)
+        except OSError:
+            return
+        if size == self._mapped_size:
+            return
+        with self._lock:
+            if size != self._mapped_size and self._conn is not None:
+                self._remap()
+
+    def open(self):
+        """
+        Map the index and load the embedding model. Returns self or None.
+        """
+        if self.is_open:
+            return self
+
+        with self._lock:
+            if self.is_open:
+                return self
+
+            self._embeddings = self._embedding_function or get_embeddings()
+            if not self._embeddings:
+                return None
+
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self._conn = sqlite3.connect(
+                    os.path.join(self.directory, "docs.db"), check_same_thread=False
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS docs ("
+                    " row INTEGER PRIMARY KEY, id TEXT UNIQUE,"
+                    " content TEXT NOT NULL, metadata TEXT NOT NULL)"
+                )
+                self._conn.commit()
+                self._load_header()
+                with self._write_lock():
+                    self._remap(repair=True)
+                logger.info(f"✅ NumPy index opened: {self.directory} ({len(self)} rows)")
+
+            except Exception as e:
+                logger.warning(f"⚠️ NumPy index unavailable: {e}")
+                self._conn = None
+                self._embeddings = None
+                return None
+
+        return self
+
+    # ---------- writes ----------
+    def _existing_ids(self, ids: List[str]) -> set:
+        found = set()
+        for start in range(0, len(ids), 500):  # stay under SQLite's variable limit
+            chunk = ids[start:start + 500]
+            found.update(row[0] for row in self._conn.execute(
+                f"SELECT id FROM docs WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return found
+
+    def add_vectors(self, vectors, documents: list, ids: Optional[List[str]] = None) -> int:
+        """
+        Append precomputed embeddings; returns the number of rows added.
+        """
+        with self._write_lock():
+            # Catch up with (and repair) appends by other processes first
+            self._remap(repair=True)
+
+            if ids is not None:
+                # Append-only: ids already indexed (or repeated in the batch) are skipped
+                seen = self._existing_ids(ids)
+                keep = []
+                for i, doc_id in enumerate(ids):
+                    if doc_id not in seen:
+                        seen.add(doc_id)
+                        keep.append(i)
+                documents = [documents[i] for i in keep]
+                vectors = [vectors[i] for i in keep]
+                ids = [ids[i] for i in keep]
+            if not documents:
+                return 0
+
+            matrix = _normalise(np.asarray(vectors, dtype=np.float32)).astype(self.dtype)
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                self._write_header()
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Embedding dim {matrix.shape[1]} != index dim {self.dim}")
+
+            start = self._committed_rows()
+            with open(self._vectors_path, "ab") as f:
+                f.write(matrix.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._conn.executemany(
+                "INSERT INTO docs (row, id, content, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (start + i, ids[i] if ids else None, doc.page_content,
+                     json.dumps(doc.metadata or {}))
+                    for i, doc in enumerate(documents)
+                ],
+            )
+            self._conn.commit()
+            self._remap()
+            return len(documents)
+
+    def add(self, documents: list, ids: Optional[List[str]] = None) -> bool:
+        if self.open() is None:
+            return False
+
+        vectors = self._embeddings.embed_documents([d.page_content for d in documents])
+        self.add_vectors(vectors, documents, ids)
+        return True
+
+    # ---------- reads ----------
+    def _scores(self, matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        if matrix.dtype == np.float32:
+            return matrix @ query
+        return np.concatenate([
+            matrix[start:start + SEARCH_CHUNK_ROWS].astype(np.float32) @ query
+            for start in range(0, matrix.shape[0], SEARCH_CHUNK_ROWS)
+        ])
+
+    def search_vector(self, vector, k: int = 3) -> list:
+        """
+        [(row, cosine similarity)] best first.
+        """
+        self._refresh()
+        matrix = self._matrix  # snapshot; adds swap in a new map
+        if matrix is None or k <= 0:
+            return []
+
+        query = _normalise(np.asarray([vector], dtype=np.float32))[0]
+        scores = self._scores(matrix, query)
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def _documents(self, rows: List[int]) -> list:
+        from langchain_core.documents import Document
+
+        found = {}
+        with self._lock:
+            for start in range(0, len(rows), 500):  # SQLite variable limit
+                chunk = rows[start:start + 500]
+                found.update(
+                    (row, (content, metadata))
+                    for row, content, metadata in self._conn.execute(
+                        f"SELECT row, content, metadata FROM docs WHERE row IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                )
+        return [
+            Document(page_content=found[row][0], metadata=json.loads(found[row][1]))
+            for row in rows if row in found
+        ]
+
+    def search(self, query: str, k: int = 3, filters: Optional[dict] = None) -> list:
+        if self.open() is None:
+            return []
+
+        vector = self._embeddings.embed_query(query)
+        if not filters:
+            hits = self.search_vector(vector, k)
+            return self._documents([row for row, _ in hits]) if hits else []
+
+        from rag.bm25 import matches
+
+        # Widen the scan until k documents pass the metadata filter
+        depth = max(k * 10, 100)
+        while True:
+            hits = self.search_vector(vector, depth)
+            documents = [
+                d for d in self._documents([row for row, _ in hits]) if matches(d.metadata, filters)
+            ]
+            if len(documents) >= k or depth >= len(self):
+                return documents[:k]
+            depth *= 4
+
+    def close(self):
+        with self._lock:
+            self._matrix = None
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._embeddings = None
+
+
+def import_from_chroma(index: NumpyIndex, batch_size: int = 1000) -> int:
+    """
+    Copy every embedding + document from the Chroma collection.
+    """
+    from langchain_core.documents import Document
+    from rag.vector_store import VectorStore
+
+    store = VectorStore()
+    if store.open() is None:
+        raise RuntimeError("Chroma collection unavailable")
+    collection = store._client.get_collection(store.collection_name)
+
+    copied, offset = 0, 0
+    try:
+        while True:
+            batch = collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=batch_size,
+                offset=offset,
+            )
+            if not batch["ids"]:
+                break
+            documents = [
+                Document(page_content=text or "", metadata=meta or {})
+                for text, meta in zip(batch["documents"], batch["metadatas"])
+            ]
+            copied += index.add_vectors(batch["embeddings"], documents, batch["ids"])
+            offset += len(batch["ids"])
+    finally:
+        store.close()
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the NumPy vector index")
+    parser.add_argument("--from-chroma", action="store_true", help="Import the Chroma collection")
+    parser.add_argument("--directory", default=INDEX_DIR)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    index = NumpyIndex(args.directory)
+    if index.open() is None:
+        raise SystemExit("Index could not be opened (embeddings unavailable?)")
+
+    if args.from_chroma:
+        print(f"Imported {import_from_chroma(index)} rows from Chroma")
+    print(f"{args.directory}: {len(index)} rows, dim={index.dim}, dtype={index.dtype.name}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
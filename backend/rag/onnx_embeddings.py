@@ -0,0 +1,101 @@
+# rag/onnx_embeddings.py
+"""
+Torch-free sentence embeddings: ONNX Runtime + HF `tokenizers`.
+
+Reproduces the sentence-transformers pipeline for all-MiniLM-L6-v2
+(mean pooling over the attention mask, then L2 normalisation) from the
+ONNX exports published in the model repo, including int8-quantised ones.
+"""
+from typing import List, Optional
+import logging
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# onnx/model.onnx (fp32) or an int8 export, e.g. onnx/model_quint8_avx2.onnx
+ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+# Optional local directory holding tokenizer.json + ONNX_FILE (no download)
+ONNX_MODEL_DIR = os.getenv("EMBEDDING_ONNX_DIR", "")
+ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))  # 0 = runtime default
+BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+MAX_LENGTH = 256  # all-MiniLM-L6-v2 max_seq_length
+
+
+def _resolve(model_name: str, filename: str, model_dir: Optional[str]) -> str:
+    if model_dir:
+        return os.path.join(model_dir, filename)
+
+    from huggingface_hub import hf_hub_download
+    return hf_hub_download(repo_id=model_name, filename=filename)
+
+
+class OnnxEmbeddings(Embeddings):
+    def __init__(
+        self,
+        model_name: str,
+        onnx_file: str = ONNX_FILE,
+        model_dir: Optional[str] = ONNX_MODEL_DIR or None,
+        batch_size: int = BATCH_SIZE,
+        threads: int = ONNX_THREADS,
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(_resolve(model_name, "tokenizer.json", model_dir))
+        self.tokenizer.enable_truncation(max_length=MAX_LENGTH)
+        self.tokenizer.enable_padding(
+            pad_id=self.tokenizer.token_to_id("[PAD]") or 0, pad_token="[PAD]"
+        )
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            _resolve(model_name, onnx_file, model_dir),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+        logger.info(f"✅ ONNX embeddings loaded: {model_name} ({onnx_file})")
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._inputs:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+
+        hidden = self.session.run(None, feeds)[0]  # (batch, seq, dim)
+
+        weights = mask[..., None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Batched encode; texts are length-sorted so each batch pads minimally.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            chunk = order[start:start + self.batch_size]
+            vectors = self._encode_batch([texts[i] for i in chunk])
+            for i, vector in zip(chunk, vectors):
+                out[i] = vector
+        return np.stack(out)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode_batch([text])[0].tolist()
@@ -1,36 +1,76 @@
 # rag/retrieve.py
-from typing import List
-from rag.embed_store import get_embeddings
+from typing import Callable, List, Optional
 import logging
+import threading
+
+from rag.bm25 import get_bm25
+from rag.hybrid import CONTEXT_TOKENS, HybridRetriever, estimate_tokens, pack_context
+from rag.vector_store import get_vector_store
 
 logger = logging.getLogger(__name__)
 
-CHROMA_DIR = "rag/chroma_db"
+_retriever: Optional[HybridRetriever] = None
+_retriever_lock = threading.Lock()
 
 
-def query_articles(query: str, k: int = 3) -> List[dict]:
-    embeddings = get_embeddings()
-    if not embeddings:
-        return []
+def get_retriever() -> HybridRetriever:
+    global _retriever
 
-    try:
-        from langchain_chroma import Chroma
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                _retriever = HybridRetriever(get_vector_store(), get_bm25())
+    return _retriever
+
+
+def add_documents(documents: list, ids: Optional[List[str]] = None) -> bool:
+    """
+    Write to the vector store and the keyword index together.
+    """
+    return get_retriever().add(documents, ids=ids)
 
-        vectordb = Chroma(
-            persist_directory=CHROMA_DIR,
-            embedding_function=embeddings,
-        )
 
-        results = vectordb.similarity_search(query, k=k)
+def query_articles(
+    query: str,
+    k: int = 3,
+    filters: Optional[dict] = None,
+    token_budget: Optional[int] = None,
+    count_tokens: Optional[Callable[[str], int]] = None,
+) -> List[dict]:
+    """
+    Top-k hybrid hits as {"content", "metadata", "score"}.
+
+    With a token_budget the hits are packed to fit it (whole chunks,
+    then one truncated tail) instead of each being cut to a fixed length,
+    measured with count_tokens (default: rag.hybrid.estimate_tokens).
+    """
+    try:
+        hits = get_retriever().search(query, k=k, filters=filters)
+        if token_budget is not None:
+            hits = pack_context(hits, token_budget, count_tokens or estimate_tokens)
 
         return [
             {
-                "content": doc.page_content[:500],
-                "metadata": doc.metadata,
+                "content": hit.get("content", hit["document"].page_content),
+                "metadata": hit["document"].metadata,
+                "score": hit["score"],
             }
-            for doc in results
+            for hit in hits
         ]
 
     except Exception as e:
         logger.warning(f"⚠️ RAG query failed: {e}")
         return []
+
+
+def build_context(
+    query: str,
+    token_budget: int = CONTEXT_TOKENS,
+    k: int = 8,
+    filters: Optional[dict] = None,
+    count_tokens: Optional[Callable[[str], int]] = None,
+) -> str:
+    docs = query_articles(
+        query, k=k, filters=filters, token_budget=token_budget, count_tokens=count_tokens
+    )
+    return "\n\n".join(f"- {d['content']}" for d in docs)
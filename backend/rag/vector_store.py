@@ -0,0 +1,144 @@
+# rag/vector_store.py
+from typing import List, Optional
+import logging
+import os
+import threading
+
+from rag.embed_store import get_embeddings
+
+logger = logging.getLogger(__name__)
+
+CHROMA_DIR = "rag/chroma_db"
+COLLECTION_NAME = "langchain"  # langchain_chroma default, keeps existing data
+# "chroma" or "numpy" (rag.numpy_index: in-process memmap, exact top-k)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+
+
+def chroma_filter(filters: Optional[dict]) -> Optional[dict]:
+    """
+    {"source": "a", "title": ["x", "y"]} → Chroma `where` clause.
+    """
+    if not filters:
+        return None
+    clauses = [
+        {key: {"$in": list(value)} if isinstance(value, (list, tuple, set)) else value}
+        for key, value in filters.items()
+    ]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class VectorStore:
+    """
+    Process-wide handle on the Chroma collection.
+
+    The client and collection are opened once and reused by every request;
+    writes are serialised, reads run concurrently.
+    """
+
+    def __init__(
+        self,
+        persist_directory: str = CHROMA_DIR,
+        embedding_function=None,
+        collection_name: str = COLLECTION_NAME,
+    ):
+        self.persist_directory = persist_directory
+        self.collection_name = collection_name
+        self._embedding_function = embedding_function
+        self._client = None
+        self._db = None
+        self._lock = threading.RLock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._db is not None
+
+    def open(self):
+        """
+        Open the store if needed. Returns the langchain Chroma handle or None.
+        """
+        if self._db is not None:
+            return self._db
+
+        with self._lock:
+            if self._db is not None:
+                return self._db
+
+            embeddings = self._embedding_function or get_embeddings()
+            if not embeddings:
+                return None
+
+            try:
+                import chromadb
+                from langchain_chroma import Chroma
+
+                self._client = chromadb.PersistentClient(path=self.persist_directory)
+                self._db = Chroma(
+                    client=self._client,
+                    collection_name=self.collection_name,
+                    embedding_function=embeddings,
+                )
+                logger.info(f"✅ Vector store opened: {self.persist_directory}")
+
+            except Exception as e:
+                logger.warning(f"⚠️ Vector store unavailable: {e}")
+                self._client = None
+                self._db = None
+
+        return self._db
+
+    def search(self, query: str, k: int = 3, filters: Optional[dict] = None) -> list:
+        db = self.open()
+        if db is None:
+            return []
+
+        return db.similarity_search(query, k=k, filter=chroma_filter(filters))
+
+    def add(self, documents: list, ids: Optional[List[str]] = None) -> bool:
+        db = self.open()
+        if db is None:
+            return False
+
+        with self._lock:
+            db.add_documents(documents, ids=ids)
+
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                try:
+                    # Stops the shared chromadb system (sqlite + segment caches)
+                    self._client.clear_system_cache()
+                except Exception as e:
+                    logger.warning(f"⚠️ Vector store close failed: {e}")
+
+            self._client = None
+            self._db = None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store():
+    """
+    Process-wide store for VECTOR_BACKEND (same open/search/add/close API).
+    """
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if VECTOR_BACKEND == "numpy":
+                    from rag.numpy_index import NumpyIndex
+                    _store = NumpyIndex()
+                else:
+                    _store = VectorStore()
+
+    return _store
+
+
+def close_vector_store():
+    with _store_lock:
+        if _store is not None:
+            _store.close()
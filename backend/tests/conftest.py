@@ -0,0 +1,27 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# Read at import by agents.* / rag.*: no response cache, throwaway
+# lease and keyword-index files (prompt building opens the BM25 index)
+_scratch = tempfile.mkdtemp()
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ.setdefault("LLM_SINGLEFLIGHT_PATH", os.path.join(_scratch, "singleflight.db"))
+os.environ.setdefault("BM25_INDEX_PATH", os.path.join(_scratch, "bm25.db"))
+
+
+@pytest.fixture
+def stub():
+    """
+    Stub Ollama server with llm pointed at it.
+    """
+    from agents import llm
+    from bench.stub_ollama import start_stub
+
+    server = start_stub(latency=0.3)
+    previous, llm.OLLAMA_HOST = llm.OLLAMA_HOST, server.url
+    yield server
+    llm.OLLAMA_HOST = previous
+    server.shutdown()
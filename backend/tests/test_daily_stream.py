@@ -0,0 +1,24 @@
+import asyncio
+
+from api import daily
+
+
+def test_interrupted_stream_is_not_saved(stub, monkeypatch):
+    saved = []
+    monkeypatch.setattr(daily, "load", lambda kind, day: None)
+    monkeypatch.setattr(daily, "save", lambda kind, day, content: saved.append(content))
+
+    async def consume():
+        from agents import llm
+        try:
+            return [token async for token in daily.stream_or_create("plan")]
+        finally:
+            await llm.close_async_client()
+
+    stub.cut_after = 2
+    assert len(asyncio.run(consume())) == 2
+    assert saved == []
+    # The lock was released, so the next request generates again
+    stub.cut_after = None
+    asyncio.run(consume())
+    assert len(saved) == 1 and saved[0].startswith("This is a stubbed answer")
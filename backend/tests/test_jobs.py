@@ -0,0 +1,73 @@
+import time
+
+from api import jobs
+
+
+def test_stale_worker_cannot_finish_reclaimed_job(tmp_path, monkeypatch):
+    queue = jobs.JobQueue(str(tmp_path / "jobs.db"))
+    job = queue.submit("plan", {"role": "backend"})
+
+    monkeypatch.setattr(jobs, "LEASE_SECONDS", -1)
+    stale = queue.claim("worker-a")
+    monkeypatch.setattr(jobs, "LEASE_SECONDS", 600)
+    fresh = queue.claim("worker-b")
+    assert fresh["id"] == stale["id"] == job["id"]
+    assert fresh["attempts"] == stale["attempts"] + 1
+
+    assert not queue.complete(stale["id"], stale["attempts"], {"plan": "old"})
+    assert not queue.fail(stale["id"], stale["attempts"], "timeout")
+    assert queue.get(job["id"])["status"] == "running"
+
+    assert queue.complete(fresh["id"], fresh["attempts"], {"plan": "new"})
+    done = queue.get(job["id"])
+    assert done["status"] == "done" and done["result"] == {"plan": "new"}
+    assert not queue.fail(fresh["id"], fresh["attempts"], "late", retry=False)
+    queue.close()
+
+
+def test_fail_requeues_until_max_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "RETRY_DELAY_SECONDS", 0)
+    queue = jobs.JobQueue(str(tmp_path / "jobs.db"))
+    job = queue.submit("blog")
+
+    for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+        claimed = queue.claim("worker-a")
+        assert claimed["attempts"] == attempt
+        assert queue.fail(job["id"], claimed["attempts"], "model down")
+        expected = "failed" if attempt == jobs.MAX_ATTEMPTS else "queued"
+        assert queue.get(job["id"])["status"] == expected
+    queue.close()
+
+
+def test_expired_last_attempt_is_failed_not_reclaimed(tmp_path, monkeypatch):
+    queue = jobs.JobQueue(str(tmp_path / "jobs.db"))
+    job = queue.submit("plan")
+
+    monkeypatch.setattr(jobs, "LEASE_SECONDS", -1)
+    for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+        # Each worker "dies" holding the lease
+        assert queue.claim("worker-a")["attempts"] == attempt
+
+    assert queue.claim("worker-b") is None
+    failed = queue.get(job["id"])
+    assert failed["status"] == "failed"
+    assert failed["error"] == f"Lease expired on attempt {jobs.MAX_ATTEMPTS}"
+    queue.close()
+
+
+def test_heartbeat_keeps_a_slow_job_leased(tmp_path, monkeypatch):
+    from api import worker
+
+    queue = jobs.JobQueue(str(tmp_path / "jobs.db"))
+    job = queue.submit("plan")
+    monkeypatch.setattr(jobs, "LEASE_SECONDS", 0.3)
+    monkeypatch.setattr(worker, "HEARTBEAT_SECONDS", 0.05)
+    claimed = queue.claim("worker-a")
+
+    with worker.heartbeat(queue, claimed):
+        time.sleep(0.8)
+        # Still leased: nobody else can pick it up mid-run
+        assert queue.claim("worker-b") is None
+
+    assert queue.complete(job["id"], claimed["attempts"], {"plan": "done"})
+    queue.close()
@@ -0,0 +1,30 @@
+"""
+The ONNX backend embeds like the sentence-transformers model it replaces.
+"""
+import os
+
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("langchain_huggingface")
+
+from bench.bench_embeddings import SENTENCES, cosine  # noqa: E402
+from rag.embed_store import load_backend  # noqa: E402
+
+# int8 exports land around 0.98+, fp32 around 0.9999
+THRESHOLD = float(os.getenv("ONNX_PARITY_THRESHOLD", "0.97"))
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    reference = load_backend("huggingface").embed_documents(SENTENCES)
+    candidate = load_backend("onnx").embed_documents(SENTENCES)
+    return reference, candidate
+
+
+def test_cosine_parity(vectors):
+    reference, candidate = vectors
+    sims = [cosine(a, b) for a, b in zip(reference, candidate)]
+    assert min(sims) >= THRESHOLD, f"min cosine {min(sims):.5f} < {THRESHOLD}"
+
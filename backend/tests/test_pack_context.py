@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+import pytest
+
+from agents.prompts import count_tokens
+from rag.hybrid import pack_context
+
+CODE = "x[i] = f(a, b); y += z * (w - 1);\n" * 60
+PROSE = "The warp scheduler issues one instruction per cycle. " * 30
+
+
+def hits(*texts):
+    return [
+        {"document": SimpleNamespace(page_content=text, metadata={}), "score": 1.0}
+        for text in texts
+    ]
+
+
+@pytest.mark.parametrize("budget", [100, 300, 700])
+@pytest.mark.parametrize("first", [CODE, PROSE])
+def test_packed_context_fits_the_prompt_counter(first, budget):
+    packed = pack_context(hits(first, PROSE + " (2)"), budget, count_tokens)
+
+    assert packed
+    assert sum(count_tokens(hit["content"]) for hit in packed) <= budget
+    assert all(hit["tokens"] == count_tokens(hit["content"]) for hit in packed)
@@ -0,0 +1,29 @@
+# tests/test_parse_score.py
+"""
+Free-text score parsing (feeds score_value and the daily rollup).
+"""
+import pytest
+
+from agents.evaluator_agent import parse_score
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("**Score: 4/10**", 4.0),
+    ("**Score:** 8.5 / 10", 8.5),
+    ("Score: 7", 7.0),
+    ("Final score is 9.", 9.0),
+    ("7 out of 10", 7.0),
+    ("scored 3 out of 5", 6.0),
+    ("score out of 10 of 6", 6.0),
+    ("50/100", 5.0),
+    ("Overall score: 72/100", 7.2),
+    ("Uses 1/2 of memory. Score: 8/10", 8.0),
+    ("Score 0/10", 0.0),
+])
+def test_parses_score(text, expected):
+    assert parse_score(text) == expected
+
+
+@pytest.mark.parametrize("text", ["no number", "Score: 12/10", "score 1/3", ""])
+def test_rejects_non_scores(text):
+    assert parse_score(text) is None
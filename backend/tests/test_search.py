@@ -0,0 +1,18 @@
+from api import search
+
+
+def test_multi_word_queries_probe_each_word_then_the_query():
+    assert search.probe_matches(["warp"]) == ['"warp"*']
+    assert search.probe_matches(["warp", "diver"]) == ['"warp"', '"diver"*', '"warp" "diver"*']
+
+
+def test_worth_ranking():
+    window = 1000
+    # The whole doclist fits in the window
+    assert search.worth_ranking(40, 3, 90_000, window)
+    # Over half the window's rowid span matches
+    assert not search.worth_ranking(window, 1, 1500, window)
+    # Sparse in the window, but extrapolates past RANK_MAX_DOCS rows
+    assert not search.worth_ranking(window, 990_001, 1_000_000, window)
+    span = 1_000_000 * window // search.RANK_MAX_DOCS * 2
+    assert search.worth_ranking(window, 1_000_000 - span + 1, 1_000_000, window)
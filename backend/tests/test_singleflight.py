@@ -0,0 +1,86 @@
+# tests/test_singleflight.py
+"""
+Concurrent identical prompts reach the (stub) Ollama server once.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents import llm
+from agents.singleflight import LeaseStore, SingleFlight
+
+CALLERS = 20
+
+
+def run_threads(fn, prompt):
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        return list(pool.map(lambda _: fn(prompt), range(CALLERS)))
+
+
+def run_tasks(make):
+    async def run():
+        try:
+            return await asyncio.gather(*(make() for _ in range(CALLERS)))
+        finally:
+            # The pooled async client is bound to this event loop
+            await llm.close_async_client()
+    return asyncio.run(run())
+
+
+def test_uncoalesced_baseline(stub):
+    answers = run_threads(llm._generate, "baseline prompt")
+    assert len(answers) == CALLERS
+    assert stub.calls == CALLERS
+
+
+def test_threads_share_one_call(stub):
+    answers = run_threads(llm.generate_answer, "thread prompt")
+    assert stub.calls == 1
+    assert len(set(answers)) == 1
+
+
+def test_async_callers_share_one_call(stub):
+    answers = run_tasks(lambda: llm.generate_answer_async("async prompt"))
+    assert stub.calls == 1
+    assert len(set(answers)) == 1
+
+
+def test_streams_share_one_call(stub):
+    async def collect():
+        return "".join([t async for t in llm.stream_answer_async("stream prompt")])
+
+    answers = run_tasks(collect)
+    assert stub.calls == 1
+    assert len(set(answers)) == 1
+
+
+def test_distinct_prompts_are_not_merged(stub):
+    run_threads(llm.generate_answer, "prompt one")
+    run_threads(llm.generate_answer, "prompt two")
+    assert stub.calls == 2
+
+
+def test_cut_stream_is_not_published(tmp_path):
+    leases = LeaseStore(str(tmp_path / "leases.db"))
+    flights = SingleFlight(leases)
+
+    async def cut():
+        yield "partial "
+        raise llm.StreamInterrupted("connection reset")
+
+    async def whole():
+        yield "whole "
+        yield "answer"
+
+    async def consume(key, fn):
+        return "".join([t async for t in flights.stream_async(key, fn)])
+
+    with pytest.raises(llm.StreamInterrupted):
+        asyncio.run(consume("cut", cut))
+    # Lease released with no result → a follower elsewhere regenerates
+    assert leases.result_since("cut", 0) is None
+    assert leases.acquire("cut", "other-process")
+
+    assert asyncio.run(consume("whole", whole)) == "whole answer"
+    assert leases.result_since("whole", 0) == "whole answer"
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from agents import llm
+
+
+class RecordingCache:
+    def __init__(self):
+        self.stored = []
+
+    def lookup(self, *args):
+        return None
+
+    def store(self, scope, model, prompt, answer, *args):
+        self.stored.append(answer)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = RecordingCache()
+    monkeypatch.setattr(llm, "_cache_for", lambda scope: cache)
+    return cache
+
+
+def test_complete_stream_is_cached(stub, cache):
+    text = "".join(llm.stream_answer("whole stream", scope="ask"))
+
+    assert cache.stored == [text.strip()]
+
+
+def test_interrupted_stream_is_not_cached(stub, cache):
+    stub.cut_after = 3
+    parts = []
+    with pytest.raises(llm.StreamInterrupted):
+        for token in llm.stream_answer("cut stream", scope="ask"):
+            parts.append(token)
+
+    assert len(parts) == 3
+    assert cache.stored == []
+
+
+def test_interrupted_async_stream_is_not_cached(stub, cache):
+    stub.cut_after = 3
+
+    async def consume():
+        parts = []
+        try:
+            with pytest.raises(llm.StreamInterrupted):
+                async for token in llm.stream_answer_async("cut async stream", scope="ask"):
+                    parts.append(token)
+        finally:
+            await llm.close_async_client()
+        return parts
+
+    assert len(asyncio.run(consume())) == 3
+    assert cache.stored == []
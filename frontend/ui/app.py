@@ -19,6 +19,9 @@ st.set_page_config(
 API = os.getenv("API", "http://backend:8000")
 MAX_RETRIES = 5
 INITIAL_BACKOFF = 1.0  # seconds
+JOB_POLL_INTERVAL = 1.0  # seconds
+JOB_TIMEOUT = 900  # seconds
+CACHE_TTL = int(os.getenv("UI_CACHE_TTL", "30"))  # seconds, for history/stats reads
 
 # =========================================================
 # THEME STATE
@@ -78,15 +81,30 @@ def apply_theme(theme: str):
 apply_theme(st.session_state.theme)
 
 # =========================================================
-# API HELPERS (RETRY + BACKOFF)
+# API HELPERS (POOLED SESSION + RETRY + BACKOFF)
 # =========================================================
-def api_request(method, path, json=None, params=None):
+@st.cache_resource
+def http_session():
+    """
+    One keep-alive connection pool shared by every rerun and browser tab.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def send(method, path, json=None, params=None):
+    """
+    JSON response; raises once retries are exhausted.
+    """
     url = f"{API}{path}"
     backoff = INITIAL_BACKOFF
 
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            resp = requests.request(
+            resp = http_session().request(
                 method=method,
                 url=url,
                 json=json,
@@ -97,17 +115,55 @@ def api_request(method, path, json=None, params=None):
             return resp.json()
 
         except Exception as e:
-            if attempt == MAX_RETRIES:
-                st.error(
-                    f"❌ Backend unavailable after {MAX_RETRIES} attempts\n\n"
-                    f"Endpoint: `{path}`\n\nError: {e}"
-                )
-                return None
-
-            time.sleep(backoff)
+            # A timed-out POST may still be running server-side → don't resend it
+            timed_out_write = isinstance(e, requests.Timeout) and method != "GET"
+            if attempt == MAX_RETRIES or timed_out_write:
+                raise RuntimeError(f"after {attempt} attempt(s): {e}") from e
+
+            # 🚦 Backend shed load → honour its Retry-After hint
+            retry_after = getattr(getattr(e, "response", None), "headers", {}).get("Retry-After")
+            time.sleep(max(backoff, float(retry_after or 0)))
             backoff *= 2
 
 
+def api_request(method, path, json=None, params=None):
+    try:
+        return send(method, path, json=json, params=params)
+    except Exception as e:
+        st.error(f"❌ Backend unavailable {e}\n\nEndpoint: `{path}`")
+        return None
+
+
+@st.cache_resource
+def cache_versions():
+    # Shared across sessions, so one user's write refreshes everyone's view
+    return {}
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _cached_get(path, params, version):
+    # Failures raise, so they are never cached
+    return send("GET", path, params=dict(params))
+
+
+def api_get_cached(path, params=None):
+    """
+    GET through a TTL cache keyed by endpoint + params (e.g. the page).
+    """
+    version = cache_versions().get(path, 0)
+    try:
+        return _cached_get(path, tuple(sorted((params or {}).items())), version)
+    except Exception as e:
+        st.error(f"❌ Backend unavailable {e}\n\nEndpoint: `{path}`")
+        return None
+
+
+def invalidate(*paths):
+    versions = cache_versions()
+    for path in paths:
+        versions[path] = versions.get(path, 0) + 1
+
+
 def api_get(path, **kwargs):
     return api_request("GET", path, **kwargs)
 
@@ -115,6 +171,124 @@ def api_get(path, **kwargs):
 def api_post(path, json=None, **kwargs):
     return api_request("POST", path, json=json, **kwargs)
 
+
+def run_job(path, json=None, label="Working…"):
+    """
+    Submit a background job and poll /jobs/{id} until it finishes.
+    """
+    submitted = api_post(path, json=json)
+    if not submitted:
+        return None
+
+    job_id, status = submitted["job_id"], submitted["status"]
+    job = api_get(f"/jobs/{job_id}") if status == "done" else None
+    deadline = time.monotonic() + JOB_TIMEOUT
+
+    with st.spinner(label):
+        while not job or job["status"] not in ("done", "failed"):
+            if time.monotonic() > deadline:
+                st.error("⏳ Still running in the background — try again in a moment.")
+                return None
+            time.sleep(JOB_POLL_INTERVAL)
+            job = api_get(f"/jobs/{job_id}")
+
+    if job["status"] == "failed":
+        st.error(f"❌ Job failed: {job.get('error')}")
+        return None
+    return job["result"]
+
+
+def api_stream(method, path, json=None):
+    """
+    Yield response text chunks as the backend streams them.
+    """
+    url = f"{API}{path}"
+
+    try:
+        with http_session().request(
+            method=method,
+            url=url,
+            json=json,
+            stream=True,
+            timeout=(5, 300),
+        ) as resp:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(chunk_size=None, decode_unicode=True):
+                if chunk:
+                    yield chunk
+
+    except Exception as e:
+        st.error(f"❌ Stream failed\n\nEndpoint: `{path}`\n\nError: {e}")
+
+# =========================================================
+# PAGINATION + ON-DEMAND BODIES
+# =========================================================
+PAGE_SIZE = 20
+
+
+def cursor_page(key, path):
+    """
+    One keyset page of list rows (no bodies); the cursor stack lives in session state.
+    """
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    params = {"limit": PAGE_SIZE}
+    if cursors[-1]:
+        params["cursor"] = cursors[-1]
+    resp = api_get_cached(path, params=params)
+    return (resp["items"] if resp else []), resp
+
+
+def cursor_pager(key, resp):
+    cursors = st.session_state[f"{key}_cursors"]
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    if col_prev.button("← Newer", key=f"{key}_prev", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    col_page.caption(f"Page {len(cursors)}")
+    next_cursor = resp and resp["next_cursor"]
+    if col_next.button("Older →", key=f"{key}_next", disabled=not next_cursor):
+        cursors.append(next_cursor)
+        st.rerun()
+
+
+def paged_offset(key, query):
+    # A new query starts again at the first page
+    if st.session_state.get(f"{key}_query") != query:
+        st.session_state[f"{key}_query"] = query
+        st.session_state[f"{key}_offset"] = 0
+    return st.session_state[f"{key}_offset"]
+
+
+def offset_pager(key, offset, next_offset):
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    if col_prev.button("← Previous", key=f"{key}_prev", disabled=offset == 0):
+        st.session_state[f"{key}_offset"] = max(0, offset - PAGE_SIZE)
+        st.rerun()
+    col_page.caption(f"Page {offset // PAGE_SIZE + 1}")
+    if col_next.button("Next →", key=f"{key}_next", disabled=not next_offset):
+        st.session_state[f"{key}_offset"] = next_offset
+        st.rerun()
+
+
+def lazy_body(detail_path, field, label):
+    """
+    Fetch a row's full text only once the user asks for it.
+    """
+    opened = st.session_state.setdefault("opened_bodies", set())
+    if detail_path in opened:
+        detail = api_get_cached(detail_path)
+        if detail:
+            st.markdown(detail[field])
+    elif st.button(label, key=f"open_{detail_path}"):
+        opened.add(detail_path)
+        st.rerun()
+
+
+def marked(snippet):
+    # Server highlights with <mark>; render as bold without unsafe HTML
+    return (snippet or "").replace("<mark>", "**").replace("</mark>", "**")
+
+
 # =========================================================
 # SIDEBAR (THEME TOGGLE)
 # =========================================================
@@ -142,7 +316,8 @@ st.caption("Plan • Practice • Evaluate — NVIDIA-style")
 DEFAULTS = {
     "plan": None,
     "ai_answer": None,
-    "interview_started": False,
+    "session_id": None,
+    "session_turns": [],
     "current_question": None,
     "evaluation": None,
     "latest_blog": None,
@@ -152,23 +327,24 @@ for k, v in DEFAULTS.items():
     st.session_state.setdefault(k, v)
 
 # =========================================================
-# TABS
+# NAVIGATION (only the active section runs and fetches)
 # =========================================================
-tabs = st.tabs(
-    ["🎯 Plan", "💬 Ask AI", "📝 Interview Mode", "📊 Progress", "📜 History", "📰 Blogs"]
+# st.tabs runs every tab's body on each rerun; a radio only runs the active one
+SECTIONS = ["🎯 Plan", "💬 Ask AI", "📝 Interview Mode", "📊 Progress", "📜 History", "📰 Blogs"]
+section = st.radio(
+    "Section", SECTIONS, horizontal=True, key="section", label_visibility="collapsed"
 )
 
 # =========================================================
 # TAB 1: DAILY PLAN
 # =========================================================
-with tabs[0]:
+if section == SECTIONS[0]:
     st.subheader("🎯 Daily Study Plan")
 
     if st.button("Generate Plan"):
-        with st.spinner("Generating plan..."):
-            resp = api_get("/plan/today")
-            if resp:
-                st.session_state.plan = resp.get("plan")
+        result = run_job("/jobs/plan", label="Generating today's plan…")
+        if result:
+            st.session_state.plan = result["plan"]
 
     if st.session_state.plan:
         st.markdown(st.session_state.plan)
@@ -176,98 +352,136 @@ with tabs[0]:
 # =========================================================
 # TAB 2: ASK INTERVIEW AI
 # =========================================================
-with tabs[1]:
+if section == SECTIONS[1]:
     st.subheader("💬 Ask Interview AI")
 
     question = st.text_input("Interview Question")
 
     if st.button("Ask AI"):
-        with st.spinner("Calling interview agent..."):
-            resp = api_post("/ask", json={"question": question})
-            if resp:
-                st.session_state.ai_answer = resp.get("answer")
-
-    if st.session_state.ai_answer:
+        st.success("AI Answer")
+        st.session_state.ai_answer = st.write_stream(
+            api_stream("POST", "/ask/stream", json={"question": question})
+        )
+        invalidate("/history/chat", "/search")
+    elif st.session_state.ai_answer:
         st.success("AI Answer")
         st.write(st.session_state.ai_answer)
 
 # =========================================================
 # TAB 3: INTERVIEW MODE
 # =========================================================
-with tabs[2]:
+if section == SECTIONS[2]:
     st.subheader("📝 Interview Mode (AI as Interviewer)")
 
-    if not st.session_state.interview_started:
+    if not st.session_state.session_id:
+        topic = st.text_input("Topic (optional)", placeholder="e.g. CUDA memory hierarchy")
         if st.button("🎤 Start Interview"):
-            resp = api_get("/interview/question")
+            resp = api_post("/sessions", json={"topic": topic or None})
             if resp:
-                st.session_state.current_question = resp.get("question")
-                st.session_state.interview_started = True
-
-    if st.session_state.current_question:
-        st.markdown(f"**Question:** {st.session_state.current_question}")
-
-        user_answer = st.text_area("Your Answer", height=180)
-
-        if st.button("Submit Answer"):
-            resp = api_post(
-                "/evaluate",
-                json={
-                    "question": st.session_state.current_question,
-                    "answer": user_answer,
-                },
+                st.session_state.session_id = resp["id"]
+                st.session_state.session_turns = []
+                st.session_state.current_question = resp["turns"][0]["question"]
+                st.session_state.evaluation = None
+                st.rerun()
+    else:
+        # Earlier rounds, newest last
+        for i, turn in enumerate(st.session_state.session_turns, start=1):
+            with st.expander(f"Round {i} — score {turn['score']}/10"):
+                st.markdown(f"**Question:** {turn['question']}")
+                st.markdown(f"**Your answer:** {turn['answer']}")
+                st.markdown(turn["evaluation"])
+
+        if st.session_state.evaluation:
+            st.subheader("Evaluation")
+            st.write(st.session_state.evaluation)
+
+        round_no = len(st.session_state.session_turns) + 1
+        st.markdown(f"**Question {round_no}:** {st.session_state.current_question}")
+
+        user_answer = st.text_area("Your Answer", height=180, key=f"answer_{round_no}")
+
+        col_submit, col_end = st.columns(2)
+        if col_submit.button("Submit Answer"):
+            # Evaluation + next question run as a job; on CPU they outlast a request
+            resp = run_job(
+                f"/jobs/sessions/{st.session_state.session_id}/answer",
+                json={"answer": user_answer},
+                label="Scoring your answer…",
             )
             if resp:
-                st.session_state.evaluation = resp.get("evaluation")
-
-    if st.session_state.evaluation:
-        st.subheader("Evaluation")
-        st.write(st.session_state.evaluation)
+                invalidate("/history/scores", "/stats/scores", "/search")
+                st.session_state.session_turns.append({
+                    "question": st.session_state.current_question,
+                    "answer": user_answer,
+                    "score": resp["score"],
+                    "evaluation": resp["evaluation"],
+                })
+                st.session_state.evaluation = resp["evaluation"]
+                st.session_state.current_question = resp["next_question"]
+                st.rerun()
+
+        if col_end.button("🏁 End Interview"):
+            api_post(f"/sessions/{st.session_state.session_id}/end")
+            st.session_state.session_id = None
+            st.session_state.current_question = None
+            st.session_state.evaluation = None
+            st.rerun()
 
 # =========================================================
 # TAB 4: PROGRESS
 # =========================================================
-with tabs[3]:
-    scores = api_get("/history/scores")
-
-    if scores:
-        df = pd.DataFrame(scores)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        st.line_chart(df.set_index("timestamp")["score"])
+if section == SECTIONS[3]:
+    bucket = st.radio("Group by", ["day", "week"], horizontal=True)
+    resp = api_get_cached("/stats/scores", params={"bucket": bucket, "window": 7})
+    points = resp["points"] if resp else []
+
+    if points:
+        df = pd.DataFrame(points).set_index("period")
+        st.line_chart(df[["mean", "moving_avg"]])
+        st.caption(f"{int(df['count'].sum())} evaluations scored")
     else:
         st.info("No evaluation data yet.")
 
 # =========================================================
 # TAB 5: HISTORY
 # =========================================================
-with tabs[4]:
-    data = api_get("/history/chat")
-
-    if not data:
-        st.info("No chat history available.")
+if section == SECTIONS[4]:
+    query = st.text_input("🔎 Search questions and answers", key="chat_search")
+
+    if query.strip():
+        # Full-text hits (ranked), one page at a time
+        offset = paged_offset("chat_search", query)
+        resp = api_get_cached(
+            "/search", params={"q": query, "kind": "chat", "limit": PAGE_SIZE, "offset": offset}
+        )
+        hits = resp["items"] if resp else []
+        if not hits:
+            st.info("No matches.")
+        for hit in hits:
+            with st.expander(f"**Q:** {hit['title']}"):
+                st.markdown(marked(hit["snippet"]))
+                st.caption(f"🕒 {hit['timestamp']}")
+                lazy_body(f"/history/chat/{hit['id']}", "answer", "Show full answer")
+        offset_pager("chat_search", offset, resp and resp["next_offset"])
     else:
-        df = pd.DataFrame(data)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-
-        for _, row in df.iterrows():
-            st.markdown(
-                f"""
-                **Q:** {row['question']}  
-                **AI:** {row['answer']}  
-                🕒 {row['timestamp']}
-                ---
-                """
-            )
+        items, resp = cursor_page("chat", "/history/chat")
+        if not items:
+            st.info("No chat history available.")
+        for row in items:
+            with st.expander(f"**Q:** {row['question']}"):
+                st.caption(f"🕒 {row['timestamp']}")
+                lazy_body(f"/history/chat/{row['id']}", "answer", "Show answer")
+        cursor_pager("chat", resp)
 
 # =========================================================
 # TAB 6: BLOGS
 # =========================================================
-with tabs[5]:
+if section == SECTIONS[5]:
     if st.button("Generate Today's Blog"):
-        with st.spinner("Generating DevOps blog..."):
-            resp = api_get("/blog/daily")
-            if resp:
-                st.session_state.latest_blog = resp
+        result = run_job("/jobs/blog", label="Writing today's blog…")
+        if result:
+            st.session_state.latest_blog = result
+            invalidate("/blog/history")
 
     if st.session_state.latest_blog:
         st.markdown(f"## {st.session_state.latest_blog['title']}")
@@ -275,10 +489,9 @@ with tabs[5]:
 
     st.divider()
 
-    blogs = api_get("/blog/history")
-    if blogs:
-        for blog in blogs:
-            st.markdown(f"### {blog['title']}")
+    blogs, resp = cursor_page("blogs", "/blog/history")
+    for blog in blogs:
+        with st.expander(f"**{blog['title']}**"):
             st.caption(blog["created_at"])
-            st.write(blog["content"])
-
+            lazy_body(f"/blog/{blog['id']}", "content", "Read")
+    cursor_pager("blogs", resp)